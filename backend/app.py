@@ -1,12 +1,19 @@
 """
 Main Flask application module.
 """
-from flask import Flask, send_from_directory
+from flask import Flask, Response, request, jsonify, g
 from flask_cors import CORS
 import os
 import logging
 from dotenv import load_dotenv
 from backend.routes import register_routes
+from backend.utils.json_provider import FastJSONProvider
+from backend.services.warmup_service import start_warmup
+from backend.utils.assets import load_asset_manifest
+from backend.utils.admission import AdmissionController, AdmissionRejected
+from backend.config import (
+    ADMISSION_ENABLED, ADMISSION_ENDPOINT_CLASSES, ADMISSION_RETRY_AFTER, JOB_SCHEDULER_ENABLED, TRAFFIC_RECORD_PATH
+)
 
 # Load environment variables
 load_dotenv()
@@ -25,8 +32,11 @@ logger = logging.getLogger(__name__)
 
 def create_app():
     """Create and configure the Flask application."""
-    # Initialize Flask app
-    app = Flask(__name__, static_folder='../frontend', static_url_path='/')
+    # Initialize Flask app (frontend files are served from the asset manifest below)
+    app = Flask(__name__, static_folder=None)
+    
+    # Serialize API responses with the fast JSON provider
+    app.json = FastJSONProvider(app)
     
     # Configure CORS
     CORS(app)
@@ -37,22 +47,79 @@ def create_app():
     # Register API routes
     register_routes(app)
     
+    # Record anonymized API traffic for load-test replays
+    if TRAFFIC_RECORD_PATH:
+        from backend.utils.traffic_recorder import TrafficRecorder
+        TrafficRecorder().init_app(app)
+    
+    # Admission control in front of the API endpoints
+    if ADMISSION_ENABLED:
+        admission = AdmissionController()
+        
+        @app.before_request
+        def admit_request():
+            """Wait for an admission slot, or shed the request with 503."""
+            if not request.path.startswith('/api/'):
+                return None
+            request_class = ADMISSION_ENDPOINT_CLASSES.get(request.endpoint, 'standard')
+            try:
+                admission.acquire(request_class)
+            except AdmissionRejected as e:
+                logger.warning(f"Shedding {request.path}: {e}")
+                response = jsonify({"error": "Server is busy, please retry shortly"})
+                response.status_code = 503
+                response.headers['Retry-After'] = str(ADMISSION_RETRY_AFTER)
+                return response
+            g.admission_class = request_class
+            return None
+        
+        @app.teardown_request
+        def release_admission(exc):
+            """Release the admission slot once the response (or stream) is finished."""
+            request_class = g.pop('admission_class', None)
+            if request_class:
+                admission.release(request_class)
+    
+    # Load fingerprinted, pre-compressed frontend assets once at startup
+    assets = load_asset_manifest()
+    
+    def serve_asset(asset):
+        """Serve an in-memory asset, honouring conditional requests and Accept-Encoding."""
+        body, encoding = asset.body_for(request.headers.get('Accept-Encoding'))
+        # Each encoding is a different representation, so it gets its own ETag
+        headers = {
+            'Cache-Control': asset.cache_control,
+            'ETag': f'"{asset.etag}-{encoding}"' if encoding else f'"{asset.etag}"',
+            'Vary': 'Accept-Encoding'
+        }
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        
+        if_none_match = request.headers.get('If-None-Match', '')
+        if headers['ETag'] in (tag.strip() for tag in if_none_match.split(',')):
+            headers.pop('Content-Encoding', None)
+            return Response(status=304, headers=headers)
+        return Response(body, mimetype=asset.mimetype, headers=headers)
+    
     # Route to serve the frontend
     @app.route('/', defaults={'path': ''})
     @app.route('/<path:path>')
     def serve_frontend(path):
         """Serve the frontend application."""
-        if path and os.path.exists(os.path.join(app.static_folder, path)):
-            return send_from_directory(app.static_folder, path)
-        return send_from_directory(app.static_folder, 'index.html')
+        if path.startswith('api/'):
+            return jsonify({"error": "API endpoint not found"}), 404
+        asset = assets.get(path) or assets.get('index.html')
+        if asset is None:
+            return jsonify({"error": "Frontend not found"}), 404
+        return serve_asset(asset)
     
     # Error handler for 404
     @app.errorhandler(404)
     def not_found(e):
         """Handle 404 errors."""
-        if request.path.startswith('/api/'):
+        if request.path.startswith('/api/') or 'index.html' not in assets:
             return jsonify({"error": "API endpoint not found"}), 404
-        return send_from_directory(app.static_folder, 'index.html')
+        return serve_asset(assets['index.html'])
     
     # Error handler for 500
     @app.errorhandler(500)
@@ -61,6 +128,14 @@ def create_app():
         logger.error(f"Server error: {e}")
         return jsonify({"error": "Internal server error"}), 500
     
+    # Warm caches and connections before the instance takes traffic
+    start_warmup()
+    
+    # Keep derived data fresh in the background
+    if JOB_SCHEDULER_ENABLED:
+        from backend.services.job_service import start_scheduler
+        start_scheduler()
+    
     return app
 
 # Create the application instance
@@ -14,4 +14,163 @@ DB_CONFIG = {
 
 # Flask configuration
 DEBUG = os.getenv('DEBUG', 'True').lower() in ('true', '1', 't')
-SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
\ No newline at end of file
+SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
+# Directory for offline-built indexes and other derived data files
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'))
+
+# Similar-products index configuration
+SIMILARITY_INDEX_DIR = os.getenv('SIMILARITY_INDEX_DIR', os.path.join(DATA_DIR, 'similarity_index'))
+SIMILARITY_NPROBE = int(os.getenv('SIMILARITY_NPROBE', 8))
+
+# Review aspect extraction configuration
+ASPECT_TOP_N = int(os.getenv('ASPECT_TOP_N', 10))
+ASPECT_CHUNK_SIZE = int(os.getenv('ASPECT_CHUNK_SIZE', 200))
+ASPECT_WORKERS = int(os.getenv('ASPECT_WORKERS', os.cpu_count() or 1))
+
+# Response serialization: 'auto' uses orjson when installed, 'stdlib' forces json
+JSON_SERIALIZER = os.getenv('JSON_SERIALIZER', 'auto').lower()
+
+# In-process result cache configuration
+CACHE_TTL = int(os.getenv('CACHE_TTL', 300))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+# Seconds an expired entry may still be served while the database is unavailable
+CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', 3600))
+
+# Log table retention (comparison_history, user_searches and their daily roll-ups)
+RAW_LOG_RETENTION_DAYS = int(os.getenv('RAW_LOG_RETENTION_DAYS', 90))
+AGGREGATE_RETENTION_DAYS = int(os.getenv('AGGREGATE_RETENTION_DAYS', 730))
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', 3))
+
+# Search-as-you-type suggestion index
+SUGGEST_INDEX_PATH = os.getenv('SUGGEST_INDEX_PATH', os.path.join(DATA_DIR, 'suggest_index.json'))
+
+# Warm-up at startup: 'sync' warms before serving, 'background' warms in a
+# thread while /readyz reports not ready, 'off' skips it
+WARMUP_MODE = os.getenv('WARMUP_MODE', 'sync').lower()
+
+# Most-requested cached entries, recorded at runtime and replayed at warm-up
+HOT_KEYS_PATH = os.getenv('HOT_KEYS_PATH', os.path.join(DATA_DIR, 'hot_keys.json'))
+HOT_KEYS_LIMIT = int(os.getenv('HOT_KEYS_LIMIT', 200))
+HOT_KEYS_FLUSH_INTERVAL = int(os.getenv('HOT_KEYS_FLUSH_INTERVAL', 300))
+
+# Frontend assets and their fingerprinted, pre-compressed build output
+FRONTEND_DIR = os.getenv('FRONTEND_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frontend'))
+ASSETS_DIST_DIR = os.getenv('ASSETS_DIST_DIR', os.path.join(FRONTEND_DIR, 'dist'))
+
+# Admission control: requests are grouped into classes, each with a priority
+# (lower runs first), a concurrency limit, a queue length and a queue timeout
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'True').lower() in ('true', '1', 't')
+ADMISSION_TOTAL_CONCURRENCY = int(os.getenv('ADMISSION_TOTAL_CONCURRENCY', 16))
+ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 2))
+ADMISSION_CLASSES = {
+    'cheap': {
+        'priority': 0,
+        'concurrency': int(os.getenv('ADMISSION_CHEAP_CONCURRENCY', 16)),
+        'queue': int(os.getenv('ADMISSION_CHEAP_QUEUE', 64)),
+        'timeout': float(os.getenv('ADMISSION_CHEAP_TIMEOUT', 2.0))
+    },
+    'standard': {
+        'priority': 1,
+        'concurrency': int(os.getenv('ADMISSION_STANDARD_CONCURRENCY', 12)),
+        'queue': int(os.getenv('ADMISSION_STANDARD_QUEUE', 32)),
+        'timeout': float(os.getenv('ADMISSION_STANDARD_TIMEOUT', 1.0))
+    },
+    'expensive': {
+        'priority': 2,
+        'concurrency': int(os.getenv('ADMISSION_EXPENSIVE_CONCURRENCY', 4)),
+        'queue': int(os.getenv('ADMISSION_EXPENSIVE_QUEUE', 8)),
+        'timeout': float(os.getenv('ADMISSION_EXPENSIVE_TIMEOUT', 0.5))
+    },
+    'export': {
+        'priority': 2,
+        'concurrency': int(os.getenv('ADMISSION_EXPORT_CONCURRENCY', 2)),
+        'queue': 0,
+        'timeout': 0.0
+    }
+}
+
+# Request class per Flask endpoint; other API endpoints are 'standard'
+ADMISSION_ENDPOINT_CLASSES = {
+    'categories.get_categories': 'cheap',
+    'products.get_deals': 'cheap',
+    'search.suggest': 'cheap',
+    'trending.get_trending': 'cheap',
+    'products.get_product': 'cheap',
+    'products.get_price_history': 'cheap',
+    'products.get_compared_with': 'cheap',
+    'reviews.get_review_statistics': 'cheap',
+    'comparisons.compare_products': 'expensive',
+    'reviews.get_review_sentiment': 'expensive',
+    'products.get_similar_products': 'expensive',
+    'exports.export_products': 'export',
+    'exports.export_reviews': 'export'
+}
+
+# Statement timeouts in milliseconds per query class (0 means no limit)
+QUERY_TIMEOUTS_MS = {
+    'default': int(os.getenv('QUERY_TIMEOUT_DEFAULT_MS', 2000)),
+    'search': int(os.getenv('QUERY_TIMEOUT_SEARCH_MS', 1000)),
+    'analytics': int(os.getenv('QUERY_TIMEOUT_ANALYTICS_MS', 5000)),
+    'batch': int(os.getenv('QUERY_TIMEOUT_BATCH_MS', 0))
+}
+
+# Database circuit breaker
+DB_BREAKER = {
+    'window_seconds': float(os.getenv('DB_BREAKER_WINDOW', 30)),
+    'min_calls': int(os.getenv('DB_BREAKER_MIN_CALLS', 20)),
+    'failure_rate': float(os.getenv('DB_BREAKER_FAILURE_RATE', 0.5)),
+    'slow_call_rate': float(os.getenv('DB_BREAKER_SLOW_CALL_RATE', 0.8)),
+    'slow_call_seconds': float(os.getenv('DB_BREAKER_SLOW_CALL_SECONDS', 1.5)),
+    'open_seconds': float(os.getenv('DB_BREAKER_OPEN_SECONDS', 15)),
+    'half_open_calls': int(os.getenv('DB_BREAKER_HALF_OPEN_CALLS', 3))
+}
+
+# Price history range queries: spans up to RAW_MAX_DAYS return raw points, up to
+# DAILY_MAX_DAYS daily buckets and anything longer weekly buckets
+PRICE_HISTORY_RAW_MAX_DAYS = int(os.getenv('PRICE_HISTORY_RAW_MAX_DAYS', 7))
+PRICE_HISTORY_DAILY_MAX_DAYS = int(os.getenv('PRICE_HISTORY_DAILY_MAX_DAYS', 180))
+
+# Price-drop alerts: changed prices are matched against watches in batches of
+# ALERT_BATCH_SIZE products and handed to the configured notifier
+ALERT_BATCH_SIZE = int(os.getenv('ALERT_BATCH_SIZE', 1000))
+ALERT_NOTIFIER = os.getenv('ALERT_NOTIFIER', 'file')
+ALERT_OUTBOX_PATH = os.getenv('ALERT_OUTBOX_PATH', os.path.join(DATA_DIR, 'alerts_outbox.ndjson'))
+
+# "Frequently compared together": a comparison's weight halves every
+# HALF_LIFE_DAYS; TOP_N neighbours are stored per product
+COMPARED_WITH_HALF_LIFE_DAYS = float(os.getenv('COMPARED_WITH_HALF_LIFE_DAYS', 30))
+COMPARED_WITH_TOP_N = int(os.getenv('COMPARED_WITH_TOP_N', 20))
+COMPARED_WITH_FLUSH_PAIRS = int(os.getenv('COMPARED_WITH_FLUSH_PAIRS', 200000))
+
+# Trending products: in-memory heavy hitters over a sliding window, shared
+# between worker processes through files in TRENDING_DIR
+TRENDING_DIR = os.getenv('TRENDING_DIR', os.path.join(DATA_DIR, 'trending'))
+TRENDING_WINDOW_SECONDS = int(os.getenv('TRENDING_WINDOW_SECONDS', 3600))
+TRENDING_BUCKETS = int(os.getenv('TRENDING_BUCKETS', 12))
+TRENDING_CAPACITY = int(os.getenv('TRENDING_CAPACITY', 1000))
+TRENDING_FLUSH_INTERVAL = int(os.getenv('TRENDING_FLUSH_INTERVAL', 10))
+
+# Reviews can live on separate MySQL instances, sharded by a hash of product_id.
+# Comma-separated [user[:password]@]host[:port]/database entries, in shard order;
+# user and password default to DB_USER and DB_PASSWORD. Empty keeps reviews in
+# the main database. Shards may only be added at the end of the list.
+REVIEW_SHARDS = [s.strip() for s in os.getenv('REVIEW_SHARDS', '').split(',') if s.strip()]
+
+# Background job scheduler: JOB_WORKERS threads run due jobs, checked every
+# TICK_SECONDS. Exclusive jobs hold a database lease of LEASE_SECONDS, renewed
+# while they run, so only one instance runs them at a time. A failed exclusive
+# run is retried after RETRY_SECONDS, and its triggering events stay pending
+JOB_SCHEDULER_ENABLED = os.getenv('JOB_SCHEDULER_ENABLED', 'False').lower() in ('true', '1', 't')
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_TICK_SECONDS = float(os.getenv('JOB_TICK_SECONDS', 5))
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 60))
+JOB_RETRY_SECONDS = int(os.getenv('JOB_RETRY_SECONDS', 300))
+JOB_RUN_RETENTION_DAYS = int(os.getenv('JOB_RUN_RETENTION_DAYS', 30))
+
+# Maximum number of products in one comparison
+COMPARE_MAX_PRODUCTS = int(os.getenv('COMPARE_MAX_PRODUCTS', 50))
+
+# Traffic recording for load tests: when TRAFFIC_RECORD_PATH is set, a fraction
+# TRAFFIC_RECORD_SAMPLE of API requests is logged there, anonymized
+TRAFFIC_RECORD_PATH = os.getenv('TRAFFIC_RECORD_PATH', '')
+TRAFFIC_RECORD_SAMPLE = float(os.getenv('TRAFFIC_RECORD_SAMPLE', 1.0))
\ No newline at end of file
@@ -1,11 +1,20 @@
 #!/usr/bin/env python3
 import json
-import csv
 import mysql.connector
 import os
 from dotenv import load_dotenv
 import sys
 import re
+from datetime import datetime
+
+# Make the backend package importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.utils.import_readers import open_reader, DEFAULT_BATCH_SIZE
+from backend.services.review_dedup_service import review_content_hash
+from backend.utils.database import execute_transaction, review_shard, scatter, shard_configs
+from backend.utils.scheduler import emit_event
+from backend.config import JOB_SCHEDULER_ENABLED
 
 # Load environment variables
 load_dotenv()
@@ -53,8 +62,68 @@ def clean_price(price_str):
         print("Error parsing price: {}".format(e))
         return 0, 0
 
-def import_data(file_path):
-    """Import Amazon product data."""
+def store_reviews(cursor, review_query, review_rows):
+    """
+    Upsert a batch of reviews, one review at a time if the batch fails so a bad
+    row is skipped instead of failing the import.
+    
+    Returns:
+        int: Number of reviews stored
+    """
+    try:
+        cursor.executemany(review_query, review_rows)
+        return len(review_rows)
+    except mysql.connector.Error as e:
+        print("Error importing {} reviews, retrying one at a time: {}".format(len(review_rows), e))
+    
+    stored = 0
+    for row in review_rows:
+        try:
+            cursor.execute(review_query, row)
+            stored += 1
+        except mysql.connector.Error as e:
+            print("Error importing review for product {}: {}".format(row[0], e))
+    return stored
+
+def store_sharded_reviews(review_query, review_rows):
+    """
+    Upsert a batch of reviews on the shards holding their products, in parallel.
+    
+    A shard whose batch fails stores its reviews one at a time, skipping bad rows.
+    
+    Returns:
+        int: Number of reviews stored
+    """
+    groups = {}
+    for row in review_rows:
+        groups.setdefault(review_shard(row[0]), []).append(row)
+    
+    def store(shard, rows):
+        if execute_transaction([(review_query, rows, True)], query_class='batch', shard=shard):
+            return len(rows)
+        return sum(
+            1 for row in rows
+            if execute_transaction([(review_query, row)], query_class='batch', shard=shard)
+        )
+    
+    return sum(scatter(store, groups))
+
+def import_data(file_path, file_format=None, compression='auto', delimiter=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Import Amazon product data.
+    
+    Args:
+        file_path (str): Source file (CSV/TSV, JSON Lines or Parquet, optionally
+            gzip, bz2 or zstd compressed)
+        file_format (str): 'csv', 'jsonl' or 'parquet' (detected from the extension if None)
+        compression (str): 'auto', 'gzip', 'bz2', 'zstd' or None
+        delimiter (str): CSV delimiter (detected from the header if None)
+        batch_size (int): Rows read and committed at a time
+    
+    Returns:
+        dict: Mapping of product ID to new price for every price that changed,
+            or None if the import failed
+    """
     # Connect to the database
     try:
         print("Connecting to database...")
@@ -64,59 +133,84 @@ def import_data(file_path):
         # Read the file
         print("Reading data from {}...".format(file_path))
         
-        with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
-            # Detect delimiter (CSV or TSV)
-            sample = file.read(1024)
-            file.seek(0)
-            
-            if '\t' in sample:
-                delimiter = '\t' 
-                print("Using delimiter: tab")
-            else:
-                delimiter = ','
-                print("Using delimiter: comma")
-            
-            csv_reader = csv.reader(file, delimiter=delimiter)
-            headers = next(csv_reader)  # Read header row
-            
-            # Create a mapping of column indices
-            column_map = {col: i for i, col in enumerate(headers)}
-            
-            # Import products
-            products_imported = 0
-            reviews_imported = 0
-            
-            for row in csv_reader:
+        reader = open_reader(file_path, file_format, compression, delimiter)
+        
+        # Import products
+        products_imported = 0
+        reviews_imported = 0
+        
+        # Every price change seen in this import is recorded at the same time
+        observed_at = datetime.now().replace(microsecond=0)
+        price_changes = {}
+        
+        # Rows arrive in normalized batches whatever the source format, and
+        # each batch is committed on its own
+        review_query = """
+        INSERT INTO reviews
+        (product_id, user_name, rating, title, content, helpful_votes, date, content_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+        rating = VALUES(rating),
+        helpful_votes = VALUES(helpful_votes)
+        """
+        
+        for batch in reader.batches(batch_size):
+            review_rows = []
+            for row in batch:
                 try:
-                    # Skip if row is too short
-                    if len(row) < min(column_map.values()):
-                        print("Warning: Row has too few columns. Skipping.")
+                    # Extract product information
+                    product_id = row['asins'] if 'asins' in row else row.get('id', '')
+                    if not product_id:
+                        print("Warning: Row has no product ID. Skipping.")
                         continue
                     
-                    # Extract product information
-                    product_id = row[column_map.get('asins')] if 'asins' in column_map else row[column_map.get('id')]
-                    title = row[column_map.get('name')] if 'name' in column_map else ''
-                    brand = row[column_map.get('brand')] if 'brand' in column_map else ''
-                    category = row[column_map.get('categories')] if 'categories' in column_map else ''
+                    title = row.get('name', '')
+                    brand = row.get('brand', '')
+                    category = row.get('categories', '')
                     
                     # Get prices
-                    prices_str = row[column_map.get('prices')] if 'prices' in column_map else ''
+                    prices_str = row.get('prices', '')
                     price, original_price = clean_price(prices_str)
                     
                     # Get image and product URL
                     image_url = ''
                     product_url = ''
-                    if 'reviews.sourceURLs' in column_map:
-                        product_url = row[column_map.get('reviews.sourceURLs')]
+                    if 'reviews.sourceURLs' in row:
+                        product_url = row['reviews.sourceURLs']
                     
                     # Get rating
                     rating = 0
-                    if 'reviews.rating' in column_map:
+                    if 'reviews.rating' in row:
                         try:
-                            rating = float(row[column_map.get('reviews.rating')])
+                            rating = float(row['reviews.rating'])
                         except:
                             rating = 0
                     
+                    # Append the price to the history if it differs from the stored one
+                    # (must run before the product row is updated); <=> treats a stored
+                    # NULL as a value, so it does not count as a change on every import
+                    if price > 0:
+                        price_history_query = """
+                        INSERT INTO price_history (product_id, ts, price, original_price)
+                        SELECT %s, %s, %s, %s FROM DUAL
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM products
+                            WHERE product_id = %s
+                              AND price <=> CAST(%s AS DECIMAL(10, 2))
+                              AND original_price <=> CAST(%s AS DECIMAL(10, 2))
+                        )
+                        ON DUPLICATE KEY UPDATE
+                        price = VALUES(price),
+                        original_price = VALUES(original_price)
+                        """
+                        
+                        cursor.execute(price_history_query, (
+                            product_id, observed_at, price, original_price,
+                            product_id, price, original_price
+                        ))
+                        if cursor.rowcount > 0:
+                            price_changes[product_id] = price
+                    
                     # Insert product into database
                     product_query = """
                     INSERT INTO products 
@@ -141,56 +235,61 @@ def import_data(file_path):
                     products_imported += 1
                     
                     # Handle review if present
-                    if 'reviews.text' in column_map and row[column_map.get('reviews.text')]:
-                        review_text = row[column_map.get('reviews.text')]
-                        review_title = row[column_map.get('reviews.title')] if 'reviews.title' in column_map else ''
+                    if 'reviews.text' in row and row['reviews.text']:
+                        review_text = row['reviews.text']
+                        review_title = row.get('reviews.title', '')
                         review_rating = rating  # Use the same rating we got for the product
                         
                         # Get reviewer name
-                        reviewer = row[column_map.get('reviews.username')] if 'reviews.username' in column_map else ''
+                        reviewer = row.get('reviews.username', '')
                         
                         # Get helpful votes
                         helpful_votes = 0
-                        if 'reviews.numHelpful' in column_map:
+                        if 'reviews.numHelpful' in row:
                             try:
-                                helpful_votes = int(row[column_map.get('reviews.numHelpful')])
+                                helpful_votes = int(row['reviews.numHelpful'])
                             except:
                                 helpful_votes = 0
                         
                         # Get review date
                         review_date = None
-                        if 'reviews.date' in column_map:
-                            review_date_str = row[column_map.get('reviews.date')]
+                        if 'reviews.date' in row:
+                            review_date_str = row['reviews.date']
                             if review_date_str:
                                 # Try to convert to MySQL date format
                                 if 'T' in review_date_str:
                                     review_date = review_date_str.split('T')[0]
                         
-                        # Insert review
-                        review_query = """
-                        INSERT INTO reviews 
-                        (product_id, user_name, rating, title, content, helpful_votes, date)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        """
-                        
-                        cursor.execute(review_query, (
-                            product_id, reviewer, review_rating, review_title, 
-                            review_text, helpful_votes, review_date
+                        # Queue the review for the batch upsert; the content hash makes
+                        # re-imports of the same review update it instead of adding a copy
+                        content_hash = review_content_hash(
+                            product_id, reviewer, review_date, review_title, review_text
+                        )
+                        review_rows.append((
+                            product_id, reviewer, review_rating, review_title,
+                            review_text, helpful_votes, review_date, content_hash
                         ))
-                        
-                        reviews_imported += 1
                     
-                    # Commit every 100 products
-                    if products_imported % 100 == 0:
-                        conn.commit()
-                        print("Imported {} products, {} reviews so far...".format(products_imported, reviews_imported))
-                
                 except Exception as e:
                     print("Error importing product: {}".format(e))
             
-            # Final commit
+            if review_rows and not shard_configs:
+                reviews_imported += store_reviews(cursor, review_query, review_rows)
+            
             conn.commit()
-            print("Successfully imported {} products and {} reviews.".format(products_imported, reviews_imported))
+            
+            # Sharded reviews go to their own instances once the products are in;
+            # a failed batch can simply be imported again
+            if review_rows and shard_configs:
+                stored = store_sharded_reviews(review_query, review_rows)
+                reviews_imported += stored
+                if stored < len(review_rows):
+                    print("Error storing {} reviews on the review shards".format(len(review_rows) - stored))
+            print("Imported {} products, {} reviews so far...".format(products_imported, reviews_imported))
+        
+        print("Successfully imported {} products and {} reviews.".format(products_imported, reviews_imported))
+        print("{} product prices changed.".format(len(price_changes)))
+        return price_changes
     
     except Exception as e:
         print("Error: {}".format(e))
@@ -202,13 +301,71 @@ def import_data(file_path):
         if 'conn' in locals() and conn.is_connected():
             conn.close()
 
+def rebuild_derived_data():
+    """Rebuild offline indexes that depend on the imported data."""
+    from backend.services.similarity_service import build_similarity_index
+    from backend.services.aspect_service import build_product_aspects
+    from backend.services.suggest_service import build_suggest_index
+    
+    try:
+        print("Rebuilding similar-products index...")
+        indexed = build_similarity_index()
+        print("Indexed {} products.".format(indexed))
+    except Exception as e:
+        print("Error rebuilding similar-products index: {}".format(e))
+    
+    try:
+        print("Rebuilding search suggestion index...")
+        keys = build_suggest_index()
+        print("Indexed {} suggestion keys.".format(keys))
+    except Exception as e:
+        print("Error rebuilding search suggestion index: {}".format(e))
+    
+    try:
+        print("Extracting review aspects...")
+        processed = build_product_aspects()
+        print("Extracted aspects for {} products.".format(processed))
+    except Exception as e:
+        print("Error extracting review aspects: {}".format(e))
+
+def send_price_alerts(price_changes):
+    """Send price-drop alerts for the prices changed by an import."""
+    from backend.services.alert_service import evaluate_price_drops
+    
+    try:
+        print("Evaluating price-drop alerts...")
+        sent = evaluate_price_drops(price_changes)
+        print("Sent {} price alerts.".format(sent))
+    except Exception as e:
+        print("Error evaluating price-drop alerts: {}".format(e))
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python import_data.py <csv_file_path>")
-        sys.exit(1)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Import Amazon product data.')
+    parser.add_argument('file_path', help='CSV/TSV, JSON Lines or Parquet file, optionally .gz, .bz2 or .zst compressed')
+    parser.add_argument('--format', dest='file_format', choices=['csv', 'jsonl', 'parquet'],
+                        help='Input format (default: from the file extension)')
+    parser.add_argument('--compression', default='auto', choices=['auto', 'none', 'gzip', 'bz2', 'zstd'],
+                        help='Input compression (default: from the file extension)')
+    parser.add_argument('--delimiter', help='CSV delimiter, e.g. "," or "\\t" (default: detected from the header)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows read and committed at a time')
+    args = parser.parse_args()
+    
+    compression = None if args.compression == 'none' else args.compression
+    delimiter = args.delimiter.encode().decode('unicode_escape') if args.delimiter else None
     
-    file_path = sys.argv[1]
-    import_data(file_path)
+    price_changes = import_data(args.file_path, args.file_format, compression, delimiter, args.batch_size)
+    if price_changes is not None and JOB_SCHEDULER_ENABLED:
+        # The scheduler rebuilds the derived data on whichever instance picks it up
+        if emit_event('import_completed'):
+            print("Derived data will be rebuilt by the job scheduler.")
+        else:
+            rebuild_derived_data()
+    else:
+        rebuild_derived_data()
+    if price_changes:
+        send_price_alerts(price_changes)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
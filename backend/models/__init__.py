@@ -2,4 +2,7 @@
 Models package initialization.
 This file makes the models directory a Python package.
 Models define data structures and database schemas.
-"""
\ No newline at end of file
+"""
+from .row import Row
+from .product import Product
+from .review import Review
\ No newline at end of file
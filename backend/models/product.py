@@ -0,0 +1,13 @@
+"""
+Product model.
+"""
+from .row import Row
+
+class Product(Row):
+    """A row of the products table."""
+
+    __slots__ = (
+        'product_id', 'title', 'description', 'category', 'price', 'original_price',
+        'rating', 'rating_count', 'image_url', 'product_url', 'brand', 'features',
+        'availability', 'created_at', 'updated_at'
+    )
\ No newline at end of file
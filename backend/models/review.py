@@ -0,0 +1,12 @@
+"""
+Review models.
+"""
+from .row import Row
+
+class Review(Row):
+    """A row of the reviews table, without its internal content hash."""
+
+    __slots__ = (
+        'review_id', 'product_id', 'user_name', 'rating', 'title', 'content',
+        'helpful_votes', 'date', 'verified_purchase', 'sentiment_score', 'created_at'
+    )
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Row model base.
+Compact, read-only records built straight from tuple cursor rows.
+
+A dictionary row from cursor(dictionary=True) carries its own hash table of
+column names, several times the size of the values it holds. Models keep the
+values in slots and become dictionaries only when serialized: json_default
+calls to_dict() at the response boundary. They read like the dictionary rows
+they replace (row['title'], row.get('price'), dict(row)), so code that only
+reads rows works with either.
+
+Because the dictionary is built at encode time, encoding a model costs more
+than encoding a dictionary row (see benchmarks/bench_row_models.py). The API
+reads therefore keep dictionary rows, and models are for large scans that
+read a few columns of many rows without serializing them, like the aspect job.
+"""
+from collections.abc import Mapping
+
+class Row(Mapping):
+    """
+    Base class of the row models.
+
+    Subclasses list their columns in __slots__, in the order of the table;
+    COLUMNS is set from it. Instances are built with from_row/from_rows from
+    tuples in that order, or in the order of an explicit column subset, in which
+    case the other columns are None.
+    """
+
+    __slots__ = ()
+
+    COLUMNS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.COLUMNS = tuple(cls.__slots__)
+        cls._column_set = frozenset(cls.COLUMNS)
+        cls._builders = {}
+        cls.__init__ = _compile(
+            f"def __init__(self, {', '.join(f'{c}=None' for c in cls.COLUMNS)}):",
+            [f"self.{c} = {c}" for c in cls.COLUMNS]
+        )
+        cls.to_dict = _compile(
+            "def to_dict(self):",
+            ["return {" + ', '.join(f"'{c}': self.{c}" for c in cls.COLUMNS) + "}"]
+        )
+        cls.to_dict.__doc__ = Row.to_dict.__doc__
+
+    @classmethod
+    def select_list(cls, alias=None, columns=None):
+        """Column list for a SELECT, e.g. "p.product_id, p.title, ..."."""
+        prefix = f"{alias}." if alias else ''
+        return ', '.join(prefix + column for column in columns or cls.COLUMNS)
+
+    @classmethod
+    def builder(cls, columns=None):
+        """
+        Function building an instance from a tuple row.
+
+        Args:
+            columns (tuple): Columns of the row in order, or None for COLUMNS
+
+        Returns:
+            callable: Function of one row returning a model instance
+
+        Raises:
+            ValueError: If a column is not one of the model's
+        """
+        columns = tuple(columns or cls.COLUMNS)
+        build = cls._builders.get(columns)
+        if build is None:
+            unknown = [column for column in columns if column not in cls._column_set]
+            if unknown:
+                raise ValueError(f"{cls.__name__} has no columns {', '.join(unknown)}")
+            # Unpacking straight into the slots is the cheapest way to fill them
+            lines = ["self = new(cls)", f"({', '.join('self.' + c for c in columns)},) = row"]
+            lines += [f"self.{c} = None" for c in cls.COLUMNS if c not in columns]
+            lines.append("return self")
+            build = cls._builders[columns] = _compile(
+                "def build(row):", lines, {'new': object.__new__, 'cls': cls}
+            )
+        return build
+
+    @classmethod
+    def from_row(cls, row, columns=None):
+        """Model of one tuple row, or None if row is None."""
+        return cls.builder(columns)(row) if row is not None else None
+
+    @classmethod
+    def from_rows(cls, rows, columns=None):
+        """List of models of tuple rows; None (a failed query) gives an empty list."""
+        build = cls.builder(columns)
+        return [build(row) for row in rows or []]
+
+    def to_dict(self):
+        """
+        Dictionary of the row, as the dictionary cursor returns it.
+
+        Column values are left as they are; the JSON encoders convert decimals
+        and dates as they do for dictionary rows.
+        """
+        return {column: getattr(self, column) for column in self.COLUMNS}
+
+    def __getitem__(self, key):
+        if key in self._column_set:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.COLUMNS)
+
+    def __len__(self):
+        return len(self.COLUMNS)
+
+    def __repr__(self):
+        values = ', '.join(f"{column}={getattr(self, column)!r}" for column in self.COLUMNS)
+        return f"{type(self).__name__}({values})"
+
+def _compile(signature, body, namespace=None):
+    """Define a function from source lines, as dataclasses does for __init__."""
+    namespace = dict(namespace or {})
+    exec(signature + '\n' + '\n'.join('    ' + line for line in body), namespace)
+    return namespace[signature[4:signature.index('(')]]
\ No newline at end of file
@@ -9,13 +9,25 @@ products_bp = Blueprint('products', __name__)
 categories_bp = Blueprint('categories', __name__)
 comparisons_bp = Blueprint('comparisons', __name__)
 reviews_bp = Blueprint('reviews', __name__)
+exports_bp = Blueprint('exports', __name__)
+search_bp = Blueprint('search', __name__)
+health_bp = Blueprint('health', __name__)
+watches_bp = Blueprint('watches', __name__)
+trending_bp = Blueprint('trending', __name__)
+jobs_bp = Blueprint('jobs', __name__)
 
 # Import route modules to ensure routes are registered
-from . import products, categories, comparisons, reviews
+from . import products, categories, comparisons, reviews, exports, search, health, watches, trending, jobs
 
 def register_routes(app):
     """Register all blueprints with the Flask app."""
     app.register_blueprint(products_bp, url_prefix='/api/products')
     app.register_blueprint(categories_bp, url_prefix='/api/categories')
     app.register_blueprint(comparisons_bp, url_prefix='/api/compare')
-    app.register_blueprint(reviews_bp, url_prefix='/api/reviews')
\ No newline at end of file
+    app.register_blueprint(reviews_bp, url_prefix='/api/reviews')
+    app.register_blueprint(exports_bp, url_prefix='/api/export')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    app.register_blueprint(watches_bp, url_prefix='/api/watches')
+    app.register_blueprint(trending_bp, url_prefix='/api/trending')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    app.register_blueprint(health_bp)
\ No newline at end of file
@@ -5,7 +5,8 @@ Handles HTTP requests related to product comparisons.
 import logging
 from flask import request, jsonify
 from . import comparisons_bp
-from ..services import comparison_service
+from ..services import comparison_service, trending_service
+from ..config import COMPARE_MAX_PRODUCTS
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -16,11 +17,13 @@ def compare_products():
     Compare two or more products.
     
     Body Parameters (JSON):
-        product_ids (list): List of product IDs to compare
+        product_ids (list): List of product IDs to compare, at most COMPARE_MAX_PRODUCTS
         session_id (str, optional): Session identifier for saving history
+        weights (dict, optional): Weight of each metric (price, rating, discount,
+            review_count, value) in the overall score
     
     Returns:
-        JSON: Comparison results with product information
+        JSON: Comparison results with product information and the score matrix
     """
     try:
         data = request.get_json()
@@ -33,6 +36,13 @@ def compare_products():
         if len(product_ids) < 2:
             return jsonify({"error": "Please provide at least two product IDs for comparison"}), 400
         
+        if len(product_ids) > COMPARE_MAX_PRODUCTS:
+            return jsonify({"error": f"At most {COMPARE_MAX_PRODUCTS} products can be compared at once"}), 400
+        
+        weights = data.get('weights')
+        if weights is not None and not isinstance(weights, dict):
+            return jsonify({"error": "weights must be an object mapping metrics to numbers"}), 400
+        
         # Get session ID for history saving (optional)
         session_id = data.get('session_id')
         
@@ -41,7 +51,12 @@ def compare_products():
             session_id = str(uuid.uuid4())
         
         # Get comparison results
-        comparison_result = comparison_service.compare_products(product_ids)
+        try:
+            comparison_result = comparison_service.compare_products(product_ids, weights)
+        except comparison_service.InvalidWeightsError as e:
+            return jsonify({"error": str(e)}), 400
+        if 'error' not in comparison_result:
+            trending_service.record('compared', product_ids)
         
         # Save to history if we have a session ID
         comparison_service.save_comparison_history(session_id, product_ids)
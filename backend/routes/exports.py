@@ -0,0 +1,85 @@
+"""
+Exports route module.
+Handles HTTP requests for streaming bulk exports of products and reviews.
+"""
+import logging
+from flask import request, jsonify, Response, stream_with_context
+from . import exports_bp
+from backend.services import export_service
+
+logger = logging.getLogger(__name__)
+
+MIMETYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def _export_response(body, export_format, name):
+    """Wrap an export generator in a streaming response."""
+    response = Response(stream_with_context(body), mimetype=MIMETYPES[export_format])
+    response.headers['Content-Disposition'] = f'attachment; filename={name}.{export_format}'
+    return response
+
+@exports_bp.route('/products', methods=['GET'])
+def export_products():
+    """
+    Stream all products matching the filters.
+    
+    Query Parameters:
+        format (str): Output format, 'ndjson' (default) or 'csv'
+        category (str): Filter by category
+        brand (str): Filter by exact brand
+        min_price (float): Minimum price filter
+        max_price (float): Maximum price filter
+        min_rating (float): Minimum rating filter
+    
+    Returns:
+        Streamed NDJSON or CSV response
+    """
+    try:
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in export_service.EXPORT_FORMATS:
+            return jsonify({"error": "format must be one of: ndjson, csv"}), 400
+        
+        body = export_service.export_products(
+            export_format,
+            category=request.args.get('category'),
+            brand=request.args.get('brand'),
+            min_price=request.args.get('min_price'),
+            max_price=request.args.get('max_price'),
+            min_rating=request.args.get('min_rating')
+        )
+        return _export_response(body, export_format, 'products')
+    except Exception as e:
+        logger.error(f"Error exporting products: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@exports_bp.route('/reviews', methods=['GET'])
+def export_reviews():
+    """
+    Stream all reviews matching the filters.
+    
+    Query Parameters:
+        format (str): Output format, 'ndjson' (default) or 'csv'
+        product_id (str): Filter by product
+        min_rating (float): Minimum rating filter
+        since (str): Only reviews dated on or after this date (YYYY-MM-DD)
+    
+    Returns:
+        Streamed NDJSON or CSV response
+    """
+    try:
+        export_format = request.args.get('format', 'ndjson').lower()
+        if export_format not in export_service.EXPORT_FORMATS:
+            return jsonify({"error": "format must be one of: ndjson, csv"}), 400
+        
+        body = export_service.export_reviews(
+            export_format,
+            product_id=request.args.get('product_id'),
+            min_rating=request.args.get('min_rating'),
+            since=request.args.get('since')
+        )
+        return _export_response(body, export_format, 'reviews')
+    except Exception as e:
+        logger.error(f"Error exporting reviews: {e}")
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,33 @@
+"""
+Health route module.
+Handles liveness and readiness probes for load balancers, and metrics scraping.
+"""
+from flask import jsonify, Response
+from . import health_bp
+from ..services.warmup_service import warmup_state
+from ..utils.metrics import metrics
+
+@health_bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness probe: the process is up and serving requests."""
+    return jsonify({"status": "ok"})
+
+@health_bp.route('/readyz', methods=['GET'])
+def readyz():
+    """
+    Readiness probe: the instance has finished warming up.
+    
+    Returns:
+        JSON: Warm-up state, with status 503 until warm-up has finished
+    """
+    status = 200 if warmup_state['ready'] else 503
+    return jsonify({
+        "status": "ready" if warmup_state['ready'] else "warming_up",
+        "failed_steps": warmup_state['failed_steps']
+    }), status
+
+
+@health_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Application metrics in the Prometheus text format."""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,47 @@
+"""
+Jobs route module.
+Reports the background jobs and their run history, so the cost of keeping
+derived data fresh is visible.
+"""
+import logging
+from flask import request, jsonify
+from . import jobs_bp
+from ..services import job_service
+
+logger = logging.getLogger(__name__)
+
+@jobs_bp.route('', methods=['GET'])
+def get_jobs():
+    """
+    Get the registered jobs.
+    
+    Returns:
+        JSON: List of jobs with their schedule, where they are running and run
+            counts and durations over the last 7 days
+    """
+    try:
+        return jsonify(job_service.get_jobs())
+    except Exception as e:
+        logger.error(f"Error getting jobs: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@jobs_bp.route('/<name>/runs', methods=['GET'])
+def get_job_runs(name):
+    """
+    Get the most recent runs of a job.
+    
+    Query Parameters:
+        limit (int): Maximum number of runs to return
+    
+    Returns:
+        JSON: List of runs, newest first
+    """
+    try:
+        if name not in job_service.scheduler.jobs:
+            return jsonify({"error": "Job not found"}), 404
+        
+        limit = min(int(request.args.get('limit', 20)), 200)
+        return jsonify(job_service.get_job_runs(name, limit))
+    except Exception as e:
+        logger.error(f"Error getting runs of job {name}: {e}")
+        return jsonify({"error": str(e)}), 500
\ No newline at end of file
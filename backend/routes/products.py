@@ -3,12 +3,23 @@ Products route module.
 Handles HTTP requests related to products.
 """
 import logging
+from datetime import datetime, timedelta
 from flask import request, jsonify
 from . import products_bp
-from backend.services import product_service, review_service
+from backend.services import (
+    product_service, review_service, similarity_service, price_history_service, compared_with_service,
+    trending_service
+)
 
 logger = logging.getLogger(__name__)
 
+def _parse_datetime(value):
+    """Parse an ISO date or datetime as naive local time, like the stored timestamps."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
 @products_bp.route('', methods=['GET'])
 def get_products():
     """
@@ -71,23 +82,124 @@ def get_product(product_id):
         if not product:
             return jsonify({"error": "Product not found"}), 404
         
+        trending_service.record('viewed', [product_id])
+        
         # Check if reviews should be included
         include_reviews = request.args.get('with_reviews', 'false').lower() == 'true'
         
         if include_reviews:
+            # Copy the cached product before adding review data to it
+            product = dict(product)
+            
             # Get reviews for this product
             reviews = review_service.get_reviews_for_product(product_id)
             product['reviews'] = reviews
             
             # Get review statistics
             review_stats = review_service.get_review_statistics(product_id)
-            product['review_stats'] = review_stats
+            product['review_stats'] = review_stats or review_service.empty_review_statistics()
         
         return jsonify(product)
     except Exception as e:
         logger.error(f"Error getting product {product_id}: {e}")
         return jsonify({"error": str(e)}), 500
 
+@products_bp.route('/<product_id>/similar', methods=['GET'])
+def get_similar_products(product_id):
+    """
+    Get products similar to a given product, as "compare with..." suggestions.
+    
+    Path Parameters:
+        product_id (str): Product ID to find similar products for
+    
+    Query Parameters:
+        k (int): Maximum number of similar products to return
+    
+    Returns:
+        JSON: List of product objects with a similarity score
+    """
+    try:
+        try:
+            k = int(request.args.get('k', 10))
+        except ValueError:
+            k = 0
+        if k <= 0:
+            return jsonify({"error": "k must be a positive integer"}), 400
+        k = min(k, 100)
+        similar = similarity_service.get_similar_products(product_id, k)
+        
+        if similar is None:
+            return jsonify({"error": "Product not found in similarity index"}), 404
+        
+        return jsonify(similar)
+    except Exception as e:
+        logger.error(f"Error getting similar products for {product_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@products_bp.route('/<product_id>/compared-with', methods=['GET'])
+def get_compared_with(product_id):
+    """
+    Get the products most often compared with a product.
+    
+    Path Parameters:
+        product_id (str): Product ID
+    
+    Query Parameters:
+        k (int): Maximum number of products to return
+    
+    Returns:
+        JSON: List of product IDs with a decayed co-comparison score, best first
+    """
+    try:
+        try:
+            k = int(request.args.get('k', 10))
+        except ValueError:
+            k = 0
+        if k <= 0:
+            return jsonify({"error": "k must be a positive integer"}), 400
+        return jsonify(compared_with_service.get_compared_with(product_id)[:k])
+    except Exception as e:
+        logger.error(f"Error getting compared-with products for {product_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@products_bp.route('/<product_id>/price-history', methods=['GET'])
+def get_price_history(product_id):
+    """
+    Get the price history of a product.
+    
+    Path Parameters:
+        product_id (str): Product ID to get the price history for
+    
+    Query Parameters:
+        from (str): ISO date or datetime to start at (defaults to 30 days before to)
+        to (str): ISO date or datetime to end at, exclusive (defaults to now)
+        resolution (str): raw, day, week or auto (default) to pick one from the range
+    
+    Datetimes with a UTC offset are converted to local time.
+    
+    Returns:
+        JSON: Resolution used and a list of price points or buckets
+    """
+    try:
+        resolution = request.args.get('resolution', 'auto')
+        if resolution != 'auto' and resolution not in price_history_service.RESOLUTIONS:
+            return jsonify({"error": "resolution must be one of: raw, day, week, auto"}), 400
+        
+        try:
+            end = _parse_datetime(request.args['to']) if 'to' in request.args else datetime.now()
+            start = _parse_datetime(request.args['from']) if 'from' in request.args else end - timedelta(days=30)
+        except ValueError:
+            return jsonify({"error": "from and to must be ISO dates or datetimes"}), 400
+        
+        if start >= end:
+            return jsonify({"error": "from must be before to"}), 400
+        
+        history = price_history_service.get_price_history(product_id, start, end, resolution)
+        return jsonify(history)
+    except Exception as e:
+        logger.error(f"Error getting price history for {product_id}: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @products_bp.route('/deals', methods=['GET'])
 def get_deals():
     """
@@ -102,7 +214,7 @@ def get_deals():
     try:
         limit = int(request.args.get('limit', 10))
         deals = product_service.get_top_discounted_products(limit)
-        return jsonify(deals)
+        return jsonify(deals or [])
     except Exception as e:
         logger.error(f"Error getting deals: {e}")
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -47,7 +47,7 @@ def get_review_statistics(product_id):
     """
     try:
         statistics = review_service.get_review_statistics(product_id)
-        return jsonify(statistics)
+        return jsonify(statistics or review_service.empty_review_statistics())
     except Exception as e:
         logger.error(f"Error getting review statistics for product {product_id}: {e}")
         return jsonify({"error": str(e)}), 500
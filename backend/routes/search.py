@@ -0,0 +1,37 @@
+"""
+Search route module.
+Handles HTTP requests for search-as-you-type suggestions.
+"""
+import logging
+from flask import request, jsonify
+from . import search_bp
+from ..services import suggest_service
+
+logger = logging.getLogger(__name__)
+
+@search_bp.route('/suggest', methods=['GET'])
+def suggest():
+    """
+    Get search suggestions for a prefix.
+    
+    Query Parameters:
+        q (str): What the user has typed so far
+        k (int): Maximum number of suggestions
+    
+    Returns:
+        JSON: List of suggestions (product titles, brands and categories)
+    """
+    try:
+        prefix = request.args.get('q', '')
+        try:
+            k = int(request.args.get('k', 10))
+        except ValueError:
+            k = 0
+        if k <= 0:
+            return jsonify({"error": "k must be a positive integer"}), 400
+        
+        suggestions = suggest_service.get_suggestions(prefix, k)
+        return jsonify(suggestions)
+    except Exception as e:
+        logger.error(f"Error getting suggestions for '{request.args.get('q')}': {e}")
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,33 @@
+"""
+Trending route module.
+Handles HTTP requests for trending products, served from memory.
+"""
+import logging
+from flask import request, jsonify
+from . import trending_bp
+from ..services import trending_service
+
+logger = logging.getLogger(__name__)
+
+@trending_bp.route('', methods=['GET'])
+def get_trending():
+    """
+    Get the most compared or most viewed products over the recent window.
+    
+    Query Parameters:
+        type (str): compared (default) or viewed
+        k (int): Maximum number of products to return
+    
+    Returns:
+        JSON: List of product IDs with approximate counts, highest first
+    """
+    try:
+        kind = request.args.get('type', 'compared')
+        if kind not in trending_service.KINDS:
+            return jsonify({"error": "type must be one of: compared, viewed"}), 400
+        
+        k = min(int(request.args.get('k', 10)), 100)
+        return jsonify(trending_service.get_trending(kind, k))
+    except Exception as e:
+        logger.error(f"Error getting trending products: {e}")
+        return jsonify({"error": str(e)}), 500
\ No newline at end of file
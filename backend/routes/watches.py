@@ -0,0 +1,99 @@
+"""
+Watches route module.
+Handles HTTP requests for price-drop watches.
+"""
+import logging
+from flask import request, jsonify
+from . import watches_bp
+from ..services import alert_service, product_service
+
+logger = logging.getLogger(__name__)
+
+@watches_bp.route('', methods=['GET'])
+def get_watches():
+    """
+    Get the price-drop watches of a subscriber.
+    
+    Query Parameters:
+        subscriber (str): Subscriber identifier
+    
+    Returns:
+        JSON: List of watch objects
+    """
+    try:
+        subscriber = request.args.get('subscriber')
+        
+        if not subscriber:
+            return jsonify({"error": "Please provide a subscriber parameter"}), 400
+        
+        return jsonify(alert_service.get_watches(subscriber))
+    except Exception as e:
+        logger.error(f"Error getting watches: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@watches_bp.route('', methods=['POST'])
+def create_watch():
+    """
+    Watch a product for a price drop.
+    
+    Body Parameters (JSON):
+        subscriber (str): Subscriber identifier
+        product_id (str): Product ID to watch
+        target_price (float): Alert when the price is at or below this value
+    
+    Returns:
+        JSON: The stored watch
+    """
+    try:
+        data = request.get_json() or {}
+        subscriber = data.get('subscriber')
+        product_id = data.get('product_id')
+        
+        if not subscriber or not product_id or data.get('target_price') is None:
+            return jsonify({"error": "Please provide subscriber, product_id and target_price"}), 400
+        
+        target_price = float(data['target_price'])
+        if target_price <= 0:
+            return jsonify({"error": "target_price must be positive"}), 400
+        
+        if not product_service.get_product_by_id(product_id):
+            return jsonify({"error": "Product not found"}), 404
+        
+        if not alert_service.create_watch(subscriber, product_id, target_price):
+            return jsonify({"error": "Could not save watch"}), 500
+        
+        return jsonify({
+            "subscriber": subscriber,
+            "product_id": product_id,
+            "target_price": target_price
+        }), 201
+    except Exception as e:
+        logger.error(f"Error creating watch: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@watches_bp.route('', methods=['DELETE'])
+def delete_watch():
+    """
+    Stop watching a product.
+    
+    Query Parameters:
+        subscriber (str): Subscriber identifier
+        product_id (str): Product ID to stop watching
+    
+    Returns:
+        JSON: Status message
+    """
+    try:
+        subscriber = request.args.get('subscriber')
+        product_id = request.args.get('product_id')
+        
+        if not subscriber or not product_id:
+            return jsonify({"error": "Please provide subscriber and product_id parameters"}), 400
+        
+        if not alert_service.delete_watch(subscriber, product_id):
+            return jsonify({"error": "Could not delete watch"}), 500
+        
+        return jsonify({"status": "deleted"})
+    except Exception as e:
+        logger.error(f"Error deleting watch: {e}")
+        return jsonify({"error": str(e)}), 500
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+Alert service module.
+Manages price-drop watches and evaluates them incrementally: after an import
+only the products whose price changed are joined against the watches, through
+the (product_id, target_price) index, so the cost follows the size of the
+price delta rather than the number of watches.
+
+Evaluate changes recorded since a given time with:
+python -m backend.services.alert_service --since 2026-01-01T00:00:00
+"""
+import logging
+from ..config import ALERT_BATCH_SIZE
+from ..utils.database import execute_query, execute_transaction
+from ..utils.notifiers import get_notifier
+
+logger = logging.getLogger(__name__)
+
+def create_watch(subscriber, product_id, target_price):
+    """
+    Watch a product for a price at or below target_price.
+
+    A subscriber has at most one watch per product; watching again replaces the target.
+
+    Returns:
+        bool: True if the watch was stored
+    """
+    query = """
+    INSERT INTO price_watches (subscriber, product_id, target_price)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    target_price = VALUES(target_price),
+    last_alert_price = NULL
+    """
+    return execute_transaction([(query, (subscriber, product_id, target_price))])
+
+def delete_watch(subscriber, product_id):
+    """Stop watching a product."""
+    query = "DELETE FROM price_watches WHERE subscriber = %s AND product_id = %s"
+    return execute_transaction([(query, (subscriber, product_id))])
+
+def get_watches(subscriber):
+    """
+    Get a subscriber's watches.
+
+    Returns:
+        list: List of watch dictionaries
+    """
+    query = """
+    SELECT watch_id, product_id, target_price, last_alert_price, created_at
+    FROM price_watches
+    WHERE subscriber = %s
+    ORDER BY created_at DESC
+    """
+    return execute_query(query, (subscriber,)) or []
+
+def _deltas_table(deltas):
+    """Derived table of (product_id, price) rows for joining deltas in SQL."""
+    derived = ' UNION ALL '.join(
+        ['SELECT %s AS product_id, CAST(%s AS DECIMAL(10, 2)) AS price'] * len(deltas)
+    )
+    params = [value for delta in deltas for value in delta]
+    return derived, params
+
+def find_triggered_watches(deltas):
+    """
+    Find the watches triggered by a batch of price changes.
+
+    A watch triggers when the new price is at or below its target and below the
+    price it last alerted at, so repeated imports of the same price alert once.
+
+    Args:
+        deltas (list): List of (product_id, new price) tuples
+
+    Returns:
+        list: List of dictionaries with watch_id, subscriber, product_id,
+            target_price and price, or None on a database error
+    """
+    derived, params = _deltas_table(deltas)
+    query = f"""
+    SELECT w.watch_id, w.subscriber, w.product_id, w.target_price, d.price
+    FROM ({derived}) d
+    JOIN price_watches w
+        ON w.product_id = d.product_id AND w.target_price >= d.price
+    WHERE w.last_alert_price IS NULL OR d.price < w.last_alert_price
+    """
+    return execute_query(query, params, query_class='batch')
+
+def record_alerts(alerts, deltas):
+    """
+    Store alerts and update the watches they came from in one transaction.
+
+    Watches whose product went back above target are re-armed so the next
+    drop alerts again.
+
+    Returns:
+        bool: True if committed
+    """
+    derived, params = _deltas_table(deltas)
+    statements = [(f"""
+    UPDATE price_watches w
+    JOIN ({derived}) d ON w.product_id = d.product_id AND w.target_price < d.price
+    SET w.last_alert_price = NULL
+    WHERE w.last_alert_price IS NOT NULL
+    """, params)]
+
+    if alerts:
+        statements.append(("""
+        INSERT INTO price_alerts (watch_id, product_id, target_price, price)
+        VALUES (%s, %s, %s, %s)
+        """, [(a['watch_id'], a['product_id'], a['target_price'], a['price']) for a in alerts], True))
+        statements.append((
+            "UPDATE price_watches SET last_alert_price = %s WHERE watch_id = %s",
+            [(a['price'], a['watch_id']) for a in alerts], True
+        ))
+
+    return execute_transaction(statements, query_class='batch')
+
+def evaluate_price_drops(deltas, notifier=None, batch_size=ALERT_BATCH_SIZE):
+    """
+    Match changed prices against watches and send the resulting alerts.
+
+    Alerts are stored before they are handed to the notifier, one batch of
+    products at a time.
+
+    Args:
+        deltas (dict): Mapping of product ID to its new price
+        notifier: Object with a send(alerts) method (defaults to the configured one)
+        batch_size (int): Number of changed products per batch
+
+    Returns:
+        int: Number of alerts sent
+    """
+    notifier = notifier or get_notifier()
+    changes = sorted(deltas.items())
+    sent = 0
+
+    for i in range(0, len(changes), batch_size):
+        batch = changes[i:i + batch_size]
+        alerts = find_triggered_watches(batch)
+        if alerts is None or not record_alerts(alerts, batch):
+            raise RuntimeError(f"Could not evaluate price alerts for batch starting at {batch[0][0]}")
+        notifier.send(alerts)
+        sent += len(alerts)
+
+    logger.info(f"Sent {sent} price alerts for {len(changes)} changed prices")
+    return sent
+
+def get_price_changes(since):
+    """
+    Get the latest price of every product whose price changed since a time.
+
+    Returns:
+        dict: Mapping of product ID to its latest price
+    """
+    query = """
+    SELECT product_id, price
+    FROM price_history
+    WHERE ts >= %s
+    ORDER BY ts
+    """
+    rows = execute_query(query, (since,), query_class='batch') or []
+    return {row['product_id']: row['price'] for row in rows}
+
+if __name__ == '__main__':
+    import argparse
+    from datetime import datetime
+
+    parser = argparse.ArgumentParser(description='Send price-drop alerts for recent price changes.')
+    parser.add_argument('--since', required=True, type=datetime.fromisoformat,
+                        help='Evaluate price changes recorded at or after this ISO datetime')
+    parser.add_argument('--notifier', help='Notifier to use (file, queue or log)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    notifier = get_notifier(args.notifier) if args.notifier else None
+    print(f"Sent {evaluate_price_drops(get_price_changes(args.since), notifier)} alerts")
\ No newline at end of file
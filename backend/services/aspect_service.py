@@ -0,0 +1,240 @@
+"""
+Aspect service module.
+Extracts ranked keywords/aspects per product from review text and serves them
+for product comparisons.
+"""
+import json
+import logging
+import math
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from ..config import ASPECT_TOP_N, ASPECT_CHUNK_SIZE, ASPECT_WORKERS
+from ..models import Review
+from ..utils.database import execute_query, group_by_review_shard, review_shards, scatter
+
+logger = logging.getLogger(__name__)
+
+# Review columns read for aspect extraction
+ASPECT_REVIEW_COLUMNS = ('product_id', 'rating', 'title', 'content')
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z'-]+")
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been
+before being below between both but by can can't cannot could couldn't did didn't do does
+doesn't doing don't down during each few for from further get got had hadn't has hasn't have
+haven't having he her here hers herself him himself his how i i'm i've if in into is isn't it
+it's its itself just let's like me more most much mustn't my myself no nor not now of off on
+once one only or other ought our ours ourselves out over own really same she should shouldn't
+so some such than that that's the their theirs them themselves then there there's these they
+they're this those through to too under until up use used using very was wasn't we we're
+well were weren't what what's when where which while who whom why will with won't would
+wouldn't you you're your yours yourself yourselves
+buy bought product item great good love loved works work nice would recommend amazon
+""".split())
+
+# Per-process document frequencies, set by the pool initializer
+_document_frequency = None
+_document_count = 0
+
+def extract_terms(text):
+    """
+    Tokenize review text into candidate aspect terms (unigrams and bigrams).
+
+    Args:
+        text (str): Review text
+
+    Returns:
+        list: List of terms in order of appearance
+    """
+    tokens = [t.strip("'-") for t in TOKEN_PATTERN.findall((text or '').lower())]
+    tokens = [t for t in tokens if len(t) > 2 and t not in STOP_WORDS]
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:]) if a != b]
+
+def _fetch_shard_reviews(shard, product_ids):
+    placeholders = ', '.join(['%s'] * len(product_ids))
+    query = f"""
+    SELECT {Review.select_list(columns=ASPECT_REVIEW_COLUMNS)}
+    FROM reviews
+    WHERE product_id IN ({placeholders})
+    """
+    rows = execute_query(query, list(product_ids), as_tuples=True, query_class='batch', shard=shard)
+    return Review.from_rows(rows, ASPECT_REVIEW_COLUMNS)
+
+def _fetch_reviews(product_ids):
+    """Fetch the reviews of a chunk of products, with ASPECT_REVIEW_COLUMNS set."""
+    results = scatter(_fetch_shard_reviews, group_by_review_shard(product_ids))
+    return [review for shard_reviews in results for review in shard_reviews]
+
+def _count_chunk_terms(product_ids):
+    """
+    Count the products each term appears in for one chunk of products.
+    Runs in a worker process.
+    """
+    terms_by_product = {}
+    for review in _fetch_reviews(product_ids):
+        text = f"{review['title'] or ''} {review['content'] or ''}"
+        terms_by_product.setdefault(review['product_id'], set()).update(extract_terms(text))
+
+    frequency = Counter()
+    for terms in terms_by_product.values():
+        frequency.update(terms)
+    return len(terms_by_product), frequency
+
+def _init_worker(document_frequency, document_count):
+    """Pool initializer that ships the global document frequencies once per worker."""
+    global _document_frequency, _document_count
+    _document_frequency = document_frequency
+    _document_count = document_count
+
+def rank_aspects(reviews, document_frequency, document_count, top_n=ASPECT_TOP_N):
+    """
+    Rank aspect terms for one product's reviews by TF-IDF.
+
+    Args:
+        reviews (list): Review dictionaries with rating, title and content
+        document_frequency (dict): Number of products each term appears in
+        document_count (int): Number of products with reviews
+        top_n (int): Number of aspects to keep
+
+    Returns:
+        list: List of aspect dictionaries with term, score, mentions and average rating
+    """
+    term_counts = Counter()
+    mentions = Counter()
+    rating_sums = Counter()
+
+    for review in reviews:
+        terms = extract_terms(f"{review['title'] or ''} {review['content'] or ''}")
+        term_counts.update(terms)
+        for term in set(terms):
+            mentions[term] += 1
+            rating_sums[term] += float(review['rating'] or 0)
+
+    scored = []
+    for term, count in term_counts.items():
+        # Ignore one-off terms, they are mostly noise
+        if mentions[term] < 2 and len(reviews) > 2:
+            continue
+        idf = math.log((1 + document_count) / (1 + document_frequency.get(term, 1))) + 1
+        scored.append((term, (1 + math.log(count)) * idf))
+
+    # Prefer bigrams over their own unigrams when scores tie
+    scored.sort(key=lambda x: (x[1], x[0].count(' ')), reverse=True)
+
+    # Drop terms whose words are all covered by higher ranked terms
+    aspects = []
+    covered = set()
+    for term, score in scored:
+        if covered.issuperset(term.split()):
+            continue
+        aspects.append({
+            'term': term,
+            'score': round(score, 3),
+            'mentions': mentions[term],
+            'average_rating': round(rating_sums[term] / mentions[term], 2)
+        })
+        covered.update(term.split())
+        if len(aspects) == top_n:
+            break
+
+    return aspects
+
+def _extract_chunk_aspects(product_ids):
+    """
+    Extract and store aspects for one chunk of products.
+    Runs in a worker process.
+    """
+    reviews_by_product = {}
+    for review in _fetch_reviews(product_ids):
+        reviews_by_product.setdefault(review['product_id'], []).append(review)
+
+    rows = []
+    for product_id, reviews in reviews_by_product.items():
+        aspects = rank_aspects(reviews, _document_frequency, _document_count)
+        rows.append((product_id, json.dumps(aspects, separators=(',', ':')), len(reviews)))
+
+    if rows:
+        query = """
+        INSERT INTO product_aspects (product_id, aspects, review_count)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+        aspects = VALUES(aspects),
+        review_count = VALUES(review_count)
+        """
+        execute_query(query, rows, fetch=False, many=True, query_class='batch')
+
+    return len(rows)
+
+def build_product_aspects(workers=ASPECT_WORKERS, chunk_size=ASPECT_CHUNK_SIZE):
+    """
+    Extract ranked aspects for every reviewed product and store them in product_aspects.
+
+    The job runs in two passes over chunks of products in a process pool: the first
+    collects document frequencies, the second ranks and stores each product's aspects.
+
+    Args:
+        workers (int): Number of worker processes
+        chunk_size (int): Number of products per chunk
+
+    Returns:
+        int: Number of products processed
+    """
+    product_ids = []
+    for shard in review_shards():
+        rows = execute_query("SELECT DISTINCT product_id FROM reviews", query_class='batch', shard=shard) or []
+        product_ids.extend(row['product_id'] for row in rows)
+    if not product_ids:
+        return 0
+
+    chunks = [product_ids[i:i + chunk_size] for i in range(0, len(product_ids), chunk_size)]
+
+    document_frequency = Counter()
+    document_count = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for count, frequency in pool.map(_count_chunk_terms, chunks):
+            document_count += count
+            document_frequency.update(frequency)
+
+    # Terms seen in a single product can never be common, so they need not be shipped
+    document_frequency = {term: df for term, df in document_frequency.items() if df > 1}
+
+    processed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(document_frequency, document_count)) as pool:
+        for count in pool.map(_extract_chunk_aspects, chunks):
+            processed += count
+
+    logger.info(f"Extracted aspects for {processed} products")
+    return processed
+
+def get_aspects_for_products(product_ids):
+    """
+    Get the stored aspect summaries for multiple products.
+
+    Args:
+        product_ids (list): List of product IDs
+
+    Returns:
+        dict: Mapping of product ID to list of aspect dictionaries
+    """
+    if not product_ids:
+        return {}
+
+    placeholders = ', '.join(['%s'] * len(product_ids))
+    query = f"SELECT product_id, aspects FROM product_aspects WHERE product_id IN ({placeholders})"
+
+    rows = execute_query(query, list(product_ids)) or []
+    return {row['product_id']: json.loads(row['aspects'] or '[]') for row in rows}
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Extract ranked review aspects per product.')
+    parser.add_argument('--workers', type=int, default=ASPECT_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=ASPECT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"Processed {build_product_aspects(args.workers, args.chunk_size)} products")
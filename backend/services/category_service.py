@@ -3,10 +3,28 @@ Category service module.
 Handles business logic related to product categories.
 """
 import logging
-from ..utils.database import execute_query
+from ..utils.database import stream_query
+from ..utils.cache import cached
 
 logger = logging.getLogger(__name__)
 
+def split_category_string(category_str):
+    """
+    Split a raw category column value into individual categories.
+    
+    Args:
+        category_str (str): Category value, possibly containing commas or slashes
+    
+    Returns:
+        list: List of non-empty category names
+    """
+    if not category_str:
+        return []
+    
+    # Split by commas or slashes
+    return [c.strip() for c in category_str.replace('/', ',').split(',') if c.strip()]
+
+@cached()
 def get_all_categories():
     """
     Get all product categories.
@@ -20,34 +38,24 @@ def get_all_categories():
     ORDER BY category
     """
     
-    categories = execute_query(query)
-    
     # Process the results to split categories with commas
     result = []
-    if categories:
-        # Create a set to avoid duplicates
-        category_set = set()
-        
-        for category_dict in categories:
-            category_str = category_dict['category']
-            
-            # Skip if the category is None or empty
-            if not category_str:
-                continue
-                
-            # Split by commas or slashes
-            category_list = [c.strip() for c in category_str.replace('/', ',').split(',')]
-            
-            # Add each individual category
-            for category in category_list:
-                if category and category not in category_set:
-                    category_set.add(category)
-                    result.append({'category': category})
+    
+    # Create a set to avoid duplicates
+    category_set = set()
+    
+    for (category_str,) in stream_query(query, as_tuples=True, query_class='analytics'):
+        # Add each individual category
+        for category in split_category_string(category_str):
+            if category not in category_set:
+                category_set.add(category)
+                result.append({'category': category})
     
     # Sort the list by category name
     result.sort(key=lambda x: x['category'])
     return result
 
+@cached()
 def get_category_product_count():
     """
     Get count of products in each category.
@@ -63,29 +71,15 @@ def get_category_product_count():
     ORDER BY product_count DESC
     """
     
-    counts = execute_query(query)
-    
     # Process the results for categories with commas
     result = {}
-    if counts:
-        for count_dict in counts:
-            category_str = count_dict['category']
-            product_count = count_dict['product_count']
-            
-            # Skip if the category is None or empty
-            if not category_str:
-                continue
-                
-            # Split by commas or slashes
-            category_list = [c.strip() for c in category_str.replace('/', ',').split(',')]
-            
-            # Add count to each individual category
-            for category in category_list:
-                if category:
-                    if category in result:
-                        result[category] += product_count
-                    else:
-                        result[category] = product_count
+    for category_str, product_count in stream_query(query, as_tuples=True, query_class='analytics'):
+        # Add count to each individual category
+        for category in split_category_string(category_str):
+            if category in result:
+                result[category] += product_count
+            else:
+                result[category] = product_count
     
     # Convert to list of dictionaries
     result_list = [{'category': k, 'product_count': v} for k, v in result.items()]
@@ -0,0 +1,246 @@
+"""
+Compared-with service module.
+Builds "frequently compared together" recommendations offline from the
+comparison history, and serves them with a single keyed read.
+
+Every pair of products compared together adds to a co-occurrence score. Older
+comparisons count less: a comparison's weight halves every
+COMPARED_WITH_HALF_LIFE_DAYS. The job is incremental. It only reads history
+rows newer than its watermark, adds them to the stored pair scores and
+recomputes the top neighbours of the products they touched. Touched products
+are stored with the scores, so neighbours left stale by a crash are
+recomputed on the next run.
+
+Run it with: python -m backend.services.compared_with_service
+"""
+import json
+import logging
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import combinations
+from ..config import COMPARED_WITH_HALF_LIFE_DAYS, COMPARED_WITH_TOP_N, COMPARED_WITH_FLUSH_PAIRS
+from ..utils.database import execute_query, execute_transaction, stream_query
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = 'compared_with'
+
+# Scores grow with time instead of old scores shrinking ("forward decay"), so
+# stored scores never need rewriting; they are relative to this reference time
+DECAY_REFERENCE = datetime(2024, 1, 1)
+DECAY_SECONDS = COMPARED_WITH_HALF_LIFE_DAYS * 86400 / math.log(2)
+
+# History rows younger than this may still belong to uncommitted transactions
+SETTLE_SECONDS = 60
+
+# Number of products per top-neighbour recomputation
+TOP_CHUNK_SIZE = 500
+
+def comparison_weight(created_at):
+    """Forward-decayed weight of a comparison made at created_at."""
+    return math.exp((created_at - DECAY_REFERENCE).total_seconds() / DECAY_SECONDS)
+
+def decayed_score(score, now):
+    """Turn a stored score into the decayed number of comparisons as of now."""
+    return score / comparison_weight(now)
+
+def pair_weights(comparisons):
+    """
+    Sum the decayed weights of every ordered product pair compared together.
+
+    Args:
+        comparisons (iterable): (created_at, list of product IDs) tuples
+
+    Returns:
+        Counter: Mapping of (product_id, other_id) to weight
+    """
+    pairs = Counter()
+    for created_at, product_ids in comparisons:
+        weight = comparison_weight(created_at)
+        for a, b in combinations(sorted(set(product_ids)), 2):
+            pairs[(a, b)] += weight
+            pairs[(b, a)] += weight
+    return pairs
+
+def _group_comparisons(rows):
+    """Group streamed (comparison_id, created_at, product_id) rows into comparisons."""
+    current_key = None
+    product_ids = []
+    for comparison_id, created_at, product_id in rows:
+        if (created_at, comparison_id) != current_key:
+            if current_key is not None:
+                yield current_key, product_ids
+            current_key = (created_at, comparison_id)
+            product_ids = []
+        product_ids.append(product_id)
+    if current_key is not None:
+        yield current_key, product_ids
+
+def get_watermark(job=JOB_NAME):
+    """
+    Position of the last history row a job has processed.
+
+    Returns:
+        tuple: (created_at, comparison_id), or (None, 0) if the job never ran
+    """
+    rows = execute_query(
+        "SELECT last_created_at, last_id FROM job_watermarks WHERE job = %s", (job,)
+    )
+    if not rows:
+        return None, 0
+    return rows[0]['last_created_at'], rows[0]['last_id']
+
+def get_pending():
+    """
+    Products whose neighbours must be recomputed.
+
+    Returns:
+        set: Product IDs
+    """
+    rows = execute_query("SELECT product_id FROM compared_with_pending", query_class='batch')
+    if rows is None:
+        raise RuntimeError("Could not read pending compared-with products")
+    return {row['product_id'] for row in rows}
+
+def _flush(pairs, watermark):
+    """
+    Add pair weights to the stored scores, mark their products as pending and
+    advance the watermark in one transaction.
+    """
+    statements = []
+    if pairs:
+        statements.append(("""
+        INSERT INTO product_co_comparisons (product_id, other_id, score)
+        VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE score = score + VALUES(score)
+        """, [(a, b, weight) for (a, b), weight in pairs.items()], True))
+        statements.append((
+            "INSERT IGNORE INTO compared_with_pending (product_id) VALUES (%s)",
+            [(product_id,) for product_id in sorted({a for a, _ in pairs})], True
+        ))
+    statements.append(("""
+    INSERT INTO job_watermarks (job, last_created_at, last_id)
+    VALUES (%s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+    last_created_at = VALUES(last_created_at),
+    last_id = VALUES(last_id)
+    """, (JOB_NAME, watermark[0], watermark[1])))
+    if not execute_transaction(statements, query_class='batch'):
+        raise RuntimeError("Could not store co-comparison scores")
+
+def update_top_neighbours(product_ids, now, top_n=COMPARED_WITH_TOP_N):
+    """
+    Recompute the stored top neighbours of the given products from their pair
+    scores, and clear them from the pending products.
+    """
+    product_ids = sorted(product_ids)
+    for i in range(0, len(product_ids), TOP_CHUNK_SIZE):
+        chunk = product_ids[i:i + TOP_CHUNK_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        query = f"""
+        SELECT product_id, other_id, score
+        FROM (
+            SELECT product_id, other_id, score,
+                   ROW_NUMBER() OVER (PARTITION BY product_id ORDER BY score DESC) as rank_num
+            FROM product_co_comparisons
+            WHERE product_id IN ({placeholders})
+        ) ranked
+        WHERE rank_num <= %s
+        ORDER BY product_id, score DESC
+        """
+        rows = execute_query(query, chunk + [top_n], query_class='batch')
+        if rows is None:
+            raise RuntimeError("Could not read co-comparison scores")
+
+        neighbours = {}
+        for row in rows:
+            neighbours.setdefault(row['product_id'], []).append({
+                'product_id': row['other_id'],
+                'score': round(decayed_score(row['score'], now), 3)
+            })
+
+        statements = []
+        if neighbours:
+            statements.append(("""
+            INSERT INTO product_compared_with (product_id, neighbours)
+            VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE neighbours = VALUES(neighbours)
+            """, [(pid, json.dumps(items)) for pid, items in neighbours.items()], True))
+        statements.append((
+            f"DELETE FROM compared_with_pending WHERE product_id IN ({placeholders})", chunk
+        ))
+        if not execute_transaction(statements, query_class='batch'):
+            raise RuntimeError("Could not store compared-with products")
+
+def build_compared_with(flush_pairs=COMPARED_WITH_FLUSH_PAIRS):
+    """
+    Process comparison history newer than the watermark.
+
+    Args:
+        flush_pairs (int): Number of distinct pairs to accumulate before writing
+
+    Returns:
+        int: Number of comparisons processed
+    """
+    now = datetime.now()
+    last_created_at, last_id = get_watermark()
+    settled = now - timedelta(seconds=SETTLE_SECONDS)
+
+    query = """
+    SELECT comparison_id, created_at, product_id
+    FROM comparison_history_products
+    WHERE created_at < %s
+    """
+    params = [settled]
+    if last_created_at is not None:
+        query += " AND (created_at > %s OR (created_at = %s AND comparison_id > %s))"
+        params += [last_created_at, last_created_at, last_id]
+    query += " ORDER BY created_at, comparison_id, position"
+
+    pairs = Counter()
+    processed = 0
+    watermark = None
+
+    for (created_at, comparison_id), product_ids in _group_comparisons(
+            stream_query(query, params, as_tuples=True)):
+        pairs.update(pair_weights([(created_at, product_ids)]))
+        processed += 1
+        watermark = (created_at, comparison_id)
+
+        if len(pairs) >= flush_pairs:
+            _flush(pairs, watermark)
+            pairs.clear()
+
+    if pairs:
+        _flush(pairs, watermark)
+    elif watermark is not None:
+        # Comparisons of a single product still move the watermark
+        _flush(Counter(), watermark)
+
+    # Includes products a crashed run flushed but did not recompute
+    touched = get_pending()
+    if touched:
+        update_top_neighbours(touched, now)
+
+    logger.info(f"Processed {processed} comparisons, updated {len(touched)} products")
+    return processed
+
+def get_compared_with(product_id):
+    """
+    Get the products most often compared with a product.
+
+    Args:
+        product_id (str): Product ID
+
+    Returns:
+        list: List of dictionaries with product_id and score, best first
+    """
+    rows = execute_query(
+        "SELECT neighbours FROM product_compared_with WHERE product_id = %s", (product_id,)
+    )
+    return json.loads(rows[0]['neighbours']) if rows else []
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    print(f"Processed {build_compared_with()} comparisons")
\ No newline at end of file
@@ -3,24 +3,46 @@ Comparison service module.
 Handles business logic related to product comparisons.
 """
 import logging
-from ..utils.database import execute_query
+import numpy as np
+from ..config import COMPARE_MAX_PRODUCTS
+from ..utils.database import execute_query, execute_transaction
 from .product_service import get_products_by_ids
 from .review_service import get_reviews_for_products
+from .aspect_service import get_aspects_for_products
 
 logger = logging.getLogger(__name__)
 
-def compare_products(product_ids):
+# Columns of the score matrix, and whether a higher raw value is better
+METRICS = ('price', 'rating', 'discount', 'review_count', 'value')
+HIGHER_IS_BETTER = np.array([False, True, True, True, False])
+
+DEFAULT_WEIGHTS = {'price': 0.3, 'rating': 0.3, 'discount': 0.1, 'review_count': 0.2, 'value': 0.1}
+
+class InvalidWeightsError(ValueError):
+    """Raised when the metric weights of a comparison are invalid."""
+
+def compare_products(product_ids, weights=None):
     """
     Compare multiple products and their reviews.
     
     Args:
         product_ids (list): List of product IDs to compare
+        weights (dict): Weight of each metric in the overall score (see
+            normalize_weights); DEFAULT_WEIGHTS if None
     
     Returns:
         dict: Dictionary with products and comparison data
+    
+    Raises:
+        InvalidWeightsError: If the weights are invalid
     """
     if not product_ids or len(product_ids) < 2:
         return {'error': 'At least two product IDs are required for comparison'}
+    if len(product_ids) > COMPARE_MAX_PRODUCTS:
+        return {'error': f'At most {COMPARE_MAX_PRODUCTS} products can be compared at once'}
+    
+    # Fail before any database work on bad weights
+    weights = normalize_weights(weights)
     
     # Get product information
     products = get_products_by_ids(product_ids)
@@ -38,23 +60,197 @@ def compare_products(product_ids):
             reviews_by_product[product_id] = []
         reviews_by_product[product_id].append(review)
     
-    # Add reviews to each product
-    for product in products:
-        product_id = product['product_id']
-        product['reviews'] = reviews_by_product.get(product_id, [])
+    # Get precomputed review aspect summaries
+    aspects = get_aspects_for_products(product_ids)
+    
+    # Add reviews and aspects to a copy of each product
+    products = [
+        dict(product, reviews=reviews_by_product.get(product['product_id'], []),
+             aspects=aspects.get(product['product_id'], []))
+        for product in products
+    ]
     
     # Calculate additional comparison metrics
-    comparison_data = calculate_comparison_metrics(products)
+    matrix = score_matrix(products, weights)
+    comparison_data = comparison_winners(matrix)
+    comparison_data['matrix'] = matrix_to_json(matrix)
     
     return {
         'products': products,
         'comparison': comparison_data
     }
 
+def normalize_weights(weights=None):
+    """
+    Validate metric weights and scale them to sum to 1.
+    
+    Args:
+        weights (dict): Mapping of metric name to a non-negative weight; missing
+            metrics weigh 0. DEFAULT_WEIGHTS if None
+    
+    Returns:
+        numpy.ndarray: Weights in METRICS order
+    
+    Raises:
+        InvalidWeightsError: If a metric is unknown, a weight is negative or all are 0
+    """
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    unknown = set(weights) - set(METRICS)
+    if unknown:
+        raise InvalidWeightsError(f"Unknown metrics in weights: {', '.join(sorted(unknown))}")
+    
+    try:
+        vector = np.array([float(weights.get(metric, 0)) for metric in METRICS])
+    except (TypeError, ValueError):
+        vector = np.array([np.nan])
+    if (vector < 0).any() or not np.isfinite(vector).all():
+        raise InvalidWeightsError("Weights must be non-negative numbers")
+    if vector.sum() == 0:
+        raise InvalidWeightsError("At least one weight must be positive")
+    return vector / vector.sum()
+
+def metric_columns(products):
+    """
+    Raw metric values of the products as an (n products, n metrics) array.
+    
+    Missing prices and ratings are NaN, as are the metrics derived from them.
+    The review count is the product's rating count, or the number of its
+    loaded reviews if unknown.
+    """
+    raw = np.array([
+        (
+            product['price'] if product['price'] else np.nan,
+            product['original_price'] if product['original_price'] else np.nan,
+            product['rating'] if product['rating'] else np.nan,
+            product['rating_count'] if product.get('rating_count') is not None else len(product.get('reviews', []))
+        )
+        for product in products
+    ], dtype=float).reshape(-1, 4)
+    price, original_price, rating, review_count = raw.T
+    
+    # A missing or lower original price means no discount
+    discount = np.where(original_price > price, (original_price - price) / original_price * 100, 0.0)
+    discount[np.isnan(price)] = np.nan
+    
+    # Price per rating point
+    value = price / rating
+    
+    return np.column_stack([price, rating, discount, review_count, value])
+
+def score_matrix(products, weights=None):
+    """
+    Score every product on every metric with array operations over the metric columns.
+    
+    Each metric is min-max normalized across the compared products to a score
+    between 0 (worst) and 1 (best); review counts on a log scale. Ranks start at
+    1 for the best product, with ties sharing a rank. The overall score is the
+    weighted sum of the metric scores, a missing metric scoring 0.
+    
+    Args:
+        products (list): List of product dictionaries
+        weights (numpy.ndarray or dict): Metric weights, see normalize_weights
+    
+    Returns:
+        dict: product_ids, metrics, weights, values, scores and ranks
+            (n products x n metrics arrays), overall_scores and overall_ranks
+    """
+    if not isinstance(weights, np.ndarray):
+        weights = normalize_weights(weights)
+    
+    values = metric_columns(products)
+    oriented = values.copy()
+    review_count = METRICS.index('review_count')
+    oriented[:, review_count] = np.log1p(oriented[:, review_count])
+    oriented[:, ~HIGHER_IS_BETTER] *= -1
+    
+    # fmin/fmax skip NaN, and give NaN for a metric no product has
+    low = np.fmin.reduce(oriented, axis=0)
+    spread = np.fmax.reduce(oriented, axis=0) - low
+    # When all products tie on a metric they all score 1
+    scores = np.where(spread > 0, (oriented - low) / np.where(spread > 0, spread, 1), 1.0)
+    scores[np.isnan(oriented)] = np.nan
+    
+    overall = np.nan_to_num(scores) @ weights
+    
+    return {
+        'product_ids': [product['product_id'] for product in products],
+        'metrics': METRICS,
+        'weights': weights,
+        'values': values,
+        'scores': scores,
+        'ranks': _ranks(scores),
+        'overall_scores': overall,
+        'overall_ranks': _ranks(overall[:, None])[:, 0]
+    }
+
+def _ranks(scores):
+    """
+    Rank 1 + the number of products scoring strictly better, per column; NaN stays NaN.
+    
+    Scores lie between 0 and 1, so shifting column j by 3 * j keeps the columns
+    apart and all of them are ranked with a single sort and binary search.
+    """
+    n, columns = scores.shape
+    shifted = np.where(np.isnan(scores), -1.0, scores) + 3.0 * np.arange(columns)
+    # Elements at or below each score, counting the whole columns to its left
+    at_or_below = np.searchsorted(np.sort(shifted, axis=None), shifted, side='right')
+    better = n * (np.arange(columns) + 1) - at_or_below
+    return np.where(np.isnan(scores), np.nan, better + 1)
+
+def comparison_winners(matrix):
+    """
+    The best product on each metric and overall.
+    
+    A metric has no winner when no product has a value for it, or when the best
+    rating, discount or review count is 0.
+    
+    Returns:
+        dict: Mapping of '<metric>_winner' and 'overall_winner' to a product ID or None
+    """
+    product_ids = matrix['product_ids']
+    winners = {}
+    for column, metric in enumerate(matrix['metrics']):
+        scores = matrix['scores'][:, column]
+        winner = None
+        if not np.isnan(scores).all():
+            best = int(np.nanargmax(scores))
+            if not HIGHER_IS_BETTER[column] or matrix['values'][best, column] > 0:
+                winner = product_ids[best]
+        winners[f"{metric}_winner"] = winner
+    
+    overall = matrix['overall_scores']
+    winners['overall_winner'] = product_ids[int(np.argmax(overall))] if len(overall) else None
+    return winners
+
+def matrix_to_json(matrix, decimals=4):
+    """Convert a score matrix to JSON-serializable lists, NaN becoming None."""
+    def to_list(array):
+        rounded = np.round(array.astype(float), decimals)
+        return np.where(np.isnan(rounded), None, rounded).tolist()
+    
+    def to_rank_list(array):
+        if array.ndim > 1:
+            return [to_rank_list(row) for row in array]
+        return [None if np.isnan(rank) else int(rank) for rank in array]
+    
+    return {
+        'product_ids': matrix['product_ids'],
+        'metrics': list(matrix['metrics']),
+        'weights': dict(zip(matrix['metrics'], to_list(matrix['weights']))),
+        'values': to_list(matrix['values']),
+        'scores': to_list(matrix['scores']),
+        'ranks': to_rank_list(matrix['ranks']),
+        'overall_scores': to_list(matrix['overall_scores']),
+        'overall_ranks': to_rank_list(matrix['overall_ranks'])
+    }
+
 def calculate_comparison_metrics(products):
     """
     Calculate various metrics for comparing products.
     
+    Per-product loop kept as the reference for benchmarks/bench_comparison_matrix.py;
+    compare_products uses score_matrix and comparison_winners.
+    
     Args:
         products (list): List of products with their reviews
     
@@ -129,17 +325,46 @@ def save_comparison_history(session_id, product_ids):
     Returns:
         bool: True if saved successfully, False otherwise
     """
+    # Both tables get the same created_at so their rows share a partition
+    query_timestamp = "SET @created_at = CURRENT_TIMESTAMP"
+    
     query = """
-    INSERT INTO comparison_history 
-    (session_id, product_ids)
-    VALUES (%s, %s)
+    INSERT INTO comparison_history (session_id, created_at)
+    VALUES (%s, @created_at)
+    """
+    
+    # LAST_INSERT_ID() refers to the comparison row inserted above
+    query_products = """
+    INSERT INTO comparison_history_products
+    (comparison_id, position, product_id, created_at)
+    VALUES (LAST_INSERT_ID(), %s, %s, @created_at)
     """
     
-    # Convert list to comma-separated string
-    product_ids_str = ','.join(product_ids)
+    product_rows = [(position, product_id) for position, product_id in enumerate(product_ids)]
     
-    result = execute_query(query, (session_id, product_ids_str), fetch=False)
-    return result is not None
+    return execute_transaction([
+        (query_timestamp, None),
+        (query, (session_id,)),
+        (query_products, product_rows, True)
+    ])
+
+def _group_history_rows(rows):
+    """Group (comparison, product) join rows into history records with product_ids lists."""
+    history = []
+    by_id = {}
+    for row in rows:
+        item = by_id.get(row['comparison_id'])
+        if item is None:
+            item = {
+                'comparison_id': row['comparison_id'],
+                'session_id': row['session_id'],
+                'created_at': row['created_at'],
+                'product_ids': []
+            }
+            by_id[row['comparison_id']] = item
+            history.append(item)
+        item['product_ids'].append(row['product_id'])
+    return history
 
 def get_comparison_history(session_id, limit=10):
     """
@@ -152,19 +377,49 @@ def get_comparison_history(session_id, limit=10):
     Returns:
         list: List of comparison history records
     """
+    # The derived table is a range scan on (session_id, created_at)
     query = """
-    SELECT * FROM comparison_history
-    WHERE session_id = %s
-    ORDER BY created_at DESC
-    LIMIT %s
+    SELECT h.comparison_id, h.session_id, h.created_at, p.product_id
+    FROM (
+        SELECT comparison_id, session_id, created_at
+        FROM comparison_history
+        WHERE session_id = %s
+        ORDER BY created_at DESC
+        LIMIT %s
+    ) h
+    JOIN comparison_history_products p
+        ON p.comparison_id = h.comparison_id AND p.created_at = h.created_at
+    ORDER BY h.created_at DESC, h.comparison_id DESC, p.position
     """
     
-    history = execute_query(query, (session_id, limit))
+    rows = execute_query(query, (session_id, limit))
+    return _group_history_rows(rows or [])
+
+def get_comparisons_for_product(product_id, limit=100):
+    """
+    Get the most recent comparisons that included a product.
+    
+    Args:
+        product_id (str): Product ID to look up
+        limit (int): Maximum number of comparisons to return
     
-    # Process the results
-    if history:
-        for item in history:
-            if 'product_ids' in item and item['product_ids']:
-                item['product_ids'] = item['product_ids'].split(',')
+    Returns:
+        list: List of comparison history records, newest first
+    """
+    query = """
+    SELECT h.comparison_id, h.session_id, h.created_at, p.product_id
+    FROM (
+        SELECT comparison_id, created_at
+        FROM comparison_history_products
+        WHERE product_id = %s
+        ORDER BY comparison_id DESC
+        LIMIT %s
+    ) c
+    JOIN comparison_history h ON h.comparison_id = c.comparison_id AND h.created_at = c.created_at
+    JOIN comparison_history_products p
+        ON p.comparison_id = c.comparison_id AND p.created_at = c.created_at
+    ORDER BY h.comparison_id DESC, p.position
+    """
     
-    return history or []
\ No newline at end of file
+    rows = execute_query(query, (product_id, limit))
+    return _group_history_rows(rows or [])
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Export service module.
+Streams full-table exports of products and reviews as NDJSON or CSV.
+"""
+import csv
+import io
+import logging
+from itertools import chain
+from ..models import Product, Review
+from ..utils.database import review_shard, review_shards, stream_query
+from ..utils.json_provider import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_COLUMNS = list(Product.COLUMNS)
+
+REVIEW_COLUMNS = list(Review.COLUMNS)
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+# Number of rows serialized into one chunk of the response body
+ROWS_PER_CHUNK = 500
+
+def build_product_export_query(category=None, brand=None, min_price=None, max_price=None, min_rating=None):
+    """
+    Build the products export query and parameters for the given filters.
+
+    Returns:
+        tuple: (query string, parameter list)
+    """
+    query = f"SELECT {', '.join(PRODUCT_COLUMNS)} FROM products WHERE 1=1"
+    params = []
+
+    if category:
+        query += " AND category LIKE %s"
+        params.append(f"%{category}%")
+
+    if brand:
+        query += " AND brand = %s"
+        params.append(brand)
+
+    if min_price is not None:
+        query += " AND price >= %s"
+        params.append(float(min_price))
+
+    if max_price is not None:
+        query += " AND price <= %s"
+        params.append(float(max_price))
+
+    if min_rating is not None:
+        query += " AND rating >= %s"
+        params.append(float(min_rating))
+
+    return query, params
+
+def build_review_export_query(product_id=None, min_rating=None, since=None):
+    """
+    Build the reviews export query and parameters for the given filters.
+
+    Returns:
+        tuple: (query string, parameter list)
+    """
+    query = f"SELECT {', '.join(REVIEW_COLUMNS)} FROM reviews WHERE 1=1"
+    params = []
+
+    if product_id:
+        query += " AND product_id = %s"
+        params.append(product_id)
+
+    if min_rating is not None:
+        query += " AND rating >= %s"
+        params.append(float(min_rating))
+
+    if since:
+        query += " AND date >= %s"
+        params.append(since)
+
+    return query, params
+
+def _stream_ndjson(rows):
+    """Serialize rows as newline-delimited JSON, one chunk per ROWS_PER_CHUNK rows."""
+    lines = []
+    for row in rows:
+        lines.append(dumps_bytes(row))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+def _stream_csv(batches, columns):
+    """Serialize batches of tuple rows as CSV with a header line, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_export(query, params, columns, export_format='ndjson', shards=(None,)):
+    """
+    Stream the results of an export query in the requested format.
+
+    Args:
+        query (str): Export query
+        params (list): Query parameters
+        columns (list): Column order for CSV output
+        export_format (str): Either 'ndjson' or 'csv'
+        shards (iterable): Databases to read from one after the other, None being
+            the main database
+
+    Returns:
+        generator: Generator of response body chunks
+    """
+    if export_format == 'csv':
+        # Tuple rows already follow the SELECT column order
+        batches = chain.from_iterable(
+            stream_query(query, params, batch_size=ROWS_PER_CHUNK, batches=True, as_tuples=True, shard=shard)
+            for shard in shards
+        )
+        return _stream_csv(batches, columns)
+    return _stream_ndjson(chain.from_iterable(stream_query(query, params, shard=shard) for shard in shards))
+
+def export_products(export_format='ndjson', **filters):
+    """Stream all products matching the filters."""
+    query, params = build_product_export_query(**filters)
+    return stream_export(query, params, PRODUCT_COLUMNS, export_format)
+
+def export_reviews(export_format='ndjson', **filters):
+    """Stream all reviews matching the filters."""
+    query, params = build_review_export_query(**filters)
+    product_id = filters.get('product_id')
+    shards = [review_shard(product_id)] if product_id else review_shards()
+    return stream_export(query, params, REVIEW_COLUMNS, export_format, shards)
@@ -0,0 +1,169 @@
+"""
+Job service module.
+Registers the derived-data refreshes with the background job scheduler and
+reports their run history.
+
+The web app runs the scheduler when JOB_SCHEDULER_ENABLED is set. It can also
+run in a dedicated worker process, which is better for the heavy rebuilds:
+python -m backend.services.job_service [--run JOB] [--list]
+"""
+import logging
+from ..config import CACHE_TTL, JOB_RUN_RETENTION_DAYS
+from ..utils.cache import cached_functions, load_hot_keys, refresh
+from ..utils.database import execute_query
+from ..utils.scheduler import Job, Scheduler
+from . import (
+    aspect_service, category_service, compared_with_service, price_history_service, product_service,
+    retention_service, similarity_service, suggest_service
+)
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+IMPORT_COMPLETED = 'import_completed'
+
+def refresh_caches():
+    """
+    Recompute the shared and most requested cached results before they expire.
+
+    A failed recomputation returns None or raises, and the cached value is kept.
+    """
+    refreshed = 0
+    for func in (category_service.get_all_categories, category_service.get_category_product_count,
+                 product_service.get_top_discounted_products):
+        try:
+            if refresh(func) is not None:
+                refreshed += 1
+        except Exception as e:
+            logger.warning(f"Error refreshing {func.cache_prefix}: {e}")
+
+    for entry in load_hot_keys():
+        func = cached_functions.get(entry['function'])
+        if func is None:
+            continue
+        try:
+            if refresh(func, *entry['args'], **entry['kwargs']) is not None:
+                refreshed += 1
+        except Exception as e:
+            logger.warning(f"Error refreshing {entry['function']}{tuple(entry['args'])}: {e}")
+    return refreshed
+
+def prune_job_history(retention_days=JOB_RUN_RETENTION_DAYS):
+    """Delete job runs and events older than the retention period."""
+    for table in ('job_runs', 'job_events'):
+        column = 'started_at' if table == 'job_runs' else 'created_at'
+        execute_query(
+            f"DELETE FROM {table} WHERE {column} < NOW() - INTERVAL %s DAY",
+            (retention_days,), fetch=False, query_class='batch'
+        )
+
+JOBS = [
+    Job('retention', retention_service.run_retention, every=DAY, lease_seconds=10 * 60),
+    Job('price_rollups', price_history_service.run_rollups, every=DAY),
+    Job('compared_with', compared_with_service.build_compared_with, every=HOUR),
+    Job('similarity_index', similarity_service.build_similarity_index, after=[IMPORT_COMPLETED]),
+    Job('suggest_index', suggest_service.build_suggest_index, after=[IMPORT_COMPLETED]),
+    Job('aspects', aspect_service.build_product_aspects, after=[IMPORT_COMPLETED]),
+    Job('job_history_cleanup', prune_job_history, every=DAY),
+    # In-process caches exist on every instance, so each one refreshes its own
+    Job('refresh_caches', refresh_caches, every=max(CACHE_TTL * 0.8, 30), exclusive=False),
+]
+
+scheduler = Scheduler()
+for job in JOBS:
+    scheduler.register(job)
+
+def start_scheduler():
+    """Start running the registered jobs in this process."""
+    scheduler.start()
+
+def get_jobs():
+    """
+    Get the registered jobs with their schedule, lease and recent run statistics.
+
+    Returns:
+        list: List of job dictionaries, with durations over the last 7 days
+    """
+    stats = execute_query("""
+    SELECT job,
+           COUNT(*) as runs,
+           SUM(status = 'failed') as failures,
+           ROUND(AVG(duration_ms)) as avg_duration_ms,
+           MAX(duration_ms) as max_duration_ms,
+           MAX(started_at) as last_started_at
+    FROM job_runs
+    WHERE started_at >= NOW() - INTERVAL 7 DAY
+    GROUP BY job
+    """) or []
+    stats = {row['job']: row for row in stats}
+
+    leases = execute_query("SELECT job, owner, lease_until FROM job_leases WHERE lease_until > NOW(3)") or []
+    leases = {row['job']: row for row in leases}
+
+    jobs = []
+    for job in scheduler.jobs.values():
+        job_stats = stats.get(job.name, {})
+        lease = leases.get(job.name)
+        jobs.append({
+            'name': job.name,
+            'every_seconds': job.every,
+            'after': list(job.after),
+            'exclusive': job.exclusive,
+            'running_on': lease['owner'] if lease else None,
+            'runs_7d': job_stats.get('runs', 0),
+            'failures_7d': int(job_stats.get('failures') or 0),
+            'avg_duration_ms': job_stats.get('avg_duration_ms'),
+            'max_duration_ms': job_stats.get('max_duration_ms'),
+            'last_started_at': job_stats.get('last_started_at')
+        })
+    return jobs
+
+def get_job_runs(name, limit=20):
+    """
+    Get the most recent runs of a job.
+
+    Args:
+        name (str): Job name
+        limit (int): Maximum number of runs to return
+
+    Returns:
+        list: List of run dictionaries, newest first
+    """
+    query = """
+    SELECT run_id, node, trigger_reason, started_at, finished_at, duration_ms, status, result, error
+    FROM job_runs
+    WHERE job = %s
+    ORDER BY started_at DESC
+    LIMIT %s
+    """
+    return execute_query(query, (name, limit)) or []
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the background job scheduler.')
+    parser.add_argument('--run', metavar='JOB', choices=sorted(scheduler.jobs), help='Run one job now and exit')
+    parser.add_argument('--list', action='store_true', help='List the jobs and their recent runs')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.list:
+        for job in get_jobs():
+            print(f"{job['name']}: {job['runs_7d']} runs ({job['failures_7d']} failed) in 7 days, "
+                  f"avg {job['avg_duration_ms']} ms, last started {job['last_started_at']}")
+    elif args.run:
+        # A scheduler of its own, so no other due job starts in this process
+        single = Scheduler(workers=1)
+        single.register(scheduler.jobs[args.run])
+        single.run_job(args.run)
+        single.stop()
+        for run in get_job_runs(args.run, limit=1):
+            print(f"{args.run} {run['status']} in {run['duration_ms']} ms: {run['error'] or run['result']}")
+    else:
+        scheduler.start()
+        try:
+            scheduler.join()
+        except KeyboardInterrupt:
+            scheduler.stop()
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""
+Price history service module.
+Stores product price changes as a time series and answers range queries from
+raw points or from daily and weekly roll-ups, depending on the range.
+
+Raw points are written by import_data only when a product's price changes.
+Roll up completed days with: python -m backend.services.price_history_service
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+from itertools import groupby
+from .. import config
+from ..utils.database import execute_query, execute_transaction
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = ('raw', 'day', 'week')
+
+# Number of products per opening-price lookup
+LOOKUP_CHUNK_SIZE = 1000
+
+def _day_bucket(when):
+    return when.date() if isinstance(when, datetime) else when
+
+def _week_bucket(when):
+    day = _day_bucket(when)
+    return day - timedelta(days=day.weekday())
+
+BUCKET_FUNCTIONS = {'day': _day_bucket, 'week': _week_bucket}
+
+def downsample(items, bucket_of, opening=None):
+    """
+    Merge one product's time-ordered price items into buckets.
+
+    Prices are a step function, so the price carried into a bucket from the
+    previous one counts towards the bucket's min and max.
+
+    Args:
+        items (iterable): (time, min, max, last, last_original, points) tuples in time order
+        bucket_of (callable): Maps an item's time to the start date of its bucket
+        opening (Decimal): Price in effect before the first item, if known
+
+    Returns:
+        list: Dictionaries with bucket, min_price, max_price, last_price,
+            last_original_price and points, in time order
+    """
+    buckets = []
+    current = None
+    for when, low, high, last, last_original, points in items:
+        bucket = bucket_of(when)
+        if current is None or current['bucket'] != bucket:
+            carried = current['last_price'] if current else opening
+            current = {
+                'bucket': bucket,
+                'min_price': low if carried is None else min(low, carried),
+                'max_price': high if carried is None else max(high, carried),
+                'points': 0
+            }
+            buckets.append(current)
+        else:
+            current['min_price'] = min(current['min_price'], low)
+            current['max_price'] = max(current['max_price'], high)
+        current['last_price'] = last
+        current['last_original_price'] = last_original
+        current['points'] += points
+    return buckets
+
+def _rolled_up_to(resolution):
+    """First day not yet covered by a roll-up tier, or None if it was never run."""
+    rows = execute_query(
+        "SELECT rolled_up_to FROM price_history_rollup_state WHERE resolution = %s", (resolution,)
+    )
+    return rows[0]['rolled_up_to'] if rows else None
+
+def _upsert_rollups(resolution, buckets_by_product, rolled_up_to):
+    """Write roll-up rows and advance the tier's watermark in one transaction."""
+    rows = [
+        (product_id, resolution, b['bucket'], b['min_price'], b['max_price'],
+         b['last_price'], b['last_original_price'], b['points'])
+        for product_id, buckets in buckets_by_product.items()
+        for b in buckets
+    ]
+    statements = []
+    if rows:
+        statements.append(("""
+        INSERT INTO price_history_rollups
+        (product_id, resolution, bucket, min_price, max_price, last_price, last_original_price, points)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+        min_price = VALUES(min_price),
+        max_price = VALUES(max_price),
+        last_price = VALUES(last_price),
+        last_original_price = VALUES(last_original_price),
+        points = VALUES(points)
+        """, rows, True))
+    statements.append(("""
+    INSERT INTO price_history_rollup_state (resolution, rolled_up_to) VALUES (%s, %s)
+    ON DUPLICATE KEY UPDATE rolled_up_to = VALUES(rolled_up_to)
+    """, (resolution, rolled_up_to)))
+    return execute_transaction(statements, query_class='batch')
+
+def _opening_prices(product_ids, day):
+    """Last daily price of each product before day."""
+    openings = {}
+    for i in range(0, len(product_ids), LOOKUP_CHUNK_SIZE):
+        chunk = product_ids[i:i + LOOKUP_CHUNK_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        query = f"""
+        SELECT r.product_id, r.last_price
+        FROM price_history_rollups r
+        WHERE r.resolution = 'day' AND r.product_id IN ({placeholders})
+          AND r.bucket = (
+            SELECT MAX(r2.bucket) FROM price_history_rollups r2
+            WHERE r2.product_id = r.product_id AND r2.resolution = 'day' AND r2.bucket < %s
+          )
+        """
+        for row in execute_query(query, chunk + [day], query_class='batch') or []:
+            openings[row['product_id']] = row['last_price']
+    return openings
+
+def rollup_days(until):
+    """
+    Roll raw points of completed days up into daily buckets, one day at a time.
+
+    Args:
+        until (date): First day not to roll up (normally today)
+
+    Returns:
+        tuple: (first day rolled up, number of days rolled up)
+    """
+    day = _rolled_up_to('day')
+    if day is None:
+        rows = execute_query("SELECT MIN(ts) AS first_ts FROM price_history", query_class='batch')
+        if not rows or rows[0]['first_ts'] is None:
+            return until, 0
+        day = rows[0]['first_ts'].date()
+
+    first_day = day
+    while day < until:
+        query = """
+        SELECT product_id, ts, price, original_price
+        FROM price_history
+        WHERE ts >= %s AND ts < %s
+        ORDER BY product_id, ts
+        """
+        points = execute_query(query, (day, day + timedelta(days=1)), query_class='batch')
+        if points is None:
+            raise RuntimeError(f"Could not read price points for {day}")
+
+        openings = _opening_prices(sorted({p['product_id'] for p in points}), day)
+        buckets = {
+            product_id: downsample(
+                ((p['ts'], p['price'], p['price'], p['price'], p['original_price'], 1) for p in group),
+                _day_bucket, openings.get(product_id)
+            )
+            for product_id, group in groupby(points, key=lambda p: p['product_id'])
+        }
+        if not _upsert_rollups('day', buckets, day + timedelta(days=1)):
+            raise RuntimeError(f"Could not store daily price roll-ups for {day}")
+        day += timedelta(days=1)
+
+    return first_day, (day - first_day).days
+
+def rollup_weeks(since, until):
+    """
+    Recompute the weekly buckets touching [since, until) from the daily buckets.
+
+    A daily bucket already includes the price carried into its day, so weekly
+    buckets need no opening price.
+    """
+    week_start = _week_bucket(since)
+    query = """
+    SELECT product_id, bucket, min_price, max_price, last_price, last_original_price, points
+    FROM price_history_rollups
+    WHERE resolution = 'day' AND bucket >= %s AND bucket < %s
+    ORDER BY product_id, bucket
+    """
+    days = execute_query(query, (week_start, until), query_class='batch')
+    if days is None:
+        raise RuntimeError("Could not read daily price roll-ups")
+
+    buckets = {
+        product_id: downsample(
+            ((d['bucket'], d['min_price'], d['max_price'], d['last_price'],
+              d['last_original_price'], d['points']) for d in group),
+            _week_bucket
+        )
+        for product_id, group in groupby(days, key=lambda d: d['product_id'])
+    }
+    if not _upsert_rollups('week', buckets, until):
+        raise RuntimeError("Could not store weekly price roll-ups")
+    return sum(len(b) for b in buckets.values())
+
+def run_rollups(today=None):
+    """
+    Roll up all completed days into the daily and weekly tiers.
+
+    Re-running is safe: buckets are overwritten and each tier keeps a
+    watermark of the first day it has not covered yet.
+
+    Returns:
+        dict: Number of days rolled up and weekly buckets written
+    """
+    today = today or date.today()
+    first_day, days = rollup_days(today)
+    weeks = rollup_weeks(first_day, today) if days else 0
+    logger.info(f"Rolled up {days} days of price history into {weeks} weekly buckets")
+    return {'days': days, 'weeks': weeks}
+
+def choose_resolution(start, end):
+    """Pick the coarsest tier that still gives a useful number of points for the range."""
+    span_days = (end - start).total_seconds() / 86400
+    if span_days <= config.PRICE_HISTORY_RAW_MAX_DAYS:
+        return 'raw'
+    if span_days <= config.PRICE_HISTORY_DAILY_MAX_DAYS:
+        return 'day'
+    return 'week'
+
+def _raw_points(product_id, start, end):
+    query = """
+    SELECT ts, price, original_price
+    FROM price_history
+    WHERE product_id = %s AND ts >= %s AND ts < %s
+    ORDER BY ts
+    """
+    return execute_query(query, (product_id, start, end)) or []
+
+def get_price_history(product_id, start, end, resolution='auto'):
+    """
+    Get a product's price history over a time range.
+
+    Daily and weekly requests are answered from the roll-up tables; only points
+    recorded since the last roll-up are read from the raw table.
+
+    Args:
+        product_id (str): Product ID
+        start (datetime): Start of the range (inclusive)
+        end (datetime): End of the range (exclusive)
+        resolution (str): 'raw', 'day', 'week' or 'auto' to pick one from the range
+
+    Returns:
+        dict: Dictionary with the resolution used and its points
+    """
+    if resolution == 'auto':
+        resolution = choose_resolution(start, end)
+
+    if resolution == 'raw':
+        return {'product_id': product_id, 'resolution': 'raw', 'points': _raw_points(product_id, start, end)}
+
+    bucket_of = BUCKET_FUNCTIONS[resolution]
+    rolled_up_to = datetime.combine(_rolled_up_to(resolution) or date.min, time.min)
+
+    query = """
+    SELECT bucket, min_price, max_price, last_price, last_original_price, points
+    FROM price_history_rollups
+    WHERE product_id = %s AND resolution = %s AND bucket >= %s AND bucket < %s
+    ORDER BY bucket
+    """
+    rolled = []
+    if start < rolled_up_to:
+        rolled = execute_query(query, (product_id, resolution, bucket_of(start), min(end, rolled_up_to))) or []
+
+    items = [
+        (r['bucket'], r['min_price'], r['max_price'], r['last_price'], r['last_original_price'], r['points'])
+        for r in rolled
+    ]
+    # Points recorded since the last roll-up are few and are bucketed on the fly
+    if end > rolled_up_to:
+        items.extend(
+            (p['ts'], p['price'], p['price'], p['price'], p['original_price'], 1)
+            for p in _raw_points(product_id, max(start, rolled_up_to), end)
+        )
+
+    return {'product_id': product_id, 'resolution': resolution, 'points': downsample(items, bucket_of)}
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    summary = run_rollups()
+    print(f"Rolled up {summary['days']} days into {summary['weeks']} weekly buckets")
\ No newline at end of file
@@ -3,7 +3,9 @@ Product service module.
 Handles business logic related to products.
 """
 import logging
+from ..models import Product
 from ..utils.database import execute_query
+from ..utils.cache import cached
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +24,7 @@ def get_all_products(category=None, min_price=None, max_price=None, min_rating=N
     Returns:
         list: List of product dictionaries
     """
-    query = "SELECT * FROM products WHERE 1=1"
+    query = f"SELECT {Product.select_list()} FROM products WHERE 1=1"
     params = []
     
     # Add filters if provided
@@ -47,9 +49,11 @@ def get_all_products(category=None, min_price=None, max_price=None, min_rating=N
     params.append(int(limit))
     params.append(int(offset))
     
-    products = execute_query(query, params)
+    # A category filter is a LIKE scan
+    products = execute_query(query, params, query_class='search' if category else 'default')
     return products or []
 
+@cached()
 def get_product_by_id(product_id):
     """
     Get a single product by ID.
@@ -60,7 +64,7 @@ def get_product_by_id(product_id):
     Returns:
         dict: Product information or None if not found
     """
-    query = "SELECT * FROM products WHERE product_id = %s"
+    query = f"SELECT {Product.select_list()} FROM products WHERE product_id = %s"
     params = (product_id,)
     
     result = execute_query(query, params)
@@ -80,11 +84,12 @@ def get_products_by_ids(product_ids):
         return []
         
     placeholders = ', '.join(['%s'] * len(product_ids))
-    query = f"SELECT * FROM products WHERE product_id IN ({placeholders})"
+    query = f"SELECT {Product.select_list()} FROM products WHERE product_id IN ({placeholders})"
     
     products = execute_query(query, product_ids)
     return products or []
 
+@cached()
 def get_top_discounted_products(limit=10):
     """
     Get products with the highest discount percentage.
@@ -93,7 +98,8 @@ def get_top_discounted_products(limit=10):
         limit (int): Maximum number of results to return
     
     Returns:
-        list: List of product dictionaries with discount information
+        list: List of product dictionaries with discount information, or None
+            if the query failed
     """
     query = """
     SELECT *, 
@@ -104,8 +110,7 @@ def get_top_discounted_products(limit=10):
     LIMIT %s
     """
     
-    products = execute_query(query, (limit,))
-    return products or []
+    return execute_query(query, (limit,))
 
 def search_products(search_term, limit=100, offset=0):
     """
@@ -119,8 +124,8 @@ def search_products(search_term, limit=100, offset=0):
     Returns:
         list: List of matching product dictionaries
     """
-    query = """
-    SELECT * FROM products 
+    query = f"""
+    SELECT {Product.select_list()} FROM products 
     WHERE title LIKE %s OR brand LIKE %s OR category LIKE %s
     ORDER BY rating DESC, price ASC
     LIMIT %s OFFSET %s
@@ -129,5 +134,5 @@ def search_products(search_term, limit=100, offset=0):
     search_pattern = f"%{search_term}%"
     params = (search_pattern, search_pattern, search_pattern, limit, offset)
     
-    products = execute_query(query, params)
+    products = execute_query(query, params, query_class='search')
     return products or []
\ No newline at end of file
@@ -0,0 +1,257 @@
+"""
+Retention service module.
+Maintains the monthly partitions of the append-only log tables: adds upcoming
+partitions, rolls expired ones up into daily aggregates and drops them.
+
+Expired data is only ever removed with ALTER TABLE ... DROP PARTITION, never
+with DELETE statements against the live tables.
+"""
+import logging
+from datetime import date, timedelta
+from .. import config
+from ..utils.database import execute_query, execute_transaction
+
+logger = logging.getLogger(__name__)
+
+FUTURE_PARTITION = 'p_future'
+
+def _rollup_comparisons(partition, day):
+    """
+    Roll one day of a comparison_history partition up into comparison_daily_stats.
+    Re-running a day overwrites its totals, so an interrupted cleanup never double counts.
+    """
+    query = f"""
+    INSERT INTO comparison_daily_stats (day, product_id, comparisons, sessions)
+    SELECT DATE(p.created_at), p.product_id, COUNT(*), COUNT(DISTINCT h.session_id)
+    FROM comparison_history_products PARTITION ({partition}) p
+    JOIN comparison_history PARTITION ({partition}) h
+        ON h.comparison_id = p.comparison_id AND h.created_at = p.created_at
+    WHERE p.created_at >= %s AND p.created_at < %s
+    GROUP BY DATE(p.created_at), p.product_id
+    ON DUPLICATE KEY UPDATE
+    comparisons = VALUES(comparisons),
+    sessions = VALUES(sessions)
+    """
+    return execute_transaction([(query, (day, day + timedelta(days=1)))], query_class='batch')
+
+def _rollup_searches(partition, day):
+    """Roll one day of a user_searches partition up into search_daily_stats."""
+    query = f"""
+    INSERT INTO search_daily_stats (day, search_term, searches, sessions)
+    SELECT DATE(created_at), LOWER(TRIM(search_term)), COUNT(*), COUNT(DISTINCT session_id)
+    FROM user_searches PARTITION ({partition})
+    WHERE created_at >= %s AND created_at < %s
+      AND search_term IS NOT NULL AND TRIM(search_term) != ''
+    GROUP BY DATE(created_at), LOWER(TRIM(search_term))
+    ON DUPLICATE KEY UPDATE
+    searches = VALUES(searches),
+    sessions = VALUES(sessions)
+    """
+    return execute_transaction([(query, (day, day + timedelta(days=1)))], query_class='batch')
+
+# (table, partitioning function, retention setting, roll-up function, parent table)
+# comparison_history is rolled up from both history tables, so it is processed
+# first, and comparison_history_products only drops months whose
+# comparison_history partition is gone.
+PARTITIONED_TABLES = [
+    ('comparison_history', 'UNIX_TIMESTAMP', 'RAW_LOG_RETENTION_DAYS', _rollup_comparisons, None),
+    ('comparison_history_products', 'UNIX_TIMESTAMP', 'RAW_LOG_RETENTION_DAYS', None, 'comparison_history'),
+    ('user_searches', 'UNIX_TIMESTAMP', 'RAW_LOG_RETENTION_DAYS', _rollup_searches, None),
+    ('comparison_daily_stats', 'TO_DAYS', 'AGGREGATE_RETENTION_DAYS', None, None),
+    ('search_daily_stats', 'TO_DAYS', 'AGGREGATE_RETENTION_DAYS', None, None),
+]
+
+def _month_start(day, months=0):
+    """Return the first day of the month that is `months` months after day's month."""
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def partition_name(month):
+    """Name of the partition holding a month's rows, e.g. p202610."""
+    return f"p{month.year:04d}{month.month:02d}"
+
+def partition_month(name):
+    """Parse the month from a partition name, or None for non-monthly partitions."""
+    if len(name) != 7 or not name[1:].isdigit():
+        return None
+    return date(int(name[1:5]), int(name[5:7]), 1)
+
+def get_partitions(table):
+    """
+    Get the partition names of a table in boundary order.
+
+    Args:
+        table (str): Table name
+
+    Returns:
+        list: List of partition names
+    """
+    query = """
+    SELECT PARTITION_NAME as partition_name
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+    ORDER BY PARTITION_ORDINAL_POSITION
+    """
+    rows = execute_query(query, (table,), query_class='batch') or []
+    return [row['partition_name'] for row in rows]
+
+def add_future_partitions(table, function, today, months_ahead, dry_run=False):
+    """
+    Split upcoming monthly partitions off the catch-all partition.
+
+    The catch-all partition only holds rows newer than the last monthly
+    partition, so for a maintained table the reorganization moves no data.
+    Months follow on from the last monthly partition, so after missed runs
+    each month still gets its own partition. On a table without monthly
+    partitions the first one starts at today's month and takes all older rows.
+
+    Returns:
+        list: Names of partitions added
+    """
+    existing = get_partitions(table)
+    months = [partition_month(name) for name in existing if partition_month(name)]
+    last_month = max(months) if months else None
+
+    month = _month_start(last_month, 1) if last_month else _month_start(today)
+    new_months = []
+    while month <= _month_start(today, months_ahead):
+        new_months.append(month)
+        month = _month_start(month, 1)
+    if not new_months or FUTURE_PARTITION not in existing:
+        return []
+
+    definitions = ', '.join(
+        f"PARTITION {partition_name(month)} VALUES LESS THAN "
+        f"({function}('{_month_start(month, 1).isoformat()}'))"
+        for month in new_months
+    )
+    query = f"""
+    ALTER TABLE {table} REORGANIZE PARTITION {FUTURE_PARTITION} INTO (
+        {definitions},
+        PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE
+    )
+    """
+
+    names = [partition_name(month) for month in new_months]
+    logger.info(f"Adding partitions {names} to {table}")
+    if not dry_run and not execute_transaction([(query, None)], query_class='batch'):
+        logger.error(f"Adding partitions to {table} failed")
+        return []
+    return names
+
+def _partition_start(table, name, previous):
+    """
+    First day holding rows of a monthly partition.
+
+    That is the month after the previous monthly partition, or for the first
+    partition, which holds everything older, the day of its oldest row.
+
+    Returns:
+        date: First day, None if the partition is empty, or False if the
+            oldest row could not be read
+    """
+    previous_month = partition_month(previous) if previous else None
+    if previous_month:
+        return _month_start(previous_month, 1)
+
+    rows = execute_query(
+        f"SELECT MIN(created_at) FROM {table} PARTITION ({name})", as_tuples=True, query_class='batch'
+    )
+    if not rows:
+        return False
+    oldest = rows[0][0]
+    return oldest.date() if oldest is not None else None
+
+def _rollup_partition(rollup, table, name, previous, month):
+    """Roll up a monthly partition one day at a time so every statement stays short."""
+    day = _partition_start(table, name, previous)
+    if day is False:
+        return False
+    if day is None:
+        return True
+    while day < _month_start(month, 1):
+        if not rollup(name, day):
+            return False
+        day += timedelta(days=1)
+    return True
+
+def drop_expired_partitions(table, retention_days, rollup, today, dry_run=False, keep=()):
+    """
+    Roll up and drop monthly partitions whose rows are all past retention.
+
+    Args:
+        keep (iterable): Names of partitions to keep even if expired
+
+    Returns:
+        list: Names of partitions dropped
+    """
+    cutoff = today - timedelta(days=retention_days)
+    dropped = []
+
+    previous = None
+    for name in get_partitions(table):
+        month = partition_month(name)
+        partition_previous, previous = previous, name
+        # A partition expires once every row in it (up to the month end) is past the cutoff
+        if month is None or _month_start(month, 1) > cutoff:
+            continue
+        if name in keep:
+            logger.warning(f"Keeping expired partition {table}.{name} until its parent table drops it")
+            continue
+
+        if not dry_run:
+            if rollup and not _rollup_partition(rollup, table, name, partition_previous, month):
+                logger.error(f"Roll-up of {table}.{name} failed, partition kept")
+                continue
+            if not execute_transaction([(f"ALTER TABLE {table} DROP PARTITION {name}", None)],
+                                       query_class='batch'):
+                logger.error(f"Dropping {table}.{name} failed, partition kept")
+                continue
+        
+        logger.info(f"{'Would drop' if dry_run else 'Dropped'} expired partition {table}.{name}")
+        dropped.append(name)
+
+    return dropped
+
+def run_retention(today=None, dry_run=False):
+    """
+    Run partition maintenance for all log tables.
+
+    Args:
+        today (date): Reference date (defaults to today)
+        dry_run (bool): Only report what would be changed
+
+    Returns:
+        dict: Mapping of table name to partitions added and dropped
+    """
+    today = today or date.today()
+    summary = {}
+
+    for table, function, retention_setting, rollup, parent in PARTITIONED_TABLES:
+        retention_days = getattr(config, retention_setting)
+        keep = ()
+        if parent:
+            # Months the parent still holds (after a failed roll-up or drop) are
+            # still needed to roll it up on a later run
+            keep = set(get_partitions(parent)) - set(summary[parent]['dropped'])
+            if not keep:
+                # The parent always has its catch-all partition, so it could not be read
+                logger.error(f"Could not read the partitions of {parent}, keeping {table}")
+                keep = set(get_partitions(table))
+        summary[table] = {
+            'added': add_future_partitions(table, function, today, config.PARTITION_MONTHS_AHEAD, dry_run),
+            'dropped': drop_expired_partitions(table, retention_days, rollup, today, dry_run, keep)
+        }
+
+    return summary
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Maintain log table partitions and retention.')
+    parser.add_argument('--dry-run', action='store_true', help='Only show what would change')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for table, actions in run_retention(dry_run=args.dry_run).items():
+        print(f"{table}: added {actions['added'] or 'none'}, dropped {actions['dropped'] or 'none'}")
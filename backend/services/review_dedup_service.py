@@ -0,0 +1,139 @@
+"""
+Review deduplication service module.
+Identifies reviews by a hash of their content so re-imports update reviews
+instead of duplicating them, and compacts tables that already hold duplicates.
+
+Compact an existing reviews table with:
+python -m backend.services.review_dedup_service [--batch-size N] [--pause SECONDS]
+"""
+import hashlib
+import logging
+import time
+from ..utils.database import execute_query, execute_transaction, review_shards
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+def review_content_hash(product_id, user_name, date, title, content):
+    """
+    Stable hash of the fields that identify a review.
+
+    Surrounding whitespace is ignored and missing values hash like empty ones,
+    so the same review from different dumps gets the same hash.
+
+    Returns:
+        str: 32 character hex digest
+    """
+    fields = (product_id, user_name, date, title, content)
+    key = '\x1f'.join('' if value is None else str(value).strip() for value in fields)
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+def _dedup_batch(rows, shard=None):
+    """
+    Hash one batch of unhashed reviews and delete those that are duplicates.
+
+    The lowest review_id of each set of duplicates is kept, with the highest
+    helpful vote count of the set.
+
+    Returns:
+        tuple: (reviews hashed, duplicates deleted), or None on a database error
+    """
+    by_hash = {}
+    for row in rows:
+        content_hash = review_content_hash(
+            row['product_id'], row['user_name'], row['date'], row['title'], row['content']
+        )
+        by_hash.setdefault(content_hash, []).append(row)
+
+    placeholders = ', '.join(['%s'] * len(by_hash))
+    existing = execute_query(
+        f"SELECT review_id, content_hash, helpful_votes FROM reviews WHERE content_hash IN ({placeholders})",
+        list(by_hash), query_class='batch', shard=shard
+    )
+    if existing is None:
+        return None
+    for row in existing:
+        by_hash[row['content_hash']].insert(0, row)
+
+    updates = []
+    deletes = []
+    for content_hash, duplicates in by_hash.items():
+        # A review hashed earlier wins, otherwise the lowest id in the batch
+        keeper = duplicates[0] if 'content_hash' in duplicates[0] else min(duplicates, key=lambda r: r['review_id'])
+        helpful_votes = max(r['helpful_votes'] or 0 for r in duplicates)
+        updates.append((content_hash, helpful_votes, keeper['review_id']))
+        deletes.extend((r['review_id'],) for r in duplicates if r['review_id'] != keeper['review_id'])
+
+    statements = []
+    if deletes:
+        # Duplicates go first so the keepers can take their hash
+        statements.append(("DELETE FROM reviews WHERE review_id = %s", deletes, True))
+    statements.append((
+        "UPDATE reviews SET content_hash = %s, helpful_votes = %s WHERE review_id = %s", updates, True
+    ))
+    if not execute_transaction(statements, query_class='batch', shard=shard):
+        return None
+    return len(rows), len(deletes)
+
+def deduplicate_reviews(batch_size=DEFAULT_BATCH_SIZE, pause=0.0, shard=None):
+    """
+    Backfill content hashes and remove duplicate reviews, one small batch at a time.
+
+    Each batch is its own short transaction over a review_id range, so the
+    table stays available while it runs. Interrupted runs resume where they
+    stopped, since only reviews without a hash are read.
+
+    Args:
+        batch_size (int): Reviews per batch
+        pause (float): Seconds to sleep between batches to leave room for other load
+        shard (int): Review shard to compact, or None for the main database.
+            Duplicates always share a shard, since they share a product
+
+    Returns:
+        dict: Number of reviews hashed and duplicates deleted
+    """
+    query = """
+    SELECT review_id, product_id, user_name, date, title, content, helpful_votes
+    FROM reviews
+    WHERE content_hash IS NULL AND review_id > %s
+    ORDER BY review_id
+    LIMIT %s
+    """
+    last_id = 0
+    hashed = 0
+    deleted = 0
+
+    while True:
+        rows = execute_query(query, (last_id, batch_size), query_class='batch', shard=shard)
+        if rows is None:
+            raise RuntimeError(f"Could not read reviews after review_id {last_id}")
+        if not rows:
+            break
+
+        result = _dedup_batch(rows, shard)
+        if result is None:
+            raise RuntimeError(f"Could not deduplicate reviews after review_id {last_id}")
+        hashed += result[0]
+        deleted += result[1]
+        last_id = rows[-1]['review_id']
+
+        logger.info(f"Deduplicated reviews up to review_id {last_id}: {deleted} duplicates removed so far")
+        if pause:
+            time.sleep(pause)
+
+    return {'hashed': hashed, 'deleted': deleted}
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Hash reviews and remove duplicates in small batches.')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for shard in review_shards():
+        summary = deduplicate_reviews(args.batch_size, args.pause, shard)
+        name = 'main database' if shard is None else f"shard {shard}"
+        print(f"{name}: hashed {summary['hashed']} reviews, deleted {summary['deleted']} duplicates")
\ No newline at end of file
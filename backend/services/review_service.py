@@ -1,9 +1,14 @@
 """
 Review service module.
 Handles business logic related to product reviews.
+
+Every query is for one product or a list of products, so it runs on the shard
+holding those products' reviews.
 """
 import logging
-from ..utils.database import execute_query
+from ..models import Review
+from ..utils.database import execute_query, group_by_review_shard, review_shard, review_shards, scatter, stream_query
+from ..utils.cache import cached
 
 logger = logging.getLogger(__name__)
 
@@ -19,14 +24,14 @@ def get_reviews_for_product(product_id, limit=10, offset=0):
     Returns:
         list: List of review dictionaries
     """
-    query = """
-    SELECT * FROM reviews
+    query = f"""
+    SELECT {Review.select_list()} FROM reviews
     WHERE product_id = %s
     ORDER BY helpful_votes DESC, date DESC
     LIMIT %s OFFSET %s
     """
     
-    reviews = execute_query(query, (product_id, limit, offset))
+    reviews = execute_query(query, (product_id, limit, offset), shard=review_shard(product_id))
     return reviews or []
 
 def get_reviews_for_products(product_ids, limit_per_product=5):
@@ -43,11 +48,24 @@ def get_reviews_for_products(product_ids, limit_per_product=5):
     if not product_ids:
         return []
     
+    # Each shard is queried for its own products in parallel
+    results = scatter(
+        lambda shard, ids: _get_shard_reviews(shard, ids, limit_per_product),
+        group_by_review_shard(product_ids)
+    )
+    reviews = [review for shard_reviews in results for review in shard_reviews]
+    if len(results) > 1:
+        # Stable sort keeps each product's reviews in their shard's order
+        reviews.sort(key=lambda review: review['product_id'])
+    return reviews
+
+def _get_shard_reviews(shard, product_ids, limit_per_product):
+    """Get the top reviews of products whose reviews are all on one shard."""
     # Create placeholders for SQL IN clause
     placeholders = ', '.join(['%s'] * len(product_ids))
     
     query = f"""
-    SELECT r.*
+    SELECT {Review.select_list('r')}
     FROM (
         SELECT 
             reviews.*,
@@ -62,9 +80,29 @@ def get_reviews_for_products(product_ids, limit_per_product=5):
     params = list(product_ids)
     params.append(limit_per_product)
     
-    reviews = execute_query(query, params)
+    reviews = execute_query(query, params, query_class='analytics', shard=shard)
     return reviews or []
 
+def get_review_counts():
+    """
+    Count the reviews of every product, across all review shards.
+    Used by the offline index builds, which read products from the main database.
+    
+    Returns:
+        dict: Mapping of product ID to its number of reviews, for products with reviews
+    """
+    counts = {}
+    for shard_counts in scatter(_get_shard_review_counts, {shard: None for shard in review_shards()}):
+        # A product's reviews are on two databases while a rebalance moves them
+        for product_id, count in shard_counts:
+            counts[product_id] = counts.get(product_id, 0) + count
+    return counts
+
+def _get_shard_review_counts(shard, _):
+    query = "SELECT product_id, COUNT(*) FROM reviews GROUP BY product_id"
+    return list(stream_query(query, as_tuples=True, query_class='batch', shard=shard))
+
+@cached()
 def get_review_statistics(product_id):
     """
     Get review statistics for a product.
@@ -73,7 +111,7 @@ def get_review_statistics(product_id):
         product_id (str): Product ID to get statistics for
     
     Returns:
-        dict: Dictionary with review statistics
+        dict: Dictionary with review statistics, or None if a query failed
     """
     query = """
     SELECT 
@@ -86,16 +124,11 @@ def get_review_statistics(product_id):
     WHERE product_id = %s
     """
     
-    result = execute_query(query, (product_id,))
+    shard = review_shard(product_id)
+    result = execute_query(query, (product_id,), query_class='analytics', shard=shard)
     
     if not result:
-        return {
-            'review_count': 0,
-            'average_rating': 0,
-            'positive_reviews': 0,
-            'negative_reviews': 0,
-            'average_sentiment': 0
-        }
+        return None
     
     stats = result[0]
     
@@ -110,22 +143,37 @@ def get_review_statistics(product_id):
     ORDER BY rating DESC
     """
     
-    distribution = execute_query(query_distribution, (product_id,))
+    distribution = execute_query(query_distribution, (product_id,), query_class='analytics', shard=shard)
+    if distribution is None:
+        return None
     
     rating_distribution = {5: 0, 4: 0, 3: 0, 2: 0, 1: 0}
-    if distribution:
-        for item in distribution:
-            rating = int(item['rating'])
-            if 1 <= rating <= 5:
-                rating_distribution[rating] = item['count']
+    for item in distribution:
+        rating = int(item['rating'])
+        if 1 <= rating <= 5:
+            rating_distribution[rating] = item['count']
     
     stats['rating_distribution'] = rating_distribution
     return stats
 
+def empty_review_statistics():
+    """Statistics shown when a product's reviews could not be read."""
+    return {
+        'review_count': 0,
+        'average_rating': 0,
+        'positive_reviews': 0,
+        'negative_reviews': 0,
+        'average_sentiment': 0
+    }
+
 def analyze_review_sentiment(product_id):
     """
     Analyze sentiment in reviews for a product.
     
+    Counts and the average come from one aggregate query, and the top reviews
+    from LIMIT queries on the (product_id, sentiment_score) index, so only the
+    six returned review bodies are transferred.
+    
     Args:
         product_id (str): Product ID to analyze reviews for
     
@@ -134,16 +182,19 @@ def analyze_review_sentiment(product_id):
     """
     query = """
     SELECT 
-        sentiment_score,
-        content
+        COUNT(sentiment_score) as review_count,
+        AVG(sentiment_score) as average_sentiment,
+        SUM(CASE WHEN sentiment_score >= 0.5 THEN 1 ELSE 0 END) as positive_count,
+        SUM(CASE WHEN sentiment_score <= -0.5 THEN 1 ELSE 0 END) as negative_count
     FROM reviews
     WHERE product_id = %s
-    ORDER BY sentiment_score
     """
     
-    reviews = execute_query(query, (product_id,))
+    shard = review_shard(product_id)
+    result = execute_query(query, (product_id,), query_class='analytics', shard=shard)
+    stats = result[0] if result else None
     
-    if not reviews:
+    if not stats or not stats['review_count']:
         return {
             'average_sentiment': 0,
             'positive_count': 0,
@@ -153,39 +204,37 @@ def analyze_review_sentiment(product_id):
             'top_negative': []
         }
     
-    # Categorize reviews by sentiment
-    positive_reviews = []
-    neutral_reviews = []
-    negative_reviews = []
-    
-    total_sentiment = 0
-    
-    for review in reviews:
-        sentiment = review['sentiment_score']
-        total_sentiment += sentiment
-        
-        if sentiment >= 0.5:
-            positive_reviews.append(review)
-        elif sentiment <= -0.5:
-            negative_reviews.append(review)
-        else:
-            neutral_reviews.append(review)
-    
-    # Sort by absolute sentiment score
-    positive_reviews.sort(key=lambda x: x['sentiment_score'], reverse=True)
-    negative_reviews.sort(key=lambda x: x['sentiment_score'])
+    positive_count = int(stats['positive_count'] or 0)
+    negative_count = int(stats['negative_count'] or 0)
     
     # Get top 3 positive and negative reviews
-    top_positive = positive_reviews[:3]
-    top_negative = negative_reviews[:3]
-    
-    average_sentiment = total_sentiment / len(reviews) if reviews else 0
+    top_positive = []
+    if positive_count:
+        query_positive = """
+        SELECT sentiment_score, content
+        FROM reviews
+        WHERE product_id = %s AND sentiment_score >= 0.5
+        ORDER BY sentiment_score DESC
+        LIMIT 3
+        """
+        top_positive = execute_query(query_positive, (product_id,), query_class='analytics', shard=shard) or []
+    
+    top_negative = []
+    if negative_count:
+        query_negative = """
+        SELECT sentiment_score, content
+        FROM reviews
+        WHERE product_id = %s AND sentiment_score <= -0.5
+        ORDER BY sentiment_score ASC
+        LIMIT 3
+        """
+        top_negative = execute_query(query_negative, (product_id,), query_class='analytics', shard=shard) or []
     
     return {
-        'average_sentiment': average_sentiment,
-        'positive_count': len(positive_reviews),
-        'neutral_count': len(neutral_reviews),
-        'negative_count': len(negative_reviews),
+        'average_sentiment': stats['average_sentiment'],
+        'positive_count': positive_count,
+        'neutral_count': stats['review_count'] - positive_count - negative_count,
+        'negative_count': negative_count,
         'top_positive': top_positive,
         'top_negative': top_negative
     }
\ No newline at end of file
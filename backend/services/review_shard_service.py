@@ -0,0 +1,142 @@
+"""
+Review shard service module.
+Moves reviews to the shard that should hold them: backfills the shards from the
+main database when sharding is first enabled, and rebalances after shards are
+added to the end of REVIEW_SHARDS.
+
+Each batch is upserted on its target shards by content_hash before it is
+deleted from its source, so an interrupted run can simply be started again.
+Reads follow the configured shards straight away, so reviews not moved yet are
+missing from the API until the run completes, never duplicated.
+
+Run it with: python -m backend.services.review_shard_service [--source main|N] [--batch-size N] [--dry-run]
+"""
+import logging
+import time
+from ..utils.database import execute_query, execute_transaction, review_shard, review_shards, scatter, shard_configs
+from .review_dedup_service import review_content_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+# review_id is per instance, so moved reviews get a new one on their target
+REVIEW_COLUMNS = (
+    'product_id', 'user_name', 'rating', 'title', 'content', 'helpful_votes', 'date',
+    'verified_purchase', 'sentiment_score', 'content_hash', 'created_at'
+)
+
+UPSERT_QUERY = f"""
+INSERT INTO reviews ({', '.join(REVIEW_COLUMNS)})
+VALUES ({', '.join(['%s'] * len(REVIEW_COLUMNS))})
+ON DUPLICATE KEY UPDATE
+rating = VALUES(rating),
+helpful_votes = GREATEST(helpful_votes, VALUES(helpful_votes)),
+sentiment_score = VALUES(sentiment_score)
+"""
+
+def misplaced_reviews(rows, source):
+    """
+    Group the reviews that belong on another shard by their target shard.
+
+    Args:
+        rows (list): Review dictionaries read from source
+        source (int): Shard the rows were read from, or None for the main database
+
+    Returns:
+        dict: Mapping of target shard to list of reviews
+    """
+    groups = {}
+    for row in rows:
+        target = review_shard(row['product_id'])
+        if target != source:
+            groups.setdefault(target, []).append(row)
+    return groups
+
+def _copy_reviews(shard, rows):
+    params = []
+    for row in rows:
+        # Unhashed reviews get their hash now, so a repeated run upserts them
+        content_hash = row['content_hash'] or review_content_hash(
+            row['product_id'], row['user_name'], row['date'], row['title'], row['content']
+        )
+        params.append(tuple(
+            content_hash if column == 'content_hash' else row[column] for column in REVIEW_COLUMNS
+        ))
+    return execute_transaction([(UPSERT_QUERY, params, True)], query_class='batch', shard=shard)
+
+def move_reviews(source, batch_size=DEFAULT_BATCH_SIZE, pause=0.0, dry_run=False):
+    """
+    Move every review of a database that belongs on another shard.
+
+    Args:
+        source (int): Shard to read from, or None for the main database
+        batch_size (int): Reviews read per batch
+        pause (float): Seconds to sleep between batches to leave room for other load
+        dry_run (bool): Only count the reviews that would move
+
+    Returns:
+        dict: Number of reviews scanned and moved
+    """
+    if not shard_configs:
+        raise ValueError("REVIEW_SHARDS is not configured")
+
+    query = f"""
+    SELECT review_id, {', '.join(REVIEW_COLUMNS)}
+    FROM reviews
+    WHERE review_id > %s
+    ORDER BY review_id
+    LIMIT %s
+    """
+    name = 'main database' if source is None else f"shard {source}"
+    last_id = 0
+    scanned = 0
+    moved = 0
+
+    while True:
+        rows = execute_query(query, (last_id, batch_size), query_class='batch', shard=source)
+        if rows is None:
+            raise RuntimeError(f"Could not read reviews from {name} after review_id {last_id}")
+        if not rows:
+            break
+        last_id = rows[-1]['review_id']
+        scanned += len(rows)
+
+        groups = misplaced_reviews(rows, source)
+        count = sum(len(group) for group in groups.values())
+        if groups and not dry_run:
+            if not all(scatter(_copy_reviews, groups)):
+                raise RuntimeError(f"Could not copy reviews from {name} up to review_id {last_id}")
+            ids = [(row['review_id'],) for group in groups.values() for row in group]
+            if not execute_transaction(
+                    [("DELETE FROM reviews WHERE review_id = %s", ids, True)], query_class='batch', shard=source):
+                raise RuntimeError(f"Could not delete moved reviews from {name} up to review_id {last_id}")
+        moved += count
+
+        logger.info(f"{name}: scanned up to review_id {last_id}, {moved} reviews to move so far")
+        if pause:
+            time.sleep(pause)
+
+    return {'scanned': scanned, 'moved': moved}
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Move reviews to the shards that should hold them.')
+    parser.add_argument('--source', help="'main' or a shard index (default: the main database and every shard)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+    parser.add_argument('--dry-run', action='store_true', help='Only count the reviews that would move')
+    args = parser.parse_args()
+
+    if args.source is None:
+        sources = [None] + review_shards()
+    else:
+        sources = [None if args.source == 'main' else int(args.source)]
+
+    logging.basicConfig(level=logging.INFO)
+    for source in sources:
+        summary = move_reviews(source, args.batch_size, args.pause, args.dry_run)
+        name = 'main database' if source is None else f"shard {source}"
+        verb = 'would move' if args.dry_run else 'moved'
+        print(f"{name}: scanned {summary['scanned']} reviews, {verb} {summary['moved']}")
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Similarity service module.
+Builds and queries the nearest-neighbour index used for "compare with..." suggestions.
+"""
+import logging
+import math
+import os
+import re
+import threading
+import zlib
+import numpy as np
+from ..config import SIMILARITY_INDEX_DIR, SIMILARITY_NPROBE
+from ..utils.database import execute_query
+from ..utils.vector_index import build_ivf_index, load_ivf_index, MANIFEST_FILE
+from .category_service import split_category_string
+from .product_service import get_products_by_ids
+from .review_service import get_review_counts
+
+logger = logging.getLogger(__name__)
+
+# Feature vector layout: [price, rating, review count | categories | title tokens]
+CATEGORY_DIMS = 32
+TITLE_DIMS = 64
+NUMERIC_WEIGHT = 0.5
+CATEGORY_WEIGHT = 0.6
+TITLE_WEIGHT = 0.6
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+def _bucket(value, dims):
+    """Map a string to a stable feature bucket (Python's hash() is salted per process)."""
+    return zlib.crc32(value.encode('utf-8')) % dims
+
+def _normalize(block):
+    """Scale a feature block to unit length."""
+    norm = np.linalg.norm(block)
+    return block / norm if norm > 0 else block
+
+def build_feature_vectors(products):
+    """
+    Build unit-length feature vectors for products.
+
+    Args:
+        products (list): Product dictionaries with title, category, price,
+            rating and review_count keys
+
+    Returns:
+        tuple: (list of product IDs, float32 ndarray of shape (n, dim))
+    """
+    ids = [p['product_id'] for p in products]
+    n = len(products)
+    dim = 3 + CATEGORY_DIMS + TITLE_DIMS
+    vectors = np.zeros((n, dim), dtype=np.float32)
+    if n == 0:
+        return ids, vectors
+
+    # Numeric features on a log scale, min-max normalized over the catalog
+    log_prices = np.array([math.log1p(float(p.get('price') or 0)) for p in products])
+    log_reviews = np.array([math.log1p(int(p.get('review_count') or 0)) for p in products])
+    ratings = np.array([float(p.get('rating') or 0) / 5.0 for p in products])
+
+    def min_max(values):
+        spread = values.max() - values.min()
+        return (values - values.min()) / spread if spread > 0 else np.zeros_like(values)
+
+    vectors[:, 0] = min_max(log_prices) * NUMERIC_WEIGHT
+    vectors[:, 1] = ratings * NUMERIC_WEIGHT
+    vectors[:, 2] = min_max(log_reviews) * NUMERIC_WEIGHT
+
+    # Document frequencies so that common title words carry less weight
+    title_tokens = [TOKEN_PATTERN.findall((p.get('title') or '').lower()) for p in products]
+    document_frequency = {}
+    for tokens in title_tokens:
+        for token in set(tokens):
+            document_frequency[token] = document_frequency.get(token, 0) + 1
+
+    for row, product in enumerate(products):
+        categories = np.zeros(CATEGORY_DIMS, dtype=np.float32)
+        for category in split_category_string(product.get('category')):
+            categories[_bucket(category.lower(), CATEGORY_DIMS)] = 1.0
+        vectors[row, 3:3 + CATEGORY_DIMS] = _normalize(categories) * CATEGORY_WEIGHT
+
+        title = np.zeros(TITLE_DIMS, dtype=np.float32)
+        for token in title_tokens[row]:
+            title[_bucket(token, TITLE_DIMS)] += math.log(n / document_frequency[token]) + 1.0
+        vectors[row, 3 + CATEGORY_DIMS:] = _normalize(title) * TITLE_WEIGHT
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return ids, vectors / norms
+
+def build_similarity_index(index_dir=SIMILARITY_INDEX_DIR):
+    """
+    Rebuild the similar-products index from the products table.
+    Intended to run offline, e.g. after each data import.
+
+    Args:
+        index_dir (str): Directory to write the index to
+
+    Returns:
+        int: Number of products indexed
+    """
+    query = """
+    SELECT product_id, title, category, price, rating, rating_count
+    FROM products
+    """
+
+    products = execute_query(query, query_class='batch') or []
+    if not products:
+        logger.warning("No products found, similarity index not rebuilt")
+        return 0
+
+    # Reviews may be on other databases than the products
+    review_counts = get_review_counts()
+    for product in products:
+        product['review_count'] = review_counts.get(product['product_id'], product['rating_count'] or 0)
+
+    ids, vectors = build_feature_vectors(products)
+    index = build_ivf_index(ids, vectors)
+    index.save(index_dir)
+    return len(ids)
+
+def get_similarity_index():
+    """
+    Get the loaded similarity index, reloading it if the files changed on disk.
+
+    Returns:
+        IVFIndex: Loaded index or None if it has not been built yet
+    """
+    global _index, _index_mtime
+
+    manifest_path = os.path.join(SIMILARITY_INDEX_DIR, MANIFEST_FILE)
+    try:
+        mtime = os.path.getmtime(manifest_path)
+    except OSError:
+        return _index
+
+    if _index is None or mtime != _index_mtime:
+        with _index_lock:
+            if _index is None or mtime != _index_mtime:
+                _index = load_ivf_index(SIMILARITY_INDEX_DIR)
+                _index_mtime = mtime
+                logger.info(f"Loaded similarity index with {len(_index or [])} products")
+
+    return _index
+
+def get_similar_products(product_id, k=10, with_details=True):
+    """
+    Get the products most similar to a given product.
+
+    Args:
+        product_id (str): Product ID to find neighbours for
+        k (int): Number of similar products to return
+        with_details (bool): Include full product rows in the results
+
+    Returns:
+        list: List of dictionaries with product_id, similarity and optionally
+            product fields, or None if the product is not in the index
+    """
+    index = get_similarity_index()
+    if index is None:
+        return None
+
+    query = index.vector_for(product_id)
+    if query is None:
+        return None
+
+    neighbours = index.search(query, k=k, nprobe=SIMILARITY_NPROBE, exclude=product_id)
+    results = [{'product_id': pid, 'similarity': round(score, 4)} for pid, score in neighbours]
+
+    if with_details and results:
+        products = {p['product_id']: p for p in get_products_by_ids([r['product_id'] for r in results])}
+        for result in results:
+            result.update(products.get(result['product_id'], {}))
+
+    return results
@@ -0,0 +1,132 @@
+"""
+Suggest service module.
+Builds and queries the in-memory prefix index behind search-as-you-type suggestions.
+"""
+import logging
+import math
+import os
+import threading
+from ..config import SUGGEST_INDEX_PATH
+from ..utils.database import stream_query
+from ..utils.prefix_index import PrefixIndex, normalize_text
+from .category_service import split_category_string
+from .review_service import get_review_counts
+
+logger = logging.getLogger(__name__)
+
+# Only the first few words of a title start a key, to bound the index size
+TITLE_KEY_WORDS = 6
+TITLE_KEY_LENGTH = 40
+
+_index = None
+_index_mtime = None
+_index_lock = threading.Lock()
+
+def product_weight(rating, review_count):
+    """Popularity weight of a product from its rating and number of reviews."""
+    return round((float(rating or 0) / 5.0 + 0.1) * math.log1p(int(review_count or 0) + 1), 4)
+
+def build_suggest_entries(products):
+    """
+    Build prefix index entries for product titles, brands and categories.
+
+    Args:
+        products (iterable): (product_id, title, brand, category, rating, review_count) tuples
+
+    Returns:
+        tuple: (list of (key, suggestion index, weight) entries, list of suggestions)
+    """
+    entries = []
+    suggestions = []
+    brand_weights = {}
+    category_weights = {}
+
+    for product_id, title, brand, category, rating, review_count in products:
+        weight = product_weight(rating, review_count)
+
+        if title:
+            target = len(suggestions)
+            suggestions.append({'text': title, 'type': 'product', 'product_id': product_id})
+            # Index the title from each of its first words so "echo" matches "Amazon Echo Dot"
+            words = normalize_text(title).split()
+            for i in range(min(len(words), TITLE_KEY_WORDS)):
+                entries.append((' '.join(words[i:])[:TITLE_KEY_LENGTH], target, weight))
+
+        if brand:
+            brand_weights[brand] = brand_weights.get(brand, 0) + weight
+
+        for name in split_category_string(category):
+            category_weights[name] = category_weights.get(name, 0) + weight
+
+    for kind, weights in (('brand', brand_weights), ('category', category_weights)):
+        for text, weight in weights.items():
+            entries.append((text, len(suggestions), round(weight, 4)))
+            suggestions.append({'text': text, 'type': kind})
+
+    return entries, suggestions
+
+def build_suggest_index(path=SUGGEST_INDEX_PATH):
+    """
+    Rebuild the suggestion index from the products table.
+    Intended to run offline, e.g. after each data import.
+
+    Args:
+        path (str): File to write the index to
+
+    Returns:
+        int: Number of keys indexed
+    """
+    query = """
+    SELECT product_id, title, brand, category, rating, rating_count
+    FROM products
+    """
+
+    review_counts = get_review_counts()
+    products = (
+        (product_id, title, brand, category, rating, review_counts.get(product_id, rating_count or 0))
+        for product_id, title, brand, category, rating, rating_count in stream_query(query, as_tuples=True)
+    )
+    entries, suggestions = build_suggest_entries(products)
+    index = PrefixIndex.build(entries, suggestions)
+    index.save(path)
+    return len(index)
+
+def get_suggest_index():
+    """
+    Get the loaded suggestion index, reloading it if the file changed on disk.
+
+    Returns:
+        PrefixIndex: Loaded index or None if it has not been built yet
+    """
+    global _index, _index_mtime
+
+    try:
+        mtime = os.path.getmtime(SUGGEST_INDEX_PATH)
+    except OSError:
+        return _index
+
+    if _index is None or mtime != _index_mtime:
+        with _index_lock:
+            if _index is None or mtime != _index_mtime:
+                _index = PrefixIndex.load(SUGGEST_INDEX_PATH)
+                _index_mtime = mtime
+                logger.info(f"Loaded suggestion index with {len(_index or [])} keys")
+
+    return _index
+
+def get_suggestions(prefix, k=10):
+    """
+    Get the top-k suggestions for a search prefix.
+
+    Args:
+        prefix (str): What the user has typed so far
+        k (int): Maximum number of suggestions
+
+    Returns:
+        list: List of suggestion dictionaries with text, type and product_id for products
+    """
+    index = get_suggest_index()
+    if index is None:
+        return []
+    # Title keys are cut at TITLE_KEY_LENGTH, so longer input must be cut the same way to match
+    return index.search(normalize_text(prefix)[:TITLE_KEY_LENGTH], k)
@@ -0,0 +1,111 @@
+"""
+Trending service module.
+Tracks the most compared and most viewed products over a sliding window in
+memory, fed by the compare and product detail endpoints, and never queries
+MySQL.
+
+Each worker process periodically writes its window counts to a file in
+TRENDING_DIR. Trending lists merge the counts of all live workers.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from ..config import (
+    TRENDING_DIR, TRENDING_WINDOW_SECONDS, TRENDING_BUCKETS, TRENDING_CAPACITY, TRENDING_FLUSH_INTERVAL
+)
+from ..utils.heavy_hitters import SpaceSaving, WindowedHeavyHitters
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('compared', 'viewed')
+
+trackers = {
+    kind: WindowedHeavyHitters(TRENDING_WINDOW_SECONDS, TRENDING_BUCKETS, TRENDING_CAPACITY)
+    for kind in KINDS
+}
+
+_last_flush = time.monotonic()
+_merged = {}
+_merged_at = {}
+
+def record(kind, product_ids):
+    """Count one comparison or view of each product."""
+    global _last_flush
+    tracker = trackers[kind]
+    for product_id in set(product_ids):
+        tracker.record(product_id)
+
+    if time.monotonic() - _last_flush > TRENDING_FLUSH_INTERVAL:
+        _last_flush = time.monotonic()
+        threading.Thread(target=flush, daemon=True).start()
+
+def flush(directory=TRENDING_DIR):
+    """Write this worker's window counts to the shared directory."""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        for kind, tracker in trackers.items():
+            path = os.path.join(directory, f"{kind}.{os.getpid()}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'updated_at': time.time(), 'counts': tracker.counts()}, f)
+            os.replace(tmp_path, path)
+    except OSError as err:
+        logger.error(f"Error writing trending counts to {directory}: {err}")
+
+def _other_worker_counts(kind, directory=TRENDING_DIR):
+    """
+    Yield the counts written by other workers within the window, removing older files.
+
+    Workers only write their counts when they record something, so an idle
+    worker's last counts are used until they are a full window old.
+    """
+    own_file = f"{kind}.{os.getpid()}.json"
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+
+    now = time.time()
+    for name in names:
+        if not name.startswith(f"{kind}.") or not name.endswith('.json') or name == own_file:
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+
+        age = now - data.get('updated_at', 0)
+        if age > TRENDING_WINDOW_SECONDS:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        else:
+            yield data.get('counts', {})
+
+def get_trending(kind, k=10):
+    """
+    Get the trending products of a kind.
+
+    The merged view across workers is refreshed at most once per flush interval.
+
+    Args:
+        kind (str): 'compared' or 'viewed'
+        k (int): Maximum number of products to return
+
+    Returns:
+        list: List of dictionaries with product_id and count, highest first
+    """
+    if time.monotonic() - _merged_at.get(kind, float('-inf')) > TRENDING_FLUSH_INTERVAL:
+        merged = SpaceSaving(TRENDING_CAPACITY)
+        merged.merge(trackers[kind].counts())
+        for counts in _other_worker_counts(kind):
+            merged.merge(counts)
+        _merged[kind] = merged
+        _merged_at[kind] = time.monotonic()
+
+    return [{'product_id': key, 'count': count} for key, count in _merged[kind].top(k)]
\ No newline at end of file
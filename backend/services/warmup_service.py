@@ -0,0 +1,101 @@
+"""
+Warm-up service module.
+Prepares a freshly started instance before it takes traffic: opens the connection
+pool, loads the offline indexes and precomputes the most requested cached results.
+"""
+import logging
+import threading
+import time
+from ..config import WARMUP_MODE
+from ..utils.cache import cached_functions, load_hot_keys
+from ..utils.database import init_pool, review_shards
+# review_service is not warmed directly; importing it registers its cached
+# functions, so their recorded hot keys can be replayed
+from . import category_service, product_service, review_service, similarity_service, suggest_service
+
+logger = logging.getLogger(__name__)
+
+# Warm-up progress, reported by /readyz
+warmup_state = {
+    'ready': False,
+    'started_at': None,
+    'finished_at': None,
+    'failed_steps': []
+}
+
+def _replay_hot_keys():
+    """Recompute the recorded most-requested cache entries."""
+    replayed = 0
+    for entry in load_hot_keys():
+        func = cached_functions.get(entry['function'])
+        if func is None:
+            continue
+        try:
+            func(*entry['args'], **entry['kwargs'])
+            replayed += 1
+        except Exception as e:
+            logger.warning(f"Error warming {entry['function']}{tuple(entry['args'])}: {e}")
+    logger.info(f"Warmed {replayed} hot cache entries")
+    return replayed
+
+def _init_review_shard_pools():
+    """Open the pools of every database holding reviews."""
+    return all([init_pool(shard) for shard in review_shards()])
+
+WARMUP_STEPS = [
+    ('connection_pool', init_pool),
+    ('review_shard_pools', _init_review_shard_pools),
+    ('categories', category_service.get_all_categories),
+    ('category_counts', category_service.get_category_product_count),
+    ('deals', product_service.get_top_discounted_products),
+    ('similarity_index', similarity_service.get_similarity_index),
+    ('suggest_index', suggest_service.get_suggest_index),
+    ('hot_keys', _replay_hot_keys),
+]
+
+def run_warmup():
+    """
+    Run every warm-up step and mark the instance ready.
+
+    A failing step (one that raises or returns False or None) is logged and
+    recorded but does not block readiness, so an instance can still serve
+    (cold) traffic when, say, an index is missing.
+
+    Returns:
+        dict: Final warm-up state
+    """
+    warmup_state['started_at'] = time.time()
+    failed = []
+
+    for name, step in WARMUP_STEPS:
+        step_start = time.time()
+        try:
+            result = step()
+            if result is None or result is False:
+                logger.error(f"Warm-up step {name} failed")
+                failed.append(name)
+        except Exception as e:
+            logger.error(f"Warm-up step {name} failed: {e}")
+            failed.append(name)
+        logger.info(f"Warm-up step {name} took {time.time() - step_start:.2f} seconds")
+
+    warmup_state['failed_steps'] = failed
+    warmup_state['finished_at'] = time.time()
+    warmup_state['ready'] = True
+    logger.info(f"Warm-up finished in {warmup_state['finished_at'] - warmup_state['started_at']:.2f} seconds")
+    return warmup_state
+
+def start_warmup(mode=WARMUP_MODE):
+    """
+    Start warm-up according to the configured mode.
+
+    Args:
+        mode (str): 'sync' to warm up before returning, 'background' to warm up
+            in a thread, 'off' to skip warm-up and report ready immediately
+    """
+    if mode == 'off':
+        warmup_state['ready'] = True
+    elif mode == 'background':
+        threading.Thread(target=run_warmup, name='warmup', daemon=True).start()
+    else:
+        run_warmup()
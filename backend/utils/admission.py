@@ -0,0 +1,140 @@
+"""
+Admission control.
+Limits how many requests run at once, per endpoint class and in total, queues
+the excess in priority order for a bounded time, and sheds the rest with 503.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from ..config import ADMISSION_CLASSES, ADMISSION_TOTAL_CONCURRENCY
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted."""
+
+    def __init__(self, request_class, reason):
+        super().__init__(f"{request_class} request rejected: {reason}")
+        self.request_class = request_class
+        self.reason = reason
+
+class _Waiter:
+    __slots__ = ('request_class', 'granted', 'cancelled')
+
+    def __init__(self, request_class):
+        self.request_class = request_class
+        self.granted = False
+        self.cancelled = False
+
+class AdmissionController:
+    """
+    Priority admission controller.
+
+    Each request class has a priority (lower runs first), a concurrency limit, a
+    queue length limit and a queue timeout. All classes also share a total
+    concurrency limit; when a slot frees up it goes to the highest priority
+    waiter whose class is below its own limit.
+    """
+
+    def __init__(self, classes=ADMISSION_CLASSES, total_concurrency=ADMISSION_TOTAL_CONCURRENCY):
+        self.classes = classes
+        self.total_concurrency = total_concurrency
+        self.active = {name: 0 for name in classes}
+        self.queued = {name: 0 for name in classes}
+        self.total_active = 0
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+        metrics.describe('admission_admitted_total', 'Requests admitted, by class')
+        metrics.describe('admission_rejected_total', 'Requests shed with 503, by class and reason')
+        metrics.describe('admission_queue_wait_seconds_total', 'Time admitted requests spent queued')
+        metrics.register_gauge(
+            'admission_active', lambda: [({'class': n}, v) for n, v in self.active.items()],
+            'Requests currently running, by class'
+        )
+        metrics.register_gauge(
+            'admission_queued', lambda: [({'class': n}, v) for n, v in self.queued.items()],
+            'Requests currently waiting, by class'
+        )
+
+    def _has_capacity(self, request_class):
+        return (self.total_active < self.total_concurrency
+                and self.active[request_class] < self.classes[request_class]['concurrency'])
+
+    def _grant(self, request_class):
+        self.active[request_class] += 1
+        self.total_active += 1
+
+    def _grant_waiters(self):
+        """Hand free slots to queued requests in priority order."""
+        skipped = []
+        while self._waiters and self.total_active < self.total_concurrency:
+            entry = heapq.heappop(self._waiters)
+            waiter = entry[2]
+            if waiter.cancelled:
+                continue
+            if self._has_capacity(waiter.request_class):
+                waiter.granted = True
+                self.queued[waiter.request_class] -= 1
+                self._grant(waiter.request_class)
+            else:
+                # Class is at its own limit; lower priority classes may still run
+                skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._waiters, entry)
+        self._condition.notify_all()
+
+    def acquire(self, request_class):
+        """
+        Wait for a slot for a request of the given class.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the queue timeout expires
+        """
+        settings = self.classes[request_class]
+        start = time.monotonic()
+
+        with self._condition:
+            # Waiters whose class is at its own limit cannot take a free slot,
+            # so they do not hold back other classes
+            ahead = any(
+                not entry[2].cancelled and entry[0] <= settings['priority']
+                and self._has_capacity(entry[2].request_class)
+                for entry in self._waiters
+            )
+            if not ahead and self._has_capacity(request_class):
+                self._grant(request_class)
+                metrics.inc('admission_admitted_total', **{'class': request_class})
+                return
+
+            if self.queued[request_class] >= settings['queue']:
+                metrics.inc('admission_rejected_total', **{'class': request_class, 'reason': 'queue_full'})
+                raise AdmissionRejected(request_class, 'queue_full')
+
+            waiter = _Waiter(request_class)
+            self.queued[request_class] += 1
+            heapq.heappush(self._waiters, (settings['priority'], next(self._sequence), waiter))
+
+            deadline = start + settings['timeout']
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    waiter.cancelled = True
+                    self.queued[request_class] -= 1
+                    metrics.inc('admission_rejected_total', **{'class': request_class, 'reason': 'timeout'})
+                    raise AdmissionRejected(request_class, 'timeout')
+                self._condition.wait(remaining)
+
+        metrics.inc('admission_admitted_total', **{'class': request_class})
+        metrics.inc('admission_queue_wait_seconds_total', time.monotonic() - start, **{'class': request_class})
+
+    def release(self, request_class):
+        """Free the slot held by a finished request."""
+        with self._condition:
+            self.active[request_class] -= 1
+            self.total_active -= 1
+            self._grant_waiters()
@@ -0,0 +1,229 @@
+"""
+Frontend asset pipeline.
+Fingerprints and pre-compresses the frontend files and serves them from an
+in-memory manifest, so no filesystem access happens per request.
+
+Build the assets with: python -m backend.utils.assets
+"""
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+from ..config import FRONTEND_DIR, ASSETS_DIST_DIR
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+INDEX_FILE = 'index.html'
+
+# Files that reference other assets and are rewritten to hashed URLs
+REWRITTEN_TYPES = ('.html',)
+
+# Compressing tiny files does not pay for the extra header and CPU
+MIN_COMPRESS_SIZE = 512
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+def _hashed_name(path, content):
+    """Insert a content hash before the extension, e.g. css/style.3f2a1b9c.css."""
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest}{ext}"
+
+def _rewrite_references(html, hashed_paths):
+    """Point src/href attributes in HTML at the hashed asset URLs."""
+    def replace(match):
+        attribute, quote, path = match.group(1), match.group(2), match.group(3)
+        hashed = hashed_paths.get(path.lstrip('/'))
+        if hashed is None:
+            return match.group(0)
+        return f"{attribute}={quote}/{hashed}{quote}"
+
+    return re.sub(r'\b(src|href)=(["\'])([^"\'#?:]+)\2', replace, html)
+
+def _compress(content):
+    """Return the available pre-compressed variants of content by encoding."""
+    variants = {}
+    if len(content) < MIN_COMPRESS_SIZE:
+        return variants
+    variants['gzip'] = gzip.compress(content, compresslevel=9, mtime=0)
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, quality=11)
+    # Keep only encodings that actually shrink the file
+    return {name: data for name, data in variants.items() if len(data) < len(content)}
+
+def _accepted_encodings(accept_encoding):
+    """
+    Parse an Accept-Encoding header.
+
+    Returns:
+        dict: Mapping of lowercase encoding (or '*') to its q-value; a missing
+            or malformed q-value counts as 1
+    """
+    encodings = {}
+    for item in (accept_encoding or '').split(','):
+        token, *params = [part.strip() for part in item.split(';')]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    pass
+        encodings[token.lower()] = q
+    return encodings
+
+class Asset:
+    """One servable file with its pre-compressed variants and cache headers."""
+
+    __slots__ = ('content', 'variants', 'mimetype', 'etag', 'cache_control')
+
+    def __init__(self, content, variants, mimetype, etag, cache_control):
+        self.content = content
+        self.variants = variants
+        self.mimetype = mimetype
+        self.etag = etag
+        self.cache_control = cache_control
+
+    def body_for(self, accept_encoding):
+        """
+        Pick the best encoding the client accepts.
+
+        Returns:
+            tuple: (body bytes, content encoding or None)
+        """
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            # An encoding with q=0 is explicitly refused
+            if encoding in self.variants and accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return self.variants[encoding], encoding
+        return self.content, None
+
+def build_assets(frontend_dir=FRONTEND_DIR):
+    """
+    Fingerprint and compress every file under the frontend directory.
+
+    Returns:
+        dict: Mapping of URL path to a dictionary with content, variants,
+            mimetype, etag and whether the URL is immutable
+    """
+    sources = {}
+    for root, dirs, files in os.walk(frontend_dir):
+        # Never pick up a previous build output
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != ASSETS_DIST_DIR]
+        for name in files:
+            full_path = os.path.join(root, name)
+            path = os.path.relpath(full_path, frontend_dir).replace(os.sep, '/')
+            with open(full_path, 'rb') as f:
+                sources[path] = f.read()
+
+    hashed_paths = {
+        path: _hashed_name(path, content)
+        for path, content in sources.items()
+        if not path.endswith(REWRITTEN_TYPES)
+    }
+
+    assets = {}
+    for path, content in sources.items():
+        if path.endswith(REWRITTEN_TYPES):
+            content = _rewrite_references(content.decode('utf-8'), hashed_paths).encode('utf-8')
+
+        entry = {
+            'content': content,
+            'variants': _compress(content),
+            'mimetype': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+            'etag': hashlib.sha256(content).hexdigest()[:16]
+        }
+        # Original paths stay servable but must be revalidated
+        assets[path] = dict(entry, immutable=False)
+        if path in hashed_paths:
+            assets[hashed_paths[path]] = dict(entry, immutable=True)
+
+    return assets
+
+def write_assets(assets, dist_dir=ASSETS_DIST_DIR):
+    """Write built assets, their compressed variants and the manifest to dist_dir."""
+    manifest = {}
+    for path, entry in assets.items():
+        target = os.path.join(dist_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(entry['content'])
+        for encoding, data in entry['variants'].items():
+            suffix = '.br' if encoding == 'br' else '.gz'
+            with open(target + suffix, 'wb') as f:
+                f.write(data)
+        manifest[path] = {
+            'mimetype': entry['mimetype'],
+            'etag': entry['etag'],
+            'immutable': entry['immutable'],
+            'encodings': sorted(entry['variants'])
+        }
+
+    with open(os.path.join(dist_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+def _read_built_assets(dist_dir):
+    """Read a previous build from dist_dir, or return None if there is none."""
+    manifest_path = os.path.join(dist_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    assets = {}
+    for path, info in manifest.items():
+        target = os.path.join(dist_dir, path)
+        with open(target, 'rb') as f:
+            content = f.read()
+        variants = {}
+        for encoding in info['encodings']:
+            suffix = '.br' if encoding == 'br' else '.gz'
+            with open(target + suffix, 'rb') as f:
+                variants[encoding] = f.read()
+        assets[path] = dict(info, content=content, variants=variants)
+    return assets
+
+def load_asset_manifest(frontend_dir=FRONTEND_DIR, dist_dir=ASSETS_DIST_DIR):
+    """
+    Load all frontend assets into memory.
+
+    Uses the build output in dist_dir when present, otherwise builds the assets
+    in memory from frontend_dir.
+
+    Returns:
+        dict: Mapping of URL path to Asset
+    """
+    assets = _read_built_assets(dist_dir)
+    if assets is None:
+        logger.info("No asset build found, fingerprinting frontend assets in memory")
+        assets = build_assets(frontend_dir)
+
+    return {
+        path: Asset(
+            entry['content'], entry['variants'], entry['mimetype'], entry['etag'],
+            IMMUTABLE_CACHE_CONTROL if entry['immutable'] else REVALIDATE_CACHE_CONTROL
+        )
+        for path, entry in assets.items()
+    }
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    built = write_assets(build_assets())
+    if brotli is None:
+        print("brotli is not installed, only gzip variants were written")
+    print(f"Wrote {len(built)} assets to {ASSETS_DIST_DIR}")
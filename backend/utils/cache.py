@@ -0,0 +1,249 @@
+"""
+In-process result cache.
+Caches service results for a fixed time and remembers their serialized JSON so
+repeated responses for the same cached value are not re-encoded. Expired
+results are kept for a while longer and served when the database is down.
+"""
+import atexit
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from ..config import (
+    CACHE_TTL, CACHE_MAX_ENTRIES, CACHE_STALE_TTL, HOT_KEYS_PATH, HOT_KEYS_LIMIT, HOT_KEYS_FLUSH_INTERVAL
+)
+from .database import db_breaker
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class TTLCache:
+    """Thread-safe cache whose entries expire after a fixed number of seconds."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._keys_by_id = {}
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, allow_stale=False):
+        """
+        Return the cached value for key, or None if missing or expired.
+
+        Expired entries are kept for CACHE_STALE_TTL more seconds and returned
+        when allow_stale is True.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        now = time.monotonic()
+        if expires_at < now:
+            if expires_at + CACHE_STALE_TTL < now:
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        self._remove(key)
+                return None
+            return value if allow_stale else None
+        return value
+
+    def set(self, key, value, ttl=CACHE_TTL):
+        """Cache a value for ttl seconds."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            elif len(self._entries) >= self.max_entries:
+                # Evict the entry closest to expiry
+                oldest = min(self._entries, key=lambda k: self._entries[k][1])
+                self._remove(oldest)
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._keys_by_id[id(value)] = key
+
+    def invalidate(self, prefix=None):
+        """Drop all entries, or only those of the cached function whose cache_prefix is prefix."""
+        with self._lock:
+            for key in list(self._entries):
+                if prefix is None or key[0] == prefix:
+                    self._remove(key)
+
+    def get_encoded(self, value):
+        """Return previously stored serialized bytes for a cached value, if any."""
+        key = self._keys_by_id.get(id(value))
+        return self._encoded.get(key) if key is not None else None
+
+    def set_encoded(self, value, data):
+        """
+        Remember the serialized bytes of a value if it is currently cached.
+
+        Values are looked up by object identity, which is stable because the
+        cache holds a reference to the value until its entry is removed.
+        """
+        with self._lock:
+            key = self._keys_by_id.get(id(value))
+            if key is not None and self._entries[key][0] is value:
+                self._encoded[key] = data
+
+    def _remove(self, key):
+        value, _ = self._entries.pop(key)
+        self._keys_by_id.pop(id(value), None)
+        self._encoded.pop(key, None)
+
+# Shared cache instance for service results
+result_cache = TTLCache()
+
+metrics.describe('cache_stale_served_total', 'Expired cache entries served while the database was unavailable')
+
+# Cached functions by key prefix, so recorded hot keys can be replayed at startup
+cached_functions = {}
+
+# Calls per cache key since the hot-key list was last saved
+_hits = Counter()
+_hits_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+def cached(ttl=CACHE_TTL):
+    """
+    Cache a function's results keyed by its arguments.
+
+    Cached values are shared between callers and must be treated as read-only.
+    When the database circuit is open, or the function fails (raises or returns
+    None), an expired result is served instead if one is still held. Cached
+    functions therefore return None on a failed query rather than an empty
+    default, which would be cached; callers supply the default.
+
+    Arguments are bound to the function's signature with defaults applied, so
+    f(), f(10) and f(limit=10) share one entry.
+    """
+    def decorator(func):
+        prefix = f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        def cache_key(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return (prefix, bound.args, tuple(sorted(bound.kwargs.items())))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = cache_key(*args, **kwargs)
+            _record_hit(key)
+            value = result_cache.get(key)
+            if value is not None:
+                return value
+
+            if db_breaker.is_open():
+                value = _get_stale(key)
+                if value is not None:
+                    return value
+
+            try:
+                value = func(*args, **kwargs)
+            except Exception as err:
+                value = _get_stale(key)
+                if value is None:
+                    raise
+                logger.warning(f"Serving stale {prefix}{args}: {err}")
+                return value
+
+            if value is not None:
+                result_cache.set(key, value, ttl)
+                return value
+            return _get_stale(key)
+
+        wrapper.cache_prefix = prefix
+        wrapper.cache_key = cache_key
+        wrapper.cache_ttl = ttl
+        wrapper.uncached = func
+        cached_functions[prefix] = wrapper
+        return wrapper
+    return decorator
+
+def refresh(func, *args, **kwargs):
+    """
+    Recompute a cached function's result and store it, so callers get the new
+    value without waiting for a miss.
+
+    Returns:
+        The new value, or None if the function returned None (the cached
+        value is then kept)
+    """
+    value = func.uncached(*args, **kwargs)
+    if value is not None:
+        result_cache.set(func.cache_key(*args, **kwargs), value, func.cache_ttl)
+    return value
+
+def _get_stale(key):
+    value = result_cache.get(key, allow_stale=True)
+    if value is not None:
+        metrics.inc('cache_stale_served_total')
+    return value
+
+def _record_hit(key):
+    """Count a call and periodically persist the hot-key list in the background."""
+    global _last_flush
+    with _hits_lock:
+        _hits[key] += 1
+    if time.monotonic() - _last_flush > HOT_KEYS_FLUSH_INTERVAL:
+        _last_flush = time.monotonic()
+        threading.Thread(target=save_hot_keys, daemon=True).start()
+
+def load_hot_keys(path=HOT_KEYS_PATH):
+    """
+    Load the recorded hot-key list.
+
+    Returns:
+        list: List of dictionaries with function, args, kwargs and hits, hottest first
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('keys', [])
+    except (OSError, ValueError):
+        return []
+
+def save_hot_keys(path=HOT_KEYS_PATH, limit=HOT_KEYS_LIMIT, decay=0.9):
+    """
+    Merge the calls counted since the last save into the hot-key file.
+
+    Previously recorded counts decay on every save so the list follows shifts
+    in traffic. Keys whose arguments are not JSON serializable are skipped.
+    """
+    global _hits
+    # Swap in a new counter so request threads never see it being read
+    with _hits_lock:
+        hits, _hits = _hits, Counter()
+    if not hits:
+        return
+
+    merged = {}
+    for entry in load_hot_keys(path):
+        key = json.dumps([entry['function'], entry['args'], entry['kwargs']])
+        merged[key] = entry['hits'] * decay
+
+    for (prefix, args, kwargs), count in hits.items():
+        try:
+            key = json.dumps([prefix, list(args), dict(kwargs)])
+        except TypeError:
+            continue
+        merged[key] = merged.get(key, 0) + count
+
+    hottest = sorted(merged.items(), key=lambda item: item[1], reverse=True)[:limit]
+    keys = []
+    for key, count in hottest:
+        prefix, args, kwargs = json.loads(key)
+        keys.append({'function': prefix, 'args': args, 'kwargs': kwargs, 'hits': round(count, 2)})
+
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'keys': keys}, f)
+        os.replace(tmp_path, path)
+    except OSError as err:
+        logger.error(f"Error saving hot keys to {path}: {err}")
+
+atexit.register(save_hot_keys)
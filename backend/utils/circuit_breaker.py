@@ -0,0 +1,138 @@
+"""
+Circuit breaker.
+Stops sending queries to a struggling database: the breaker trips when too many
+recent calls failed or were slow, fails fast while open, and lets a few trial
+calls through after a cool-down to decide whether to close again.
+"""
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+STATE_VALUES = {CLOSED: 0, OPEN: 1, HALF_OPEN: 2}
+
+# Every live breaker, for the state gauge
+_breakers = weakref.WeakSet()
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+
+class CircuitBreaker:
+    """
+    Rolling-window circuit breaker.
+
+    Args:
+        name (str): Name used in logs and metrics
+        window_seconds (float): Length of the window that rates are computed over
+        min_calls (int): Calls needed in the window before the breaker can trip
+        failure_rate (float): Failure ratio that trips the breaker
+        slow_call_rate (float): Slow call ratio that trips the breaker
+        slow_call_seconds (float): Latency above which a call counts as slow
+        open_seconds (float): How long the breaker stays open before trial calls
+        half_open_calls (int): Trial calls allowed while half open
+    """
+
+    def __init__(self, name, window_seconds=30, min_calls=20, failure_rate=0.5,
+                 slow_call_rate=0.8, slow_call_seconds=2.0, open_seconds=15, half_open_calls=3):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = CLOSED
+        self._calls = deque()
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0
+        self._trials = 0
+        self._lock = threading.Lock()
+
+        metrics.describe('circuit_breaker_trips_total', 'Times a circuit breaker opened')
+        metrics.describe('circuit_breaker_rejections_total', 'Calls failed fast by an open circuit')
+        _breakers.add(self)
+
+    def is_open(self):
+        """True while calls are being failed fast."""
+        return self.state == OPEN and time.monotonic() - self._opened_at < self.open_seconds
+
+    def before_call(self):
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half open with all trial calls in use
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    metrics.inc('circuit_breaker_rejections_total', breaker=self.name)
+                    raise CircuitOpenError(f"{self.name} circuit is open")
+                self.state = HALF_OPEN
+                self._trials = 0
+                logger.info(f"{self.name} circuit half open, allowing trial calls")
+
+            if self.state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    metrics.inc('circuit_breaker_rejections_total', breaker=self.name)
+                    raise CircuitOpenError(f"{self.name} circuit is half open")
+                self._trials += 1
+
+    def record(self, success, duration):
+        """Record the outcome and latency of a call that was allowed through."""
+        slow = duration > self.slow_call_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                if success and not slow:
+                    self._close()
+                else:
+                    self._open()
+                return
+
+            now = time.monotonic()
+            self._calls.append((now, success, slow))
+            self._failures += not success
+            self._slow += slow
+            while self._calls and self._calls[0][0] < now - self.window_seconds:
+                _, old_success, old_slow = self._calls.popleft()
+                self._failures -= not old_success
+                self._slow -= old_slow
+
+            total = len(self._calls)
+            if total >= self.min_calls and (
+                self._failures / total >= self.failure_rate or self._slow / total >= self.slow_call_rate
+            ):
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+        self._failures = 0
+        self._slow = 0
+        metrics.inc('circuit_breaker_trips_total', breaker=self.name)
+        logger.warning(f"{self.name} circuit opened for {self.open_seconds} seconds")
+
+    def _close(self):
+        self.state = CLOSED
+        logger.info(f"{self.name} circuit closed")
+
+def _breaker_states():
+    """State of every breaker, one labelled sample each."""
+    return [({'breaker': breaker.name}, STATE_VALUES[breaker.state])
+            for breaker in sorted(list(_breakers), key=lambda breaker: breaker.name)]
+
+metrics.register_gauge(
+    'circuit_breaker_state', _breaker_states, 'Circuit breaker state (0 closed, 1 open, 2 half open)'
+)
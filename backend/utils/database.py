@@ -1,10 +1,26 @@
 """
 Database utility functions.
+
+Reviews may be sharded across several MySQL instances by a hash of product_id
+(REVIEW_SHARDS). Review queries pass shard=review_shard(product_id), and
+multi-product reads are split with group_by_review_shard and run in parallel
+with scatter. A shard of None is the main database.
 """
 import mysql.connector
+from mysql.connector import pooling
+import hashlib
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit, unquote
 from dotenv import load_dotenv
 import logging
+from ..config import QUERY_TIMEOUTS_MS, DB_BREAKER, REVIEW_SHARDS
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .metrics import metrics
 
 # Load environment variables
 load_dotenv()
@@ -20,21 +36,229 @@ db_config = {
     'database': os.getenv('DB_NAME', 'amasift_compare')
 }
 
-def get_db_connection():
+# Number of pooled connections per process and database (0 disables pooling)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+
+def _parse_shard(entry):
+    """Connection settings for a [user[:password]@]host[:port]/database entry."""
+    url = urlsplit(entry if '://' in entry else f"mysql://{entry}")
+    config = {
+        'host': url.hostname or 'localhost',
+        'user': unquote(url.username) if url.username else db_config['user'],
+        'password': unquote(url.password) if url.password is not None else db_config['password'],
+        'database': url.path.lstrip('/') or db_config['database']
+    }
+    if url.port:
+        config['port'] = url.port
+    return config
+
+# Connection settings of each review shard, in shard order
+shard_configs = [_parse_shard(entry) for entry in REVIEW_SHARDS]
+
+# Pools keyed by shard, None being the main database
+_pools = {}
+_pool_lock = threading.Lock()
+_scatter_pool = None
+
+# MySQL error numbers for statements killed by MAX_EXECUTION_TIME
+QUERY_TIMEOUT_ERRNOS = (3024, 1317)
+
+_SELECT_PREFIX = re.compile(r'^\s*SELECT\b', re.IGNORECASE)
+
+# Statements recorded by capture_statements(), None when not capturing
+_captured = None
+
+# Trips when the database keeps failing or slowing down, so callers fail fast
+# instead of piling more work onto it
+db_breaker = CircuitBreaker('database', **DB_BREAKER)
+
+# Each shard has its own breaker, so one failing instance does not take
+# down the others
+shard_breakers = [CircuitBreaker(f"reviews_shard_{i}", **DB_BREAKER) for i in range(len(shard_configs))]
+
+metrics.describe('db_query_timeouts_total', 'Queries killed by their statement timeout, by query class')
+
+def _connection_config(shard=None):
+    return db_config if shard is None else shard_configs[shard]
+
+def _breaker(shard=None):
+    return db_breaker if shard is None else shard_breakers[shard]
+
+def init_pool(shard=None):
+    """
+    Create the connection pool of a database, opening all of its connections up front.
+    
+    Args:
+        shard (int): Review shard, or None for the main database
+    
+    Returns:
+        bool: True if the pool is available, False otherwise
+    """
+    if shard in _pools or DB_POOL_SIZE <= 0:
+        return shard in _pools
+    
+    with _pool_lock:
+        if shard not in _pools:
+            pool_name = 'amasift' if shard is None else f"amasift_reviews_{shard}"
+            try:
+                _pools[shard] = pooling.MySQLConnectionPool(
+                    pool_name=pool_name, pool_size=DB_POOL_SIZE, **_connection_config(shard)
+                )
+                logger.info(f"Opened MySQL connection pool {pool_name} with {DB_POOL_SIZE} connections")
+            except mysql.connector.Error as err:
+                logger.error(f"Error creating MySQL connection pool {pool_name}: {err}")
+    
+    return shard in _pools
+
+def _reset_pool_after_fork():
+    """Forked children must not share the parent's pooled sockets or threads."""
+    global _scatter_pool
+    _pools.clear()
+    _scatter_pool = None
+
+os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
+def get_db_connection(pooled=True, shard=None):
     """
     Establish a connection to the MySQL database.
     
+    Pooled connections are returned to the pool when closed. When the pool is
+    exhausted or unavailable a direct connection is opened instead.
+    
+    Args:
+        pooled (bool): Take the connection from the pool if possible
+        shard (int): Review shard, or None for the main database
+    
     Returns:
         connection: MySQL database connection object or None if connection fails
     """
+    if pooled and init_pool(shard):
+        try:
+            return _pools[shard].get_connection()
+        except mysql.connector.errors.PoolError:
+            logger.warning("MySQL connection pool exhausted, opening a direct connection")
+        except mysql.connector.Error as err:
+            logger.error(f"Error getting pooled MySQL connection: {err}")
+    
     try:
-        conn = mysql.connector.connect(**db_config)
+        conn = mysql.connector.connect(**_connection_config(shard))
         return conn
     except mysql.connector.Error as err:
         logger.error(f"Error connecting to MySQL: {err}")
         return None
 
-def execute_query(query, params=None, fetch=True, many=False):
+def with_timeout(query, query_class='default'):
+    """
+    Add a MAX_EXECUTION_TIME hint for the query class to a SELECT statement.
+    
+    Other statements are returned unchanged, since MySQL only enforces the hint
+    on read-only SELECTs.
+    """
+    timeout_ms = QUERY_TIMEOUTS_MS.get(query_class, QUERY_TIMEOUTS_MS['default'])
+    if timeout_ms <= 0:
+        return query
+    return _SELECT_PREFIX.sub(f"SELECT /*+ MAX_EXECUTION_TIME({timeout_ms}) */", query, count=1)
+
+def _is_unhealthy(err, query_class):
+    """
+    Whether an error says the database is struggling, as opposed to a bad query.
+    
+    Timeouts are counted in metrics as well.
+    """
+    if getattr(err, 'errno', None) in QUERY_TIMEOUT_ERRNOS:
+        metrics.inc('db_query_timeouts_total', query_class=query_class)
+        return True
+    return isinstance(err, (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError))
+
+def _record_call(healthy, start, query_class, shard=None):
+    # Batch jobs are slow by design and must not trip the breaker on latency
+    elapsed = 0 if query_class == 'batch' else time.monotonic() - start
+    _breaker(shard).record(healthy, elapsed)
+
+def _jump_hash(key, buckets):
+    """Jump consistent hash: adding a bucket moves only 1/buckets of the keys."""
+    bucket, j = -1, 0
+    while j < buckets:
+        bucket = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+    return bucket
+
+def review_shard(product_id, shard_count=None):
+    """
+    Shard holding the reviews of a product.
+    
+    Args:
+        product_id (str): Product ID
+        shard_count (int): Number of shards (defaults to the configured shards)
+    
+    Returns:
+        int or None: Shard index, or None when reviews are not sharded
+    """
+    shard_count = len(shard_configs) if shard_count is None else shard_count
+    if not shard_count:
+        return None
+    digest = hashlib.blake2b(str(product_id).encode('utf-8'), digest_size=8).digest()
+    return _jump_hash(int.from_bytes(digest, 'big'), shard_count)
+
+def review_shards():
+    """All databases holding reviews: the shard indexes, or [None] when not sharded."""
+    return list(range(len(shard_configs))) or [None]
+
+def group_by_review_shard(product_ids):
+    """
+    Split product IDs by the shard holding their reviews.
+    
+    Returns:
+        dict: Mapping of shard to list of product IDs, in their original order
+    """
+    groups = {}
+    for product_id in product_ids:
+        groups.setdefault(review_shard(product_id), []).append(product_id)
+    return groups
+
+def scatter(fn, groups):
+    """
+    Call fn(shard, items) for every group, in parallel when there are several.
+    
+    Args:
+        fn (callable): Function of a shard and its items
+        groups (dict): Mapping of shard to items, e.g. from group_by_review_shard
+    
+    Returns:
+        list: Results of fn, in the order of groups
+    """
+    global _scatter_pool
+    if len(groups) <= 1:
+        return [fn(shard, items) for shard, items in groups.items()]
+    
+    if _scatter_pool is None:
+        with _pool_lock:
+            if _scatter_pool is None:
+                _scatter_pool = ThreadPoolExecutor(
+                    max_workers=max(len(shard_configs), 1) * 2, thread_name_prefix='scatter'
+                )
+    futures = [_scatter_pool.submit(fn, shard, items) for shard, items in groups.items()]
+    return [future.result() for future in futures]
+
+@contextmanager
+def capture_statements():
+    """
+    Record every statement run through this module while the block runs,
+    whichever thread runs it. Used by the query plan checker.
+    
+    Yields:
+        list: (query, params, query_class, shard) tuples, in the order run
+    """
+    global _captured
+    previous, _captured = _captured, []
+    try:
+        yield _captured
+    finally:
+        _captured = previous
+
+def execute_query(query, params=None, fetch=True, many=False, as_tuples=False, query_class='default',
+                  shard=None):
     """
     Execute a database query with error handling.
     
@@ -43,23 +267,40 @@ def execute_query(query, params=None, fetch=True, many=False):
         params (tuple or list): Parameters for the query
         fetch (bool): Whether to fetch results (True) or just execute (False)
         many (bool): Whether to execute many statements (True) or a single one (False)
+        as_tuples (bool): Return rows as tuples instead of dictionaries, e.g. to
+            build models from
+        query_class (str): Timeout class from QUERY_TIMEOUTS_MS
+        shard (int): Review shard to run on, or None for the main database
     
     Returns:
-        list or None: Query results if fetch=True, None otherwise
+        list or None: Query results if fetch=True, None otherwise. None is also
+            returned straight away while the database circuit is open
     """
+    if _captured is not None:
+        _captured.append((query, params, query_class, shard))
+    
+    try:
+        _breaker(shard).before_call()
+    except CircuitOpenError as err:
+        logger.warning(f"Query skipped: {err}")
+        return None
+    
     conn = None
     cursor = None
+    healthy = True
+    start = time.monotonic()
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(shard=shard)
         if not conn:
+            healthy = False
             return None
             
-        cursor = conn.cursor(dictionary=True)
+        cursor = conn.cursor(dictionary=not as_tuples)
         
         if many:
             cursor.executemany(query, params)
         else:
-            cursor.execute(query, params or ())
+            cursor.execute(with_timeout(query, query_class), params or ())
         
         if fetch:
             result = cursor.fetchall()
@@ -70,11 +311,150 @@ def execute_query(query, params=None, fetch=True, many=False):
             
     except mysql.connector.Error as err:
         logger.error(f"Database error: {err}")
+        healthy = not _is_unhealthy(err, query_class)
         if conn:
             conn.rollback()
         return None
     finally:
+        _record_call(healthy, start, query_class, shard)
+        if cursor:
+            cursor.close()
+        if conn:
+            conn.close()
+
+def execute_transaction(statements, query_class='default', shard=None):
+    """
+    Execute several statements on one connection as a single transaction.
+    
+    Args:
+        statements (list): List of (query, params) or (query, params, many) tuples,
+            executed in order
+        query_class (str): Timeout class from QUERY_TIMEOUTS_MS
+        shard (int): Review shard to run on, or None for the main database
+    
+    Returns:
+        bool: True if all statements were committed, False otherwise
+    """
+    if _captured is not None:
+        _captured.extend((statement[0], statement[1], query_class, shard) for statement in statements)
+    
+    try:
+        _breaker(shard).before_call()
+    except CircuitOpenError as err:
+        logger.warning(f"Transaction skipped: {err}")
+        return False
+    
+    conn = None
+    cursor = None
+    healthy = True
+    start = time.monotonic()
+    try:
+        conn = get_db_connection(shard=shard)
+        if not conn:
+            healthy = False
+            return False
+        
+        cursor = conn.cursor()
+        for statement in statements:
+            query, params = statement[0], statement[1]
+            many = statement[2] if len(statement) > 2 else False
+            
+            if many:
+                cursor.executemany(query, params)
+            else:
+                cursor.execute(with_timeout(query, query_class), params or ())
+        
+        conn.commit()
+        return True
+    
+    except mysql.connector.Error as err:
+        logger.error(f"Database error in transaction: {err}")
+        healthy = not _is_unhealthy(err, query_class)
+        if conn:
+            conn.rollback()
+        return False
+    finally:
+        _record_call(healthy, start, query_class, shard)
         if cursor:
             cursor.close()
         if conn:
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+def stream_query(query, params=None, batch_size=1000, batches=False, as_tuples=False, query_class='batch',
+                 shard=None):
+    """
+    Execute a query and iterate over its rows from an unbuffered cursor.
+    
+    Rows are pulled from the server in batches of batch_size, so memory use stays
+    constant however large the result is. The generator uses its own connection
+    outside the pool, held until the generator is exhausted or closed.
+    
+    Args:
+        query (str): SQL query to execute
+        params (tuple or list): Parameters for the query
+        batch_size (int): Number of rows to fetch from the server at a time
+        batches (bool): Yield lists of up to batch_size rows instead of single rows
+        as_tuples (bool): Return rows as tuples instead of dictionaries
+        query_class (str): Timeout class from QUERY_TIMEOUTS_MS
+        shard (int): Review shard to run on, or None for the main database
+    
+    Yields:
+        dict, tuple or list: One row, or one batch of rows, per iteration
+    
+    Raises:
+        CircuitOpenError: If the database circuit is open
+        mysql.connector.Error: If the connection or the query fails
+    """
+    if _captured is not None:
+        _captured.append((query, params, query_class, shard))
+    _breaker(shard).before_call()
+    start = time.monotonic()
+    
+    # A stream abandoned mid-result leaves its connection unusable, so it must
+    # never be returned to the pool
+    conn = get_db_connection(pooled=False, shard=shard)
+    if not conn:
+        _record_call(False, start, query_class, shard)
+        raise mysql.connector.errors.InterfaceError("Could not connect to MySQL")
+    
+    cursor = None
+    recorded = False
+    try:
+        cursor = conn.cursor(dictionary=not as_tuples, buffered=False)
+        cursor.execute(with_timeout(query, query_class), params or ())
+        # The call is judged on the time to start the result, not on how long
+        # the caller takes to consume it
+        _record_call(True, start, query_class, shard)
+        recorded = True
+        
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if batches:
+                yield rows
+            else:
+                yield from rows
+    except mysql.connector.Error as err:
+        logger.error(f"Database error while streaming: {err}")
+        healthy = not _is_unhealthy(err, query_class)
+        if not recorded:
+            _record_call(healthy, start, query_class, shard)
+            recorded = True
+        raise
+    finally:
+        if not recorded:
+            # Abandoned before the query started, e.g. the client went away
+            _record_call(True, start, query_class, shard)
+            recorded = True
+        # Closing with unread rows (e.g. the client went away) can raise, so the
+        # connection is dropped regardless
+        if cursor:
+            try:
+                cursor.close()
+            except mysql.connector.Error:
+                pass
+        try:
+            conn.close()
+        except mysql.connector.Error:
+            pass
@@ -0,0 +1,119 @@
+"""
+Heavy-hitter sketches.
+Approximate most-frequent-item counting in bounded memory, over the whole
+stream (SpaceSaving) or over a sliding time window (WindowedHeavyHitters).
+"""
+import heapq
+import threading
+import time
+
+class SpaceSaving:
+    """
+    Space-Saving summary of the most frequent keys in a stream.
+
+    Tracks at most capacity keys. When a new key arrives and the summary is
+    full, it replaces the key with the smallest count and inherits that count,
+    so counts are overestimated by at most the smallest tracked count and
+    every key more frequent than total / capacity is guaranteed to be tracked.
+    """
+
+    __slots__ = ('capacity', 'counts', '_heap')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        # Min-heap of (count, key); entries go stale as counts grow and are
+        # refreshed lazily when they reach the top
+        self._heap = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def offer(self, key, count=1):
+        """Count count occurrences of key."""
+        if key in self.counts:
+            self.counts[key] += count
+            return
+
+        if len(self.counts) < self.capacity:
+            self.counts[key] = count
+            heapq.heappush(self._heap, (count, key))
+            return
+
+        # Evict the key with the smallest current count
+        while True:
+            smallest, evicted = self._heap[0]
+            current = self.counts[evicted]
+            if current == smallest:
+                break
+            heapq.heapreplace(self._heap, (current, evicted))
+        heapq.heappop(self._heap)
+        del self.counts[evicted]
+        self.counts[key] = smallest + count
+        heapq.heappush(self._heap, (smallest + count, key))
+
+    def merge(self, counts):
+        """Add another summary's counts (a SpaceSaving or a dict) into this one."""
+        counts = counts.counts if isinstance(counts, SpaceSaving) else counts
+        merged = dict(self.counts)
+        for key, count in counts.items():
+            merged[key] = merged.get(key, 0) + count
+        if len(merged) > self.capacity:
+            merged = dict(heapq.nlargest(self.capacity, merged.items(), key=lambda item: item[1]))
+        self.counts = merged
+        self._heap = [(count, key) for key, count in merged.items()]
+        heapq.heapify(self._heap)
+
+    def top(self, k):
+        """The k keys with the highest counts, as (key, count) tuples."""
+        return heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])
+
+class WindowedHeavyHitters:
+    """
+    Heavy hitters over a sliding time window.
+
+    The window is split into buckets, each with its own SpaceSaving summary;
+    buckets that fall out of the window are dropped whole.
+
+    Args:
+        window_seconds (float): Length of the window
+        buckets (int): Number of buckets the window is split into
+        capacity (int): Keys tracked per bucket
+    """
+
+    def __init__(self, window_seconds, buckets, capacity):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = window_seconds / buckets
+        self.buckets = buckets
+        self.capacity = capacity
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, slot):
+        for old in [s for s in self._summaries if s <= slot - self.buckets]:
+            del self._summaries[old]
+
+    def record(self, key, count=1, now=None):
+        """Count occurrences of key at time now."""
+        slot = int((time.time() if now is None else now) // self.bucket_seconds)
+        with self._lock:
+            summary = self._summaries.get(slot)
+            if summary is None:
+                self._expire(slot)
+                summary = self._summaries[slot] = SpaceSaving(self.capacity)
+            summary.offer(key, count)
+
+    def counts(self, now=None):
+        """
+        Approximate counts of the heaviest keys within the window.
+
+        Returns:
+            dict: Mapping of key to count, at most capacity keys
+        """
+        slot = int((time.time() if now is None else now) // self.bucket_seconds)
+        window = SpaceSaving(self.capacity)
+        with self._lock:
+            self._expire(slot)
+            for summary in self._summaries.values():
+                window.merge(summary)
+        return window.counts
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""
+Import readers.
+Stream source files of different formats and compressions as batches of
+normalized rows, so the importer never stages a whole file on disk or in memory.
+
+Every reader yields lists of dictionaries mapping column names to strings.
+Nested JSON objects are flattened to dotted names (e.g. reviews.text), which
+matches the column names of the CSV dumps.
+"""
+import bz2
+import csv
+import gzip
+import io
+import json
+import os
+from itertools import chain
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+COMPRESSION_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.zst': 'zstd'}
+
+FORMAT_EXTENSIONS = {
+    '.csv': 'csv',
+    '.tsv': 'csv',
+    '.txt': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet'
+}
+
+# Delimiters considered when none is given, most common in the header wins
+DELIMITER_CANDIDATES = (',', '\t', ';', '|')
+
+DEFAULT_BATCH_SIZE = 1000
+
+def detect_compression(path):
+    """Compression of a file from its extension, or None."""
+    return COMPRESSION_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+def detect_format(path):
+    """Format of a file from its extension, ignoring a compression extension."""
+    root, ext = os.path.splitext(path)
+    if ext.lower() in COMPRESSION_EXTENSIONS:
+        ext = os.path.splitext(root)[1]
+    file_format = FORMAT_EXTENSIONS.get(ext.lower())
+    if file_format is None:
+        raise ValueError(f"Cannot tell the format of {path}, pass it explicitly")
+    return file_format
+
+def open_binary(path, compression='auto'):
+    """
+    Open a file for streaming reads, decompressing on the fly.
+
+    Args:
+        path (str): File path
+        compression (str): 'auto' (from the extension), 'gzip', 'bz2', 'zstd' or None
+    """
+    if compression == 'auto':
+        compression = detect_compression(path)
+
+    if compression is None:
+        return open(path, 'rb')
+    if compression == 'gzip':
+        return gzip.open(path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(path, 'rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("Reading .zst files requires the zstandard package")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    raise ValueError(f"Unknown compression: {compression}")
+
+def open_text(path, compression='auto', encoding='utf-8'):
+    """Open a possibly compressed file as text, replacing undecodable bytes."""
+    return io.TextIOWrapper(open_binary(path, compression), encoding=encoding, errors='replace', newline='')
+
+def _to_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return str(value)
+
+def normalize_row(record, prefix=''):
+    """Flatten a nested record to dotted column names with string values."""
+    row = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(normalize_row(value, f"{name}."))
+        else:
+            row[name] = _to_text(value)
+    return row
+
+def _batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class CsvReader:
+    """Delimited text, with a header row naming the columns."""
+
+    def __init__(self, path, compression='auto', delimiter=None, encoding='utf-8'):
+        self.path = path
+        self.compression = compression
+        self.delimiter = delimiter
+        self.encoding = encoding
+
+    def batches(self, batch_size=DEFAULT_BATCH_SIZE):
+        with open_text(self.path, self.compression, self.encoding) as f:
+            header = f.readline()
+            delimiter = self.delimiter or max(DELIMITER_CANDIDATES, key=header.count)
+            reader = csv.reader(chain([header], f), delimiter=delimiter)
+            columns = next(reader, None)
+            if columns is None:
+                return
+            yield from _batched((dict(zip(columns, values)) for values in reader if values), batch_size)
+
+class JsonLinesReader:
+    """One JSON object per line."""
+
+    def __init__(self, path, compression='auto', encoding='utf-8', **kwargs):
+        self.path = path
+        self.compression = compression
+        self.encoding = encoding
+
+    def batches(self, batch_size=DEFAULT_BATCH_SIZE):
+        with open_text(self.path, self.compression, self.encoding) as f:
+            rows = (normalize_row(json.loads(line)) for line in f if line.strip())
+            yield from _batched(rows, batch_size)
+
+class ParquetReader:
+    """Parquet files, read one record batch of a row group at a time."""
+
+    def __init__(self, path, **kwargs):
+        if pq is None:
+            raise ImportError("Reading Parquet files requires the pyarrow package")
+        self.path = path
+
+    def batches(self, batch_size=DEFAULT_BATCH_SIZE):
+        parquet_file = pq.ParquetFile(self.path)
+        for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+            yield [normalize_row(record) for record in record_batch.to_pylist()]
+
+READERS = {
+    'csv': CsvReader,
+    'jsonl': JsonLinesReader,
+    'parquet': ParquetReader
+}
+
+def open_reader(path, file_format=None, compression='auto', delimiter=None):
+    """
+    Create the reader for a source file.
+
+    Args:
+        path (str): File path
+        file_format (str): 'csv', 'jsonl' or 'parquet' (detected from the extension if None)
+        compression (str): 'auto', 'gzip', 'bz2', 'zstd' or None; Parquet compresses internally
+        delimiter (str): CSV delimiter (detected from the header if None)
+
+    Returns:
+        Reader with a batches(batch_size) method
+    """
+    file_format = file_format or detect_format(path)
+    if file_format not in READERS:
+        raise ValueError(f"Unknown input format: {file_format}")
+    if file_format == 'csv':
+        return CsvReader(path, compression, delimiter)
+    return READERS[file_format](path, compression=compression)
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+JSON serialization for API responses.
+Encodes MySQL column types (Decimal, date, datetime) and row models natively,
+uses orjson when it is installed and falls back to the standard library otherwise.
+"""
+import json
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import JSONProvider
+from ..config import JSON_SERIALIZER
+from ..models import Row
+from .cache import result_cache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+def json_default(value):
+    """Serialize types that the JSON encoders do not handle natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Row):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _stdlib_dumps(obj):
+    return json.dumps(obj, default=json_default, separators=(',', ':')).encode('utf-8')
+
+def _orjson_dumps(obj):
+    # orjson handles date/datetime itself; Decimal goes through json_default
+    return orjson.dumps(obj, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+
+if orjson is not None and JSON_SERIALIZER != 'stdlib':
+    dumps_bytes = _orjson_dumps
+    SERIALIZER_NAME = 'orjson'
+else:
+    if JSON_SERIALIZER == 'orjson':
+        logger.warning("orjson is not installed, falling back to the json module")
+    dumps_bytes = _stdlib_dumps
+    SERIALIZER_NAME = 'json'
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by dumps_bytes.
+
+    Responses for values held in the result cache are encoded once and the
+    bytes reused until the cache entry expires.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+
+        data = result_cache.get_encoded(obj)
+        if data is None:
+            data = dumps_bytes(obj)
+            result_cache.set_encoded(obj, data)
+
+        return self._app.response_class(data, mimetype=self.mimetype)
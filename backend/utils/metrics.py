@@ -0,0 +1,75 @@
+"""
+In-process metrics.
+A minimal registry of labelled counters and gauges, rendered in the Prometheus
+text format by the /metrics endpoint.
+"""
+import threading
+
+class MetricsRegistry:
+    """Thread-safe registry of counters and callback gauges."""
+
+    def __init__(self):
+        self._counters = {}
+        self._help = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, help_text):
+        """Set the help text shown for a metric."""
+        self._help[name] = help_text
+
+    def inc(self, name, value=1, **labels):
+        """Increment a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register_gauge(self, name, callback, help_text=None):
+        """
+        Register a gauge whose values are read when metrics are rendered.
+
+        Args:
+            name (str): Metric name
+            callback (callable): Returns a list of (labels dict, value) tuples
+            help_text (str): Optional help text
+        """
+        self._gauges[name] = callback
+        if help_text:
+            self._help[name] = help_text
+
+    def get(self, name, **labels):
+        """Current value of a counter."""
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def snapshot(self):
+        """
+        All current metric values.
+
+        Returns:
+            dict: Mapping of metric name to list of (labels dict, value) tuples
+        """
+        with self._lock:
+            counters = dict(self._counters)
+
+        metrics = {}
+        for (name, labels), value in sorted(counters.items()):
+            metrics.setdefault(name, []).append((dict(labels), value))
+        for name, callback in self._gauges.items():
+            metrics[name] = list(callback())
+        return metrics
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, samples in sorted(self.snapshot().items()):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            kind = 'gauge' if name in self._gauges else 'counter'
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+# Shared registry for the application
+metrics = MetricsRegistry()
@@ -0,0 +1,59 @@
+"""
+Alert notifiers.
+Deliver batches of price-drop alerts. Real delivery (email, push) plugs in by
+adding a class with a send(alerts) method to NOTIFIERS.
+"""
+import logging
+import os
+import queue
+import threading
+from ..config import ALERT_NOTIFIER, ALERT_OUTBOX_PATH
+from .json_provider import dumps_bytes
+
+logger = logging.getLogger(__name__)
+
+class FileNotifier:
+    """Appends alerts as JSON lines to an outbox file for another process to deliver."""
+
+    def __init__(self, path=ALERT_OUTBOX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, alerts):
+        if not alerts:
+            return
+        data = b''.join(dumps_bytes(alert) + b'\n' for alert in alerts)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(data)
+
+class QueueNotifier:
+    """Puts alert batches on an in-process queue, for consumers in the same process."""
+
+    def __init__(self, maxsize=0):
+        self.queue = queue.Queue(maxsize)
+
+    def send(self, alerts):
+        if alerts:
+            self.queue.put(alerts)
+
+class LogNotifier:
+    """Logs alerts; useful for dry runs."""
+
+    def send(self, alerts):
+        for alert in alerts:
+            logger.info(f"Price alert for watch {alert['watch_id']}: "
+                        f"{alert['product_id']} is now {alert['price']}")
+
+NOTIFIERS = {
+    'file': FileNotifier,
+    'queue': QueueNotifier,
+    'log': LogNotifier
+}
+
+def get_notifier(name=ALERT_NOTIFIER):
+    """Create the notifier configured by name."""
+    if name not in NOTIFIERS:
+        raise ValueError(f"Unknown alert notifier: {name}")
+    return NOTIFIERS[name]()
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+Prefix index utilities.
+A weighted prefix index over sorted keys, answering top-k prefix queries with
+bisect plus precomputed answers for prefixes that match many keys.
+"""
+import bisect
+import heapq
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+NON_ALNUM_PATTERN = re.compile(r'[^a-z0-9]+')
+
+def normalize_text(text):
+    """Lowercase text and collapse punctuation and whitespace to single spaces."""
+    return NON_ALNUM_PATTERN.sub(' ', (text or '').lower()).strip()
+
+class PrefixIndex:
+    """
+    Sorted-array prefix index.
+
+    Each key points to a suggestion and carries a weight. Prefixes matching more
+    than scan_limit keys have their top suggestions precomputed, so a query never
+    scans more than scan_limit keys.
+    """
+
+    def __init__(self, keys, targets, weights, suggestions, top=None, max_k=20, scan_limit=256):
+        self.keys = keys
+        self.targets = targets
+        self.weights = weights
+        self.suggestions = suggestions
+        self.max_k = max_k
+        self.scan_limit = scan_limit
+        self.top = top if top is not None else self._precompute_top()
+
+    @classmethod
+    def build(cls, entries, suggestions, max_k=20, scan_limit=256):
+        """
+        Build an index from (key, suggestion index, weight) entries.
+
+        Args:
+            entries (list): List of (key, suggestion index, weight) tuples
+            suggestions (list): Suggestion payloads referenced by the entries
+            max_k (int): Largest k a query can ask for
+            scan_limit (int): Largest key range scanned at query time
+
+        Returns:
+            PrefixIndex: Built index
+        """
+        entries = sorted((normalize_text(key), target, weight) for key, target, weight in entries)
+        entries = [entry for entry in entries if entry[0]]
+        return cls(
+            [e[0] for e in entries], [e[1] for e in entries], [e[2] for e in entries],
+            suggestions, max_k=max_k, scan_limit=scan_limit
+        )
+
+    def _best(self, lo, hi, k):
+        """Best k distinct suggestion indices among keys[lo:hi], highest weight first."""
+        candidates = heapq.nlargest(
+            k * 3, range(lo, hi), key=lambda i: self.weights[i]
+        )
+        best = []
+        seen = set()
+        for i in candidates:
+            target = self.targets[i]
+            if target not in seen:
+                seen.add(target)
+                best.append(target)
+                if len(best) == k:
+                    break
+        if len(best) < k and len(candidates) < hi - lo:
+            # Duplicates crowded out the candidates, fall back to a full ordering
+            for i in sorted(range(lo, hi), key=lambda i: self.weights[i], reverse=True):
+                target = self.targets[i]
+                if target not in seen:
+                    seen.add(target)
+                    best.append(target)
+                    if len(best) == k:
+                        break
+        return best
+
+    def _precompute_top(self):
+        """Precompute answers for every prefix matching more than scan_limit keys."""
+        top = {}
+        stack = [(0, len(self.keys), 1)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            # Split the range into groups sharing the first `depth` characters
+            i = lo
+            while i < hi:
+                key = self.keys[i]
+                if len(key) < depth:
+                    # Keys shorter than depth were covered at a lower depth
+                    i = bisect.bisect_right(self.keys, key, i, hi)
+                    continue
+                prefix = key[:depth]
+                j = self._range_end(prefix, i, hi)
+                if j - i > self.scan_limit:
+                    top[prefix] = self._best(i, j, self.max_k)
+                    stack.append((i, j, depth + 1))
+                i = j
+        return top
+
+    def _range_end(self, prefix, lo, hi):
+        """End of the run of keys in [lo, hi) starting with prefix."""
+        return bisect.bisect_left(self.keys, prefix + '\uffff', lo, hi)
+
+    def search(self, prefix, k=10):
+        """
+        Find the top-k suggestions for a prefix.
+
+        Args:
+            prefix (str): Query prefix
+            k (int): Number of suggestions to return
+
+        Returns:
+            list: Suggestion payloads, highest weight first
+        """
+        prefix = normalize_text(prefix)
+        if not prefix:
+            return []
+        k = min(k, self.max_k)
+
+        precomputed = self.top.get(prefix)
+        if precomputed is not None:
+            return [self.suggestions[t] for t in precomputed[:k]]
+
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = self._range_end(prefix, lo, len(self.keys))
+        return [self.suggestions[t] for t in self._best(lo, hi, k)]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def save(self, path):
+        """Write the index to a JSON file, replacing any previous file atomically."""
+        tmp_path = path + '.tmp'
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'keys': self.keys,
+                'targets': self.targets,
+                'weights': self.weights,
+                'suggestions': self.suggestions,
+                'top': self.top,
+                'max_k': self.max_k,
+                'scan_limit': self.scan_limit
+            }, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        logger.info(f"Saved prefix index with {len(self.keys)} keys to {path}")
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written with save, or return None if the file does not exist."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(
+            data['keys'], data['targets'], data['weights'], data['suggestions'],
+            top=data['top'], max_k=data['max_k'], scan_limit=data['scan_limit']
+        )
@@ -0,0 +1,284 @@
+"""
+Background job scheduler.
+Runs named jobs on an interval and after events (e.g. an import completing)
+in a small worker pool.
+
+Exclusive jobs run on one instance at a time across all nodes. A run takes the
+job's lease in job_leases, renews it while running and releases it when done.
+Local jobs, such as refreshing in-process caches, run on every instance. Every
+run is recorded in job_runs with its trigger, duration and outcome.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from ..config import JOB_WORKERS, JOB_TICK_SECONDS, JOB_LEASE_SECONDS, JOB_RETRY_SECONDS
+from .database import execute_query, execute_transaction
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+metrics.describe('job_runs_total', 'Background job runs, by job and status')
+metrics.describe('job_run_seconds_total', 'Time spent running background jobs, by job')
+
+def node_name():
+    """Name of this instance in leases and run history."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def emit_event(event):
+    """
+    Record an event, triggering the jobs that run after it on whichever instance
+    picks them up first.
+
+    Returns:
+        bool: True if the event was recorded
+    """
+    return execute_transaction([("INSERT INTO job_events (event) VALUES (%s)", (event,))])
+
+class Job:
+    """
+    A named unit of background work.
+
+    Args:
+        name (str): Unique job name
+        func (callable): Called without arguments; its return value is recorded
+            as the run's result
+        every (float): Seconds between runs, or None to run only on events
+        after (tuple): Events that trigger a run, e.g. ('import_completed',)
+        exclusive (bool): Run on one instance at a time across all nodes
+        max_concurrent (int): Runs allowed at once on an instance; exclusive
+            jobs never overlap anyway
+        lease_seconds (int): Lease of an exclusive run, renewed while it runs
+    """
+
+    def __init__(self, name, func, every=None, after=(), exclusive=True, max_concurrent=1,
+                 lease_seconds=JOB_LEASE_SECONDS):
+        self.name = name
+        self.func = func
+        self.every = every
+        self.after = tuple(after)
+        self.exclusive = exclusive
+        self.max_concurrent = max_concurrent
+        self.lease_seconds = lease_seconds
+        self.running = 0
+        self.requested = False
+        # Local jobs first run one interval after startup, when warm-up is done
+        self.last_started = time.monotonic()
+        self.finished = threading.Event()
+
+class Scheduler:
+    """
+    Starts due jobs from a background thread every tick_seconds.
+
+    Args:
+        workers (int): Size of the worker pool shared by all jobs
+        tick_seconds (float): Seconds between checks for due jobs
+    """
+
+    def __init__(self, workers=JOB_WORKERS, tick_seconds=JOB_TICK_SECONDS):
+        self.jobs = {}
+        self.workers = workers
+        self.tick_seconds = tick_seconds
+        self._pool = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # Lease tokens of the exclusive runs in progress here, by job name
+        self._leases = {}
+
+    def register(self, job):
+        """Add a job to the schedule."""
+        self.jobs[job.name] = job
+        return job
+
+    def start(self):
+        """Start the scheduler thread and the worker pool."""
+        if self._thread is not None:
+            return
+        exclusive = [(job.name,) for job in self.jobs.values() if job.exclusive]
+        if exclusive:
+            execute_query("INSERT IGNORE INTO job_leases (job) VALUES (%s)", exclusive, fetch=False, many=True)
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        self._thread = threading.Thread(target=self._loop, name='scheduler', daemon=True)
+        self._thread.start()
+        logger.info(f"Job scheduler started with {len(self.jobs)} jobs and {self.workers} workers")
+
+    def stop(self, wait=True):
+        """Stop scheduling new runs, optionally waiting for runs in progress."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def join(self):
+        """Block until the scheduler is stopped."""
+        while self._thread is not None and self._thread.is_alive():
+            self._thread.join(1)
+
+    def request_run(self, name):
+        """Run a job at the next tick, whatever its schedule."""
+        self.jobs[name].requested = True
+
+    def run_job(self, name, timeout=None):
+        """
+        Run a job as soon as possible and wait for the run to finish.
+
+        An exclusive job running elsewhere is run again once its lease is free.
+
+        Returns:
+            bool: True if the run finished within timeout
+        """
+        job = self.jobs[name]
+        job.finished.clear()
+        self.request_run(name)
+        self.start()
+        return job.finished.wait(timeout)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Job scheduler tick failed: {e}")
+            self._stop.wait(self.tick_seconds)
+
+    def tick(self):
+        """Renew held leases and start every due job with a free slot."""
+        self._renew_leases()
+
+        states = {}
+        events = {}
+        if any(job.exclusive for job in self.jobs.values()):
+            states = self._lease_states()
+            events = self._latest_events()
+
+        for job in self.jobs.values():
+            if job.running >= job.max_concurrent:
+                continue
+            if job.exclusive:
+                state = states.get(job.name)
+                if state is not None and not state['leased']:
+                    self._start_exclusive(job, state, events)
+            elif job.requested or (job.every is not None and time.monotonic() - job.last_started >= job.every):
+                trigger = 'manual' if job.requested else 'schedule'
+                job.requested = False
+                job.last_started = time.monotonic()
+                self._submit(job, trigger)
+
+    def _lease_states(self):
+        rows = execute_query("""
+        SELECT job, last_started_at, last_event_id, COALESCE(lease_until > NOW(3), 0) as leased, NOW(3) as now
+        FROM job_leases
+        """)
+        return {row['job']: row for row in rows or []}
+
+    def _latest_events(self):
+        rows = execute_query("SELECT event, MAX(event_id) as event_id FROM job_events GROUP BY event")
+        return {row['event']: row['event_id'] for row in rows or []}
+
+    def _due_trigger(self, job, state, events):
+        """Why an exclusive job is due, or None if it is not."""
+        if job.requested:
+            return 'manual'
+        pending = [event for event in job.after if events.get(event, 0) > state['last_event_id']]
+        if pending:
+            return f"event:{pending[0]}"
+        if job.every is not None and (
+                state['last_started_at'] is None
+                or (state['now'] - state['last_started_at']).total_seconds() >= job.every):
+            return 'schedule'
+        return None
+
+    def _start_exclusive(self, job, state, events):
+        trigger = self._due_trigger(job, state, events)
+        if trigger is None:
+            return
+
+        # The lease is only taken if nobody started the job since its state was
+        # read, so a run finished elsewhere in the meantime is not repeated
+        token = f"{node_name()}:{uuid.uuid4().hex[:8]}"
+        taken = execute_transaction([("""
+        UPDATE job_leases
+        SET owner = %s, lease_until = NOW(3) + INTERVAL %s SECOND, last_started_at = NOW(3)
+        WHERE job = %s AND (lease_until IS NULL OR lease_until < NOW(3)) AND last_started_at <=> %s
+        """, (token, job.lease_seconds, job.name, state['last_started_at']))])
+        if not taken:
+            return
+        rows = execute_query("SELECT owner FROM job_leases WHERE job = %s", (job.name,))
+        if not rows or rows[0]['owner'] != token:
+            return
+
+        job.requested = False
+        # Every event seen so far is covered by this run
+        event_id = max([events.get(event, 0) for event in job.after] + [state['last_event_id']])
+        self._submit(job, trigger, token, event_id)
+
+    def _renew_leases(self):
+        with self._lock:
+            held = list(self._leases.items())
+        for name, token in held:
+            execute_query("""
+            UPDATE job_leases SET lease_until = NOW(3) + INTERVAL %s SECOND
+            WHERE job = %s AND owner = %s
+            """, (self.jobs[name].lease_seconds, name, token), fetch=False)
+
+    def _submit(self, job, trigger, token=None, event_id=0):
+        with self._lock:
+            job.running += 1
+            if token:
+                self._leases[job.name] = token
+        self._pool.submit(self._run, job, trigger, token, event_id)
+
+    def _run(self, job, trigger, token, event_id):
+        started_at = datetime.now()
+        start = time.monotonic()
+        status = 'succeeded'
+        result = None
+        error = None
+        try:
+            logger.info(f"Running job {job.name} ({trigger})")
+            value = job.func()
+            result = None if value is None else str(value)[:255]
+        except Exception as e:
+            logger.error(f"Job {job.name} failed: {e}")
+            status = 'failed'
+            error = str(e)
+        finally:
+            duration = time.monotonic() - start
+            with self._lock:
+                job.running -= 1
+                self._leases.pop(job.name, None)
+            if token and status == 'succeeded':
+                execute_query("""
+                UPDATE job_leases
+                SET owner = NULL, lease_until = NULL, last_event_id = GREATEST(last_event_id, %s)
+                WHERE job = %s AND owner = %s
+                """, (event_id, job.name, token), fetch=False)
+            elif token:
+                # The events stay pending; holding the lease a while longer spaces out retries
+                execute_query("""
+                UPDATE job_leases
+                SET owner = NULL, lease_until = NOW(3) + INTERVAL %s SECOND
+                WHERE job = %s AND owner = %s
+                """, (JOB_RETRY_SECONDS, job.name, token), fetch=False)
+            self._record_run(job, trigger, started_at, duration, status, result, error)
+            job.finished.set()
+
+    def _record_run(self, job, trigger, started_at, duration, status, result, error):
+        metrics.inc('job_runs_total', job=job.name, status=status)
+        metrics.inc('job_run_seconds_total', round(duration, 3), job=job.name)
+        execute_query("""
+        INSERT INTO job_runs
+        (job, node, trigger_reason, started_at, finished_at, duration_ms, status, result, error)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (job.name, node_name(), trigger, started_at, datetime.now(), int(duration * 1000),
+              status, result, error), fetch=False)
+        logger.info(f"Job {job.name} {status} in {duration:.2f} seconds")
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Traffic recorder.
+Appends an anonymized record of every sampled API request to an NDJSON log,
+which benchmarks/loadtest.py replays against a test instance.
+
+Each record holds the method, the URL rule and its arguments, the query string,
+the JSON body, the time and the response status, size and duration. Fields that
+identify users (session IDs, subscribers) are replaced by pseudonyms that are
+stable within one process, so replayed sessions still group together.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+from flask import g, request
+from ..config import TRAFFIC_RECORD_PATH, TRAFFIC_RECORD_SAMPLE
+
+logger = logging.getLogger(__name__)
+
+# Query and body fields replaced by pseudonyms
+IDENTITY_FIELDS = ('session_id', 'subscriber')
+
+# Larger bodies are recorded by shape only
+MAX_BODY_BYTES = 64 * 1024
+
+_salt = os.urandom(16)
+
+def pseudonym(value):
+    """Stable, non-reversible stand-in for an identifying value."""
+    return 'anon-' + hashlib.blake2b(str(value).encode('utf-8'), key=_salt, digest_size=8).hexdigest()
+
+def anonymize(value):
+    """Replace identity fields anywhere in a JSON value."""
+    if isinstance(value, dict):
+        return {
+            key: pseudonym(item) if key in IDENTITY_FIELDS and item is not None else anonymize(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [anonymize(item) for item in value]
+    return value
+
+def body_shape(value):
+    """Structure of a JSON value with its contents replaced by type names."""
+    if isinstance(value, dict):
+        return {key: body_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [body_shape(value[0])] * len(value) if value else []
+    return type(value).__name__
+
+class TrafficRecorder:
+    """
+    Records sampled API requests of a Flask app.
+
+    Args:
+        path (str): NDJSON log to append to
+        sample_rate (float): Fraction of requests to record
+    """
+
+    def __init__(self, path=TRAFFIC_RECORD_PATH, sample_rate=TRAFFIC_RECORD_SAMPLE):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._fd = None
+
+    def init_app(self, app):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        app.before_request(self._start)
+        app.after_request(self._record)
+        logger.info(f"Recording {self.sample_rate:.0%} of API requests to {self.path}")
+
+    def _start(self):
+        if request.path.startswith('/api/') and random.random() < self.sample_rate:
+            g.traffic_started = time.perf_counter()
+
+    def _record(self, response):
+        started = g.pop('traffic_started', None)
+        if started is None:
+            return response
+        try:
+            self._write(self._entry(response, time.perf_counter() - started))
+        except Exception as e:
+            logger.warning(f"Error recording request {request.path}: {e}")
+        return response
+
+    def _entry(self, response, duration):
+        body = None
+        if request.content_length and request.is_json:
+            data = request.get_json(silent=True)
+            if data is not None:
+                body = anonymize(data)
+                if request.content_length > MAX_BODY_BYTES:
+                    body = {'_shape': body_shape(body)}
+
+        query = {
+            key: [pseudonym(v) for v in values] if key in IDENTITY_FIELDS else values
+            for key, values in request.args.lists()
+        }
+        return {
+            't': round(time.time(), 3),
+            'method': request.method,
+            'rule': request.url_rule.rule if request.url_rule else request.path,
+            'view_args': anonymize(request.view_args or {}),
+            'query': query,
+            'body': body,
+            'status': response.status_code,
+            # Streamed responses have no length yet; their duration is to the first byte
+            'bytes': response.calculate_content_length(),
+            'duration_ms': round(duration * 1000, 2)
+        }
+
+    def _write(self, entry):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        # One write per line; appends from several workers do not interleave
+        os.write(self._fd, (json.dumps(entry, default=str) + '\n').encode('utf-8'))
\ No newline at end of file
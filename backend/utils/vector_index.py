@@ -0,0 +1,214 @@
+"""
+Vector index utilities.
+Provides an inverted-file (IVF) nearest-neighbour index over unit-length
+feature vectors, built offline and loaded memory-mapped at query time.
+"""
+import json
+import os
+import logging
+import shutil
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+VECTORS_FILE = 'vectors.npy'
+CENTROIDS_FILE = 'centroids.npy'
+OFFSETS_FILE = 'offsets.npy'
+IDS_FILE = 'ids.json'
+
+def kmeans(vectors, n_clusters, iterations=10, sample_size=20000, seed=42):
+    """
+    Cluster unit-length vectors with spherical k-means.
+
+    Args:
+        vectors (ndarray): Matrix of shape (n, dim)
+        n_clusters (int): Number of clusters to produce
+        iterations (int): Number of Lloyd iterations
+        sample_size (int): Maximum number of vectors used for training
+        seed (int): Random seed for reproducible builds
+
+    Returns:
+        ndarray: Centroid matrix of shape (n_clusters, dim)
+    """
+    rng = np.random.default_rng(seed)
+    n = vectors.shape[0]
+
+    # Train on a sample so that build time stays bounded for large catalogs
+    if n > sample_size:
+        vectors = vectors[rng.choice(n, sample_size, replace=False)]
+        n = sample_size
+
+    n_clusters = max(1, min(n_clusters, n))
+    centroids = vectors[rng.choice(n, n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for c in range(n_clusters):
+            members = vectors[assignments == c]
+            if len(members) == 0:
+                # Re-seed empty clusters with a random vector
+                centroids[c] = vectors[rng.integers(n)]
+                continue
+            centroid = members.sum(axis=0)
+            norm = np.linalg.norm(centroid)
+            centroids[c] = centroid / norm if norm > 0 else centroid
+
+    return centroids
+
+def build_ivf_index(ids, vectors, n_lists=None):
+    """
+    Build an IVF index from product IDs and their feature vectors.
+
+    Args:
+        ids (list): Product IDs, one per row of vectors
+        vectors (ndarray): Unit-length feature matrix of shape (n, dim)
+        n_lists (int): Number of inverted lists (defaults to sqrt(n))
+
+    Returns:
+        IVFIndex: In-memory index
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if n_lists is None:
+        n_lists = max(1, int(np.sqrt(len(ids))))
+
+    centroids = kmeans(vectors, n_lists).astype(np.float32)
+    assignments = np.argmax(vectors @ centroids.T, axis=1)
+
+    # Store vectors grouped by list so each list is one contiguous slice
+    order = np.argsort(assignments, kind='stable')
+    counts = np.bincount(assignments, minlength=len(centroids))
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    sorted_ids = [ids[i] for i in order]
+    return IVFIndex(sorted_ids, vectors[order], centroids, offsets)
+
+def load_ivf_index(index_dir, mmap=True):
+    """
+    Load an IVF index previously written with IVFIndex.save.
+
+    Args:
+        index_dir (str): Directory containing the index files
+        mmap (bool): Memory-map the vector matrix instead of reading it
+
+    Returns:
+        IVFIndex: Loaded index or None if no index exists
+    """
+    manifest_path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    with open(os.path.join(index_dir, IDS_FILE), 'r', encoding='utf-8') as f:
+        ids = json.load(f)
+
+    vectors = np.load(os.path.join(index_dir, VECTORS_FILE), mmap_mode='r' if mmap else None)
+    centroids = np.load(os.path.join(index_dir, CENTROIDS_FILE))
+    offsets = np.load(os.path.join(index_dir, OFFSETS_FILE))
+
+    return IVFIndex(ids, vectors, centroids, offsets, metadata=manifest.get('metadata'))
+
+class IVFIndex:
+    """Inverted-file index answering top-k inner-product queries."""
+
+    def __init__(self, ids, vectors, centroids, offsets, metadata=None):
+        self.ids = ids
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.metadata = metadata or {}
+        self.positions = {product_id: i for i, product_id in enumerate(ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def vector_for(self, product_id):
+        """Return the stored vector for a product ID, or None if unknown."""
+        position = self.positions.get(product_id)
+        if position is None:
+            return None
+        return np.asarray(self.vectors[position])
+
+    def search(self, query, k=10, nprobe=8, exclude=None):
+        """
+        Find the k vectors with the highest inner product to the query.
+
+        Args:
+            query (ndarray): Unit-length query vector
+            k (int): Number of neighbours to return
+            nprobe (int): Number of inverted lists to scan
+            exclude (str): Product ID to leave out of the results
+
+        Returns:
+            list: List of (product_id, score) tuples, best first
+        """
+        nprobe = max(1, min(nprobe, len(self.centroids)))
+        list_scores = self.centroids @ query
+        probe_lists = np.argpartition(-list_scores, nprobe - 1)[:nprobe]
+
+        candidate_rows = np.concatenate([
+            np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe_lists
+        ])
+        if len(candidate_rows) == 0:
+            return []
+
+        # Rows of one list are contiguous, so this is a handful of slice reads
+        candidate_rows.sort()
+        scores = np.asarray(self.vectors[candidate_rows]) @ query
+        return self._top_k(candidate_rows, scores, k, exclude)
+
+    def brute_force_search(self, query, k=10, exclude=None):
+        """Exact top-k search over every vector, used for benchmarking recall."""
+        scores = np.asarray(self.vectors) @ query
+        return self._top_k(np.arange(len(self.ids)), scores, k, exclude)
+
+    def _top_k(self, rows, scores, k, exclude):
+        """Select the best k rows by score, skipping an excluded product ID."""
+        take = min(k + 1, len(rows))
+        top = np.argpartition(-scores, take - 1)[:take]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for i in top:
+            product_id = self.ids[rows[i]]
+            if product_id == exclude:
+                continue
+            results.append((product_id, float(scores[i])))
+            if len(results) == k:
+                break
+        return results
+
+    def save(self, index_dir):
+        """
+        Write the index to a directory.
+
+        Files are written to a temporary directory first and swapped in so
+        that readers never see a partially written index.
+        """
+        tmp_dir = index_dir.rstrip(os.sep) + '.tmp'
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        np.save(os.path.join(tmp_dir, VECTORS_FILE), np.asarray(self.vectors, dtype=np.float32))
+        np.save(os.path.join(tmp_dir, CENTROIDS_FILE), self.centroids)
+        np.save(os.path.join(tmp_dir, OFFSETS_FILE), self.offsets)
+        with open(os.path.join(tmp_dir, IDS_FILE), 'w', encoding='utf-8') as f:
+            json.dump(self.ids, f)
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump({
+                'size': len(self.ids),
+                'dim': int(self.centroids.shape[1]) if len(self.centroids) else 0,
+                'lists': len(self.centroids),
+                'metadata': self.metadata
+            }, f)
+
+        old_dir = index_dir.rstrip(os.sep) + '.old'
+        # A save interrupted after the swap leaves the previous index behind,
+        # and renaming onto a non-empty directory fails
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(index_dir):
+            os.replace(index_dir, old_dir)
+        os.replace(tmp_dir, index_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+        logger.info(f"Saved vector index with {len(self.ids)} vectors to {index_dir}")
@@ -0,0 +1,110 @@
+"""
+Benchmark for the comparison score matrix.
+
+Scores synthetic products on every metric, ranks them and computes the weighted
+overall score with:
+
+* A per-product Python loop computing the same matrix (normalization, ranks
+  and overall score), the straightforward port of calculate_comparison_metrics.
+* score_matrix, which works on whole metric columns with numpy.
+
+The legacy winners-only loop is timed for reference.
+
+Usage: python benchmarks/bench_comparison_matrix.py [repeats]
+"""
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.comparison_service import (
+    DEFAULT_WEIGHTS, METRICS, calculate_comparison_metrics, score_matrix
+)
+
+HIGHER_IS_BETTER = {'price': False, 'rating': True, 'discount': True, 'review_count': True, 'value': False}
+
+PRODUCT_COUNTS = (2, 4, 10, 25, 50, 100)
+
+def make_products(n, rng):
+    products = []
+    for i in range(n):
+        price = round(rng.uniform(5, 500), 2)
+        products.append({
+            'product_id': f"P{i:05d}",
+            'price': price,
+            'original_price': round(price * rng.uniform(1, 1.5), 2) if rng.random() < 0.6 else None,
+            'rating': round(rng.uniform(1, 5), 1) if rng.random() < 0.95 else None,
+            'rating_count': int(rng.paretovariate(1.2) * 10),
+            'reviews': []
+        })
+    return products
+
+def loop_matrix(products, weights=DEFAULT_WEIGHTS):
+    """Per-product loops computing the same scores, ranks and overall score."""
+    rows = []
+    for product in products:
+        price = float(product['price']) if product['price'] else None
+        original_price = float(product['original_price']) if product['original_price'] else None
+        rating = float(product['rating']) if product['rating'] else None
+        discount = None
+        if price is not None:
+            discount = (original_price - price) / original_price * 100 if original_price and original_price > price else 0.0
+        rows.append({
+            'price': price,
+            'rating': rating,
+            'discount': discount,
+            'review_count': math.log1p(product['rating_count']),
+            'value': price / rating if price is not None and rating else None
+        })
+
+    total_weight = sum(weights.values())
+    scores = [{} for _ in rows]
+    ranks = [{} for _ in rows]
+    for metric in METRICS:
+        sign = 1 if HIGHER_IS_BETTER[metric] else -1
+        present = [row[metric] * sign for row in rows if row[metric] is not None]
+        low = min(present) if present else 0
+        spread = (max(present) - low) if present else 0
+        for i, row in enumerate(rows):
+            if row[metric] is None:
+                scores[i][metric] = None
+                continue
+            scores[i][metric] = (row[metric] * sign - low) / spread if spread > 0 else 1.0
+        for i in range(len(rows)):
+            if scores[i][metric] is None:
+                ranks[i][metric] = None
+                continue
+            ranks[i][metric] = 1 + sum(
+                1 for other in scores if other[metric] is not None and other[metric] > scores[i][metric]
+            )
+
+    overall = [
+        sum((score[metric] or 0) * weights.get(metric, 0) for metric in METRICS) / total_weight
+        for score in scores
+    ]
+    overall_ranks = [1 + sum(1 for other in overall if other > value) for value in overall]
+    return scores, ranks, overall, overall_ranks
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(5)
+
+    print("{:>9} {:>14} {:>14} {:>14} {:>9}".format('products', 'legacy us', 'loop us', 'numpy us', 'speed-up'))
+    for n in PRODUCT_COUNTS:
+        products = make_products(n, rng)
+
+        # Both must rank the products the same way
+        _, _, _, loop_ranks = loop_matrix(products)
+        assert loop_ranks == score_matrix(products)['overall_ranks'].astype(int).tolist()
+
+        legacy = min(timeit.repeat(lambda: calculate_comparison_metrics(products), number=repeats, repeat=3)) / repeats
+        loop = min(timeit.repeat(lambda: loop_matrix(products), number=repeats, repeat=3)) / repeats
+        vectorized = min(timeit.repeat(lambda: score_matrix(products), number=repeats, repeat=3)) / repeats
+        print("{:>9} {:>14.1f} {:>14.1f} {:>14.1f} {:>8.1f}x".format(
+            n, legacy * 1e6, loop * 1e6, vectorized * 1e6, loop / vectorized))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Microbenchmark for API response serialization.
+
+Encodes a synthetic /api/products?limit=100 payload (Decimal prices and ratings,
+DATE and TIMESTAMP columns) with Flask's default provider, the fast provider on
+each available serializer, and a cached pre-serialized response.
+
+Usage: python benchmarks/bench_json_encoding.py [rows] [iterations]
+"""
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from backend.utils import json_provider
+from backend.utils.cache import result_cache
+
+def synthetic_products(n):
+    """Generate product rows shaped like the products table."""
+    now = datetime(2025, 3, 20, 12, 0, 0)
+    return [{
+        'product_id': 'B00{:07d}'.format(i),
+        'title': 'Wireless Bluetooth Speaker {} with Deep Bass and 20h Battery'.format(i),
+        'description': None,
+        'category': 'Electronics,Speakers,Portable Audio',
+        'price': Decimal('{}.99'.format(10 + i % 90)),
+        'original_price': Decimal('{}.99'.format(20 + i % 90)),
+        'rating': Decimal('4.{}'.format(i % 10)),
+        'rating_count': 100 + i,
+        'image_url': 'https://example.com/images/{}.jpg'.format(i),
+        'product_url': 'https://example.com/dp/{}'.format(i),
+        'brand': 'Acme',
+        'features': None,
+        'availability': 'In Stock',
+        'release_date': date(2024, 1, 1) + timedelta(days=i),
+        'created_at': now,
+        'updated_at': now
+    } for i in range(n)]
+
+def time_it(label, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = (time.perf_counter() - start) / iterations * 1e6
+    print("{:<32} {:>10.1f} us/response".format(label, elapsed))
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    payload = synthetic_products(rows)
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = json_provider.FastJSONProvider(app)
+
+    print("Encoding {} product rows, {} iterations\n".format(rows, iterations))
+    with app.app_context():
+        time_it('flask default jsonify', lambda: default_provider.response(payload), iterations)
+
+        original = json_provider.dumps_bytes
+        json_provider.dumps_bytes = json_provider._stdlib_dumps
+        time_it('fast provider (json)', lambda: fast_provider.response(payload), iterations)
+
+        if json_provider.orjson is not None:
+            json_provider.dumps_bytes = json_provider._orjson_dumps
+            time_it('fast provider (orjson)', lambda: fast_provider.response(payload), iterations)
+        else:
+            print("{:<32} {:>10}".format('fast provider (orjson)', 'not installed'))
+        json_provider.dumps_bytes = original
+
+        result_cache.set(('bench',), payload)
+        time_it('fast provider (cached bytes)', lambda: fast_provider.response(payload), iterations)
+        result_cache.invalidate('bench')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark for incremental price-drop alert evaluation.
+
+Runs against a seeded database (e.g. the synthetic dataset of loadtest.py
+imported with import_data.py). It adds synthetic watches on the stored
+products and a price delta that touches a fraction of them, then compares:
+
+* A full scan that reads every watch and checks it against the new prices.
+* evaluate_price_drops with the shipped queries: find_triggered_watches joins
+  the delta against price_watches through idx_price_watches_product_target,
+  and record_alerts stores the alerts and updates the watches.
+
+Product prices are not changed. The benchmark watches and their alerts are
+deleted afterwards.
+
+Usage: python benchmarks/bench_price_alerts.py [num_watches] [delta_fraction]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.alert_service import evaluate_price_drops
+from backend.utils.database import execute_query, execute_transaction, stream_query
+
+# Subscriber prefix of the benchmark watches, so they can be removed afterwards
+SUBSCRIBER_PREFIX = 'bench-price-alerts-'
+
+INSERT_CHUNK = 10000
+
+class CountingNotifier:
+    def __init__(self):
+        self.alerts = 0
+
+    def send(self, alerts):
+        self.alerts += len(alerts)
+
+def seed_watches(rng, prices, num_watches):
+    """Insert watches with targets below the current prices of random products."""
+    product_ids = list(prices)
+    query = """
+    INSERT INTO price_watches (subscriber, product_id, target_price)
+    VALUES (%s, %s, %s)
+    """
+    for start in range(0, num_watches, INSERT_CHUNK):
+        rows = []
+        for watch_id in range(start, min(start + INSERT_CHUNK, num_watches)):
+            product_id = rng.choice(product_ids)
+            rows.append((
+                f"{SUBSCRIBER_PREFIX}{watch_id}",
+                product_id,
+                round(prices[product_id] * rng.uniform(0.6, 0.99), 2)
+            ))
+        if not execute_transaction([(query, rows, True)], query_class='batch'):
+            raise SystemExit("Could not insert benchmark watches")
+
+def remove_watches():
+    """Delete the benchmark watches and the alerts they produced."""
+    pattern = f"{SUBSCRIBER_PREFIX}%"
+    execute_transaction([
+        ("""
+        DELETE a FROM price_alerts a
+        JOIN price_watches w ON w.watch_id = a.watch_id
+        WHERE w.subscriber LIKE %s
+        """, (pattern,)),
+        ("DELETE FROM price_watches WHERE subscriber LIKE %s", (pattern,))
+    ], query_class='batch')
+
+def full_scan(prices):
+    """Read every benchmark watch and check it against the new price of its product."""
+    query = """
+    SELECT watch_id, subscriber, product_id, target_price, last_alert_price
+    FROM price_watches
+    WHERE subscriber LIKE %s
+    """
+    triggered = []
+    for watch_id, subscriber, product_id, target_price, last_alert_price in stream_query(
+            query, (f"{SUBSCRIBER_PREFIX}%",), as_tuples=True):
+        price = prices[product_id]
+        if price <= float(target_price) and (last_alert_price is None or price < float(last_alert_price)):
+            triggered.append({
+                'watch_id': watch_id,
+                'subscriber': subscriber,
+                'product_id': product_id,
+                'target_price': target_price,
+                'price': price
+            })
+    return triggered
+
+def main():
+    num_watches = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    delta_fraction = float(sys.argv[2]) if len(sys.argv) > 2 else 0.01
+
+    rows = execute_query("SELECT product_id, price FROM products WHERE price > 0", as_tuples=True)
+    if not rows:
+        raise SystemExit("No products found; seed the database first (see the module docstring)")
+    prices = {product_id: float(price) for product_id, price in rows}
+
+    rng = random.Random(11)
+    remove_watches()
+    start = time.time()
+    seed_watches(rng, prices, num_watches)
+    print("Inserted {} watches on {} products in {:.2f} seconds".format(
+        num_watches, len(prices), time.time() - start))
+
+    try:
+        changed = rng.sample(list(prices), max(1, int(len(prices) * delta_fraction)))
+        deltas = {product_id: round(prices[product_id] * rng.uniform(0.5, 1.1), 2) for product_id in changed}
+        prices.update(deltas)
+        print("Price delta: {} products ({:.1%})".format(len(deltas), len(deltas) / len(prices)))
+
+        start = time.perf_counter()
+        scanned = full_scan(prices)
+        scan_seconds = time.perf_counter() - start
+
+        # Stores alerts and updates the watches, so it runs after the full scan
+        notifier = CountingNotifier()
+        start = time.perf_counter()
+        evaluate_price_drops(deltas, notifier)
+        delta_seconds = time.perf_counter() - start
+    finally:
+        remove_watches()
+
+    print("\n{:>12} {:>10} {:>12}".format('method', 'alerts', 'ms'))
+    print("{:>12} {:>10} {:>12.1f}".format('full scan', len(scanned), scan_seconds * 1000))
+    print("{:>12} {:>10} {:>12.1f}".format('delta join', notifier.alerts, delta_seconds * 1000))
+    print("\nSpeed-up: {:.0f}x".format(scan_seconds / delta_seconds))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
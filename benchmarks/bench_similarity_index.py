@@ -0,0 +1,90 @@
+"""
+Recall/latency benchmark for the similar-products index.
+
+Builds the IVF index over a synthetic catalog and compares its answers and
+query latency against exact brute-force search.
+
+Usage: python benchmarks/bench_similarity_index.py [num_products] [k]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services.similarity_service import build_feature_vectors
+from backend.utils.vector_index import build_ivf_index
+
+CATEGORIES = ['Electronics', 'Headphones', 'Speakers', 'Tablets', 'Kindle', 'Home Audio',
+              'Cameras', 'Computers', 'Accessories', 'Smart Home', 'Batteries', 'Cables']
+WORDS = ['wireless', 'bluetooth', 'portable', 'speaker', 'headphones', 'tablet', 'kindle',
+         'fire', 'echo', 'hd', 'pro', 'mini', 'charger', 'usb', 'cable', 'case', 'camera',
+         'smart', 'home', 'alexa', 'battery', 'pack', 'stereo', 'noise', 'cancelling',
+         'black', 'white', 'edition', 'gen', 'plus', 'max', 'lite', 'kids', 'display']
+
+def synthetic_products(n, seed=7):
+    """Generate a synthetic product catalog."""
+    rng = random.Random(seed)
+    products = []
+    for i in range(n):
+        categories = rng.sample(CATEGORIES, rng.randint(1, 3))
+        products.append({
+            'product_id': 'P{:08d}'.format(i),
+            'title': ' '.join(rng.choices(WORDS, k=rng.randint(3, 8))),
+            'category': ','.join(categories),
+            'price': round(rng.lognormvariate(3.5, 1.0), 2),
+            'rating': round(rng.uniform(1, 5), 1),
+            'review_count': int(rng.paretovariate(1.2))
+        })
+    return products
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    queries = 500
+
+    print("Generating {} synthetic products...".format(n))
+    products = synthetic_products(n)
+
+    start = time.time()
+    ids, vectors = build_feature_vectors(products)
+    index = build_ivf_index(ids, vectors)
+    print("Built index ({} lists) in {:.2f} seconds".format(len(index.centroids), time.time() - start))
+
+    query_ids = random.Random(1).sample(ids, queries)
+
+    brute_times = []
+    exact = {}
+    for product_id in query_ids:
+        q = index.vector_for(product_id)
+        t = time.perf_counter()
+        exact[product_id] = index.brute_force_search(q, k, exclude=product_id)
+        brute_times.append((time.perf_counter() - t) * 1000)
+
+    print("\n{:>8} {:>10} {:>10} {:>10}".format('nprobe', 'recall@k', 'p50 ms', 'p99 ms'))
+    print("{:>8} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+        'brute', 1.0, percentile(brute_times, 50), percentile(brute_times, 99)))
+
+    for nprobe in (1, 2, 4, 8, 16, 32):
+        times = []
+        hits = 0
+        for product_id in query_ids:
+            q = index.vector_for(product_id)
+            t = time.perf_counter()
+            approx = index.search(q, k, nprobe=nprobe, exclude=product_id)
+            times.append((time.perf_counter() - t) * 1000)
+            # Count ties with the k-th exact score as hits
+            threshold = exact[product_id][-1][1] - 1e-6 if exact[product_id] else 0
+            hits += sum(1 for _, score in approx if score >= threshold)
+
+        recall = hits / float(queries * k)
+        print("{:>8} {:>10.3f} {:>10.3f} {:>10.3f}".format(
+            nprobe, recall, percentile(times, 50), percentile(times, 99)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Latency benchmark for the search-as-you-type suggestion index.
+
+Builds the prefix index over a synthetic catalog and measures top-k query
+latency for prefixes of increasing length, as typed keystroke by keystroke.
+
+Usage: python benchmarks/bench_suggest_index.py [num_products] [k]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_similarity_index import synthetic_products
+from backend.services.suggest_service import build_suggest_entries
+from backend.utils.prefix_index import PrefixIndex
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    products = [
+        (p['product_id'], p['title'], 'Brand{}'.format(i % 500), p['category'], p['rating'], p['review_count'])
+        for i, p in enumerate(synthetic_products(n))
+    ]
+
+    start = time.time()
+    entries, suggestions = build_suggest_entries(products)
+    index = PrefixIndex.build(entries, suggestions)
+    print("Built index with {} keys ({} precomputed prefixes) in {:.2f} seconds".format(
+        len(index), len(index.top), time.time() - start))
+
+    rng = random.Random(3)
+    words = [p[1] for p in rng.sample(products, 200)]
+
+    print("\n{:>8} {:>10} {:>10} {:>10}".format('length', 'queries', 'p50 us', 'p99 us'))
+    for length in range(1, 13):
+        times = []
+        for title in words:
+            prefix = title[:length]
+            t = time.perf_counter()
+            index.search(prefix, k)
+            times.append((time.perf_counter() - t) * 1e6)
+        times.sort()
+        print("{:>8} {:>10} {:>10.1f} {:>10.1f}".format(
+            length, len(times), times[len(times) // 2], times[int(len(times) * 0.99)]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Query plan regression checker.
+
+Runs the read paths of the product, review, category and comparison services
+against a seeded database, collects every SELECT they issue and runs
+EXPLAIN FORMAT=JSON on each with its parameters. Flags full table and index
+scans, filesorts and temporary tables over --rows estimated rows, and compares
+the plans with a stored baseline:
+
+* A plan that gains a flagged operation, moves to a worse access type or
+  examines more than --growth times the baseline rows is a regression.
+* A statement missing from the baseline fails if it has flagged operations.
+
+The exit status is 1 on any failure, so it can gate the benchmark run. Seed the
+database the same way for the baseline and the checks, e.g.:
+
+    python benchmarks/loadtest.py generate data/synthetic.jsonl.gz
+    python backend/import_data.py data/synthetic.jsonl.gz
+    python benchmarks/check_query_plans.py --update     # record the baseline
+    python benchmarks/check_query_plans.py              # check against it
+
+Usage: python benchmarks/check_query_plans.py [--baseline PATH] [--rows N] [--growth X] [--update] [--strict] [--verbose]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.services import category_service, comparison_service, product_service, review_service
+from backend.services.category_service import split_category_string
+from backend.utils.database import capture_statements, execute_query
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'query_plans.json')
+
+# Offset of the deep pagination case
+DEEP_OFFSET = 1000
+
+# Access types from best to worst, as in the MySQL EXPLAIN documentation
+ACCESS_TYPES = [
+    'system', 'const', 'eq_ref', 'ref', 'fulltext', 'ref_or_null', 'index_merge',
+    'unique_subquery', 'index_subquery', 'range', 'index', 'ALL'
+]
+
+SCAN_ACCESS_TYPES = {'ALL': 'full table scan', 'index': 'full index scan'}
+
+PLAN_FLAGS = {'using_filesort': 'filesort', 'using_temporary_table': 'temporary table'}
+
+def sample_values():
+    """IDs and terms from the seeded database to call the services with."""
+    products = execute_query(
+        "SELECT product_id, category, brand FROM products ORDER BY product_id LIMIT 5"
+    )
+    if not products:
+        raise SystemExit("No products found; seed the database first (see the module docstring)")
+    sessions = execute_query("SELECT session_id FROM comparison_history ORDER BY comparison_id DESC LIMIT 1")
+    categories = split_category_string(products[0]['category'])
+    return {
+        'product_ids': [product['product_id'] for product in products],
+        'category': categories[0] if categories else 'Electronics',
+        'term': products[0]['brand'] or 'a',
+        'session_id': sessions[0]['session_id'] if sessions else 'plan-check'
+    }
+
+def workload(sample):
+    """
+    Service calls covering the read paths, by label.
+
+    Cached functions are called through .uncached so their queries always run.
+    """
+    ids = sample['product_ids']
+    return [
+        ('product_service.get_all_products', lambda: product_service.get_all_products()),
+        ('product_service.get_all_products[filters]', lambda: product_service.get_all_products(
+            category=sample['category'], min_price=10, max_price=500, min_rating=3)),
+        ('product_service.get_all_products[deep page]', lambda: product_service.get_all_products(offset=DEEP_OFFSET)),
+        ('product_service.get_product_by_id', lambda: product_service.get_product_by_id.uncached(ids[0])),
+        ('product_service.get_products_by_ids', lambda: product_service.get_products_by_ids(ids)),
+        ('product_service.get_top_discounted_products',
+         lambda: product_service.get_top_discounted_products.uncached()),
+        ('product_service.search_products', lambda: product_service.search_products(sample['term'])),
+        ('review_service.get_reviews_for_product', lambda: review_service.get_reviews_for_product(ids[0])),
+        ('review_service.get_reviews_for_products', lambda: review_service.get_reviews_for_products(ids)),
+        ('review_service.get_review_statistics', lambda: review_service.get_review_statistics.uncached(ids[0])),
+        ('review_service.analyze_review_sentiment', lambda: review_service.analyze_review_sentiment(ids[0])),
+        ('category_service.get_all_categories', lambda: category_service.get_all_categories.uncached()),
+        ('category_service.get_category_product_count',
+         lambda: category_service.get_category_product_count.uncached()),
+        ('comparison_service.compare_products', lambda: comparison_service.compare_products(ids[:3])),
+        ('comparison_service.get_comparison_history',
+         lambda: comparison_service.get_comparison_history(sample['session_id'])),
+        ('comparison_service.get_comparisons_for_product',
+         lambda: comparison_service.get_comparisons_for_product(ids[0])),
+    ]
+
+def normalize_sql(query):
+    """Statement text with whitespace collapsed and IN lists of any length alike."""
+    query = re.sub(r'\s+', ' ', query).strip()
+    return re.sub(r'IN \((?:%s, )*%s\)', 'IN (...)', query)
+
+def collect_statements(calls):
+    """
+    Run the service calls and collect the distinct SELECTs each one issues.
+
+    Returns:
+        dict: Mapping of statement key ("label sql-hash") to a dictionary with
+            the label, normalized SQL, query, params and shard
+    """
+    statements = {}
+    for label, call in calls:
+        with capture_statements() as captured:
+            try:
+                call()
+            except Exception as e:
+                # The statements issued up to the failure are still checked
+                print("Warning: {} failed: {}".format(label, e))
+        for query, params, _, shard in captured:
+            sql = normalize_sql(query)
+            if not re.match(r'(SELECT|WITH)\b', sql, re.IGNORECASE):
+                continue
+            key = f"{label} {hashlib.blake2b(sql.encode('utf-8'), digest_size=4).hexdigest()}"
+            statements.setdefault(key, {
+                'label': label, 'sql': sql, 'query': query, 'params': params, 'shard': shard
+            })
+    return statements
+
+def explain(statement):
+    """EXPLAIN FORMAT=JSON plan of a statement, or None if EXPLAIN failed."""
+    rows = execute_query(
+        "EXPLAIN FORMAT=JSON " + statement['query'], statement['params'],
+        as_tuples=True, query_class='analytics', shard=statement['shard']
+    )
+    return json.loads(rows[0][0]) if rows else None
+
+def summarize_plan(plan):
+    """
+    Tables and flagged operations of an EXPLAIN FORMAT=JSON plan.
+
+    Each operation carries the largest row estimate of the tables under it,
+    i.e. roughly how many rows it has to sort or store.
+
+    Returns:
+        dict: cost, tables (table, access_type, key, rows in plan order) and
+            operations (operation, rows)
+    """
+    tables = []
+    operations = []
+
+    def walk(node):
+        """Largest row estimate under a node, and its flags still without one."""
+        if isinstance(node, list):
+            results = [walk(item) for item in node]
+            return max([rows for rows, _ in results], default=0), [op for _, ops in results for op in ops]
+        if not isinstance(node, dict):
+            return 0, []
+        rows = 0
+        if 'table_name' in node:
+            rows = int(node.get('rows_examined_per_scan') or 0)
+            tables.append({
+                'table': node['table_name'],
+                'access_type': node.get('access_type'),
+                'key': node.get('key'),
+                'rows': rows
+            })
+        pending = []
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                child_rows, child_pending = walk(value)
+                rows = max(rows, child_rows)
+                pending += child_pending
+        pending += [operation for flag, operation in PLAN_FLAGS.items() if node.get(flag)]
+        # Flags without tables under them (e.g. a window's sort) apply to
+        # the rows of the enclosing operation
+        if rows:
+            operations.extend({'operation': operation, 'rows': rows} for operation in pending)
+            pending = []
+        return rows, pending
+
+    query_block = plan.get('query_block', plan)
+    _, pending = walk(query_block)
+    operations.extend({'operation': operation, 'rows': 0} for operation in pending)
+    return {
+        'cost': float(query_block.get('cost_info', {}).get('query_cost') or 0),
+        'tables': tables,
+        'operations': operations
+    }
+
+def plan_issues(summary, min_rows):
+    """
+    Flagged operations of a plan summary over min_rows estimated rows.
+
+    Returns:
+        dict: Mapping of issue key (e.g. "full table scan:products") to a description
+    """
+    issues = {}
+    for table in summary['tables']:
+        scan = SCAN_ACCESS_TYPES.get(table['access_type'])
+        if scan and table['rows'] >= min_rows:
+            issues[f"{scan}:{table['table']}"] = f"{scan} of {table['table']} ({table['rows']} rows)"
+    # An operation done several times is reported once, for its most rows
+    for operation in sorted(summary['operations'], key=lambda op: op['rows']):
+        if operation['rows'] >= min_rows:
+            issues[operation['operation']] = f"{operation['operation']} over {operation['rows']} rows"
+    return issues
+
+def _access_rank(access_type):
+    return ACCESS_TYPES.index(access_type) if access_type in ACCESS_TYPES else 0
+
+def plan_regressions(summary, baseline, min_rows, growth):
+    """
+    Ways a plan got worse than its baseline.
+
+    Returns:
+        list: Descriptions of the regressions, empty if none
+    """
+    regressions = []
+    current_issues = plan_issues(summary, min_rows)
+    baseline_issues = plan_issues(baseline, min_rows)
+    regressions += [current_issues[key] for key in current_issues if key not in baseline_issues]
+
+    baseline_tables = {}
+    for table in baseline['tables']:
+        baseline_tables.setdefault(table['table'], table)
+    for table in summary['tables']:
+        before = baseline_tables.get(table['table'])
+        if before is None:
+            continue
+        if _access_rank(table['access_type']) > _access_rank(before['access_type']):
+            regressions.append(
+                f"{table['table']} access {before['access_type']} ({before['key']}) -> "
+                f"{table['access_type']} ({table['key']})"
+            )
+        if table['rows'] >= min_rows and table['rows'] > before['rows'] * growth:
+            regressions.append(f"{table['table']} rows {before['rows']} -> {table['rows']}")
+    return regressions
+
+def check(statements, baseline, min_rows, growth, strict=False):
+    """
+    Explain every statement and compare it with the baseline.
+
+    Returns:
+        tuple: (list of result dictionaries, mapping of key to plan summary)
+    """
+    results = []
+    summaries = {}
+    for key, statement in sorted(statements.items()):
+        plan = explain(statement)
+        if plan is None:
+            results.append({'key': key, 'status': 'FAILED', 'details': ['EXPLAIN failed'], 'cost': None})
+            continue
+        summary = summarize_plan(plan)
+        summary['sql'] = statement['sql']
+        summaries[key] = summary
+
+        issues = list(plan_issues(summary, min_rows).values())
+        if key in baseline:
+            regressions = plan_regressions(summary, baseline[key], min_rows, growth)
+            if regressions:
+                status, details = 'REGRESSION', regressions
+            elif issues:
+                status, details = ('FAILED' if strict else 'known'), issues
+            else:
+                status, details = 'ok', []
+        elif issues:
+            status, details = 'NEW', issues
+        else:
+            status, details = 'new', []
+        results.append({'key': key, 'status': status, 'details': details, 'cost': summary['cost']})
+    return results, summaries
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the query plans of the service queries against a baseline.')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline plans file')
+    parser.add_argument('--rows', type=int, default=1000,
+                        help='Flag scans, filesorts and temporary tables over this many estimated rows')
+    parser.add_argument('--growth', type=float, default=2.0,
+                        help='Fail when a table examines this many times its baseline rows')
+    parser.add_argument('--update', action='store_true', help='Write the current plans as the baseline')
+    parser.add_argument('--strict', action='store_true', help='Also fail on flagged plans already in the baseline')
+    parser.add_argument('--verbose', action='store_true', help='Print the SQL of failing statements')
+    args = parser.parse_args()
+
+    statements = collect_statements(workload(sample_values()))
+    baseline = {} if args.update else load_baseline(args.baseline)
+    results, summaries = check(statements, baseline, args.rows, args.growth, args.strict)
+
+    print("{:<64} {:>10} {:>11}  {}".format('statement', 'status', 'cost', 'details'))
+    for result in results:
+        cost = '{:.1f}'.format(result['cost']) if result['cost'] is not None else '-'
+        print("{:<64} {:>10} {:>11}  {}".format(
+            result['key'][:64], result['status'], cost, '; '.join(result['details'])))
+        if args.verbose and result['status'] in ('REGRESSION', 'NEW', 'FAILED'):
+            print("    " + statements[result['key']]['sql'])
+
+    for key in sorted(set(baseline) - set(statements)):
+        print("{:<64} {:>10}".format(key[:64], 'gone'))
+
+    if args.update:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2, sort_keys=True)
+        print("\nWrote {} plans to {}".format(len(summaries), args.baseline))
+        return
+
+    failed = [result for result in results if result['status'] in ('REGRESSION', 'NEW', 'FAILED')]
+    if not baseline:
+        print("\nNo baseline at {}; record one with --update".format(args.baseline))
+    print("\n{} statements, {} failing".format(len(results), len(failed)))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,382 @@
+"""
+Load-test harness: replays recorded API traffic against a test instance and
+compares runs.
+
+Record traffic by running the app with TRAFFIC_RECORD_PATH set (see
+backend/utils/traffic_recorder.py), then:
+
+    python benchmarks/loadtest.py generate data/synthetic.jsonl.gz
+    python backend/import_data.py data/synthetic.jsonl.gz
+    python benchmarks/loadtest.py replay data/traffic.ndjson --speed 5 --remap-products --out before.json
+    ... change the code, restart the instance ...
+    python benchmarks/loadtest.py replay data/traffic.ndjson --speed 5 --remap-products --baseline before.json
+
+Replay keeps the recorded arrival pattern, compressed by --speed, so the
+instance sees the same traffic mix. Each run reports throughput, error rate and
+latency percentiles per endpoint. `compare` prints two saved runs side by side,
+and `report` summarizes a run or the latencies recorded in a traffic log.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+PERCENTILES = (50, 90, 99)
+
+# Requests sent this late have queued behind busy workers
+LAG_WARNING_MS = 100
+
+RULE_ARGUMENT = re.compile(r'<(?:[^:<>]+:)?([^<>]+)>')
+
+def load_traffic(path):
+    """Recorded requests of a traffic log, oldest first."""
+    with open(path, 'r', encoding='utf-8') as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return sorted(records, key=lambda record: record['t'])
+
+def endpoint_key(record):
+    return f"{record['method']} {record['rule']}"
+
+class ProductMapper:
+    """
+    Maps recorded product IDs onto IDs that exist on the test instance.
+
+    The same recorded ID always maps to the same local ID, so repeated requests
+    for a popular product stay repeated.
+    """
+
+    def __init__(self, local_ids):
+        if not local_ids:
+            raise ValueError("The test instance returned no products to map onto")
+        self.local_ids = local_ids
+
+    @classmethod
+    def from_instance(cls, target, limit=1000):
+        with urllib.request.urlopen(f"{target}/api/products?limit={limit}", timeout=30) as response:
+            products = json.load(response)
+        return cls(sorted(product['product_id'] for product in products))
+
+    def map(self, product_id):
+        digest = hashlib.blake2b(str(product_id).encode('utf-8'), digest_size=8).digest()
+        return self.local_ids[int.from_bytes(digest, 'big') % len(self.local_ids)]
+
+    def apply(self, record):
+        """Copy of a record with every product ID replaced."""
+        record = dict(record)
+        record['view_args'] = {
+            key: self.map(value) if key == 'product_id' else value
+            for key, value in record.get('view_args', {}).items()
+        }
+        record['query'] = {
+            key: [self.map(v) for v in values] if key == 'product_id' else values
+            for key, values in record.get('query', {}).items()
+        }
+        body = record.get('body')
+        if isinstance(body, dict):
+            body = dict(body)
+            if isinstance(body.get('product_ids'), list):
+                body['product_ids'] = [self.map(v) for v in body['product_ids']]
+            if 'product_id' in body:
+                body['product_id'] = self.map(body['product_id'])
+            record['body'] = body
+        return record
+
+def build_request(record, target):
+    """urllib request for a recorded request."""
+    view_args = record.get('view_args', {})
+    path = RULE_ARGUMENT.sub(
+        lambda m: urllib.parse.quote(str(view_args.get(m.group(1), '')), safe=''), record['rule']
+    )
+    query = urllib.parse.urlencode(record.get('query', {}), doseq=True)
+    url = f"{target}{path}" + (f"?{query}" if query else '')
+
+    data = None
+    headers = {}
+    body = record.get('body')
+    if body is not None and '_shape' not in body:
+        data = json.dumps(body).encode('utf-8')
+        headers['Content-Type'] = 'application/json'
+    return urllib.request.Request(url, data=data, headers=headers, method=record['method'])
+
+def send(record, target, timeout, scheduled=None):
+    """
+    Send one request and read the whole response.
+
+    Latency is measured from scheduled (a time.perf_counter() value) when it is
+    given, so time spent waiting for a free worker counts against the instance
+    instead of being left out (coordinated omission).
+    """
+    req = build_request(record, target)
+    start = time.perf_counter()
+    if scheduled is None:
+        scheduled = start
+    status = 0
+    size = 0
+    error = None
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            status = response.status
+            size = len(response.read())
+    except urllib.error.HTTPError as e:
+        status = e.code
+        size = len(e.read())
+    except Exception as e:
+        error = type(e).__name__
+    return {
+        'endpoint': endpoint_key(record),
+        'status': status,
+        'bytes': size,
+        'latency_ms': (time.perf_counter() - scheduled) * 1000,
+        'lag_ms': (start - scheduled) * 1000,
+        'error': error
+    }
+
+def replay(records, target, speed=1.0, concurrency=64, timeout=30, mapper=None):
+    """
+    Replay requests at their recorded pace divided by speed.
+
+    Requests are scheduled whether or not earlier ones have returned (an open
+    workload) and sent as soon as one of concurrency workers is free. Latency
+    runs from a request's scheduled time, and its lag is the time between
+    schedule and send, so a backed-up queue shows up in both.
+
+    Returns:
+        tuple: (list of result dictionaries, wall-clock seconds, max schedule lag in ms)
+    """
+    results = []
+    lock = threading.Lock()
+
+    def run(record, scheduled):
+        result = send(record, target, timeout, scheduled)
+        with lock:
+            results.append(result)
+
+    first = records[0]['t'] if records else 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record in records:
+            scheduled = start + (record['t'] - first) / speed
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run, mapper.apply(record) if mapper else record, scheduled)
+    max_lag = max((result['lag_ms'] for result in results), default=0.0)
+    return results, time.perf_counter() - start, max_lag
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+def _stats(results, seconds):
+    latencies = sorted(result['latency_ms'] for result in results)
+    errors = sum(1 for result in results if result['status'] == 0 or result['status'] >= 500)
+    client_errors = sum(1 for result in results if 400 <= result['status'] < 500)
+    stats = {
+        'requests': len(results),
+        'throughput': round(len(results) / seconds, 2) if seconds else None,
+        'error_rate': round(errors / len(results), 4) if results else 0,
+        'client_error_rate': round(client_errors / len(results), 4) if results else 0
+    }
+    for p in PERCENTILES:
+        value = percentile(latencies, p)
+        stats[f"p{p}_ms"] = round(value, 2) if value is not None else None
+    stats['max_ms'] = round(latencies[-1], 2) if latencies else None
+    return stats
+
+def summarize(results, seconds):
+    """
+    Overall and per-endpoint statistics of a set of results.
+
+    Returns:
+        dict: 'overall' and 'endpoints' (mapping of "METHOD rule" to statistics)
+    """
+    by_endpoint = {}
+    for result in results:
+        by_endpoint.setdefault(result['endpoint'], []).append(result)
+    return {
+        'overall': _stats(results, seconds),
+        'endpoints': {
+            endpoint: _stats(items, seconds)
+            for endpoint, items in sorted(by_endpoint.items(), key=lambda item: -len(item[1]))
+        }
+    }
+
+def recorded_results(records):
+    """Results as the recording instance served them, from a traffic log."""
+    return [{
+        'endpoint': endpoint_key(record),
+        'status': record['status'],
+        'latency_ms': record['duration_ms']
+    } for record in records]
+
+def print_report(run):
+    overall = run['overall']
+    print(f"{overall['requests']} requests, {overall['throughput']} req/s, "
+          f"{overall['error_rate']:.2%} errors, {overall['client_error_rate']:.2%} client errors")
+    print("\n{:<52} {:>7} {:>8} {:>9} {:>9} {:>9}".format('endpoint', 'count', 'errors', 'p50 ms', 'p90 ms', 'p99 ms'))
+    for endpoint, stats in [('overall', overall)] + list(run['endpoints'].items()):
+        print("{:<52} {:>7} {:>8.2%} {:>9} {:>9} {:>9}".format(
+            endpoint[:52], stats['requests'], stats['error_rate'], stats['p50_ms'], stats['p90_ms'], stats['p99_ms']))
+
+def _change(before, after):
+    if before is None or after is None:
+        return ''
+    if before == 0:
+        return '' if after == 0 else '+inf'
+    return f"{(after - before) / before:+.0%}"
+
+def print_comparison(before, after):
+    """Print two runs side by side, per endpoint present in either."""
+    b, a = before['overall'], after['overall']
+    print(f"throughput {b['throughput']} -> {a['throughput']} req/s ({_change(b['throughput'], a['throughput'])}), "
+          f"errors {b['error_rate']:.2%} -> {a['error_rate']:.2%}")
+    print("\n{:<46} {:>7} {:>19} {:>7} {:>19} {:>7}".format(
+        'endpoint', 'count', 'p50 ms', '', 'p99 ms', ''))
+    endpoints = [('overall', b, a)] + [
+        (endpoint, before['endpoints'].get(endpoint), after['endpoints'].get(endpoint))
+        for endpoint in dict.fromkeys(list(before['endpoints']) + list(after['endpoints']))
+    ]
+    for endpoint, old, new in endpoints:
+        old = old or {}
+        new = new or {}
+        print("{:<46} {:>7} {:>19} {:>7} {:>19} {:>7}".format(
+            endpoint[:46], new.get('requests', 0),
+            f"{old.get('p50_ms')} -> {new.get('p50_ms')}", _change(old.get('p50_ms'), new.get('p50_ms')),
+            f"{old.get('p99_ms')} -> {new.get('p99_ms')}", _change(old.get('p99_ms'), new.get('p99_ms'))))
+
+def generate_dataset(path, products=2000, reviews_per_product=10, seed=7):
+    """
+    Write a synthetic product and review dataset in the importer's JSON Lines format.
+
+    Returns:
+        int: Number of rows written
+    """
+    rng = random.Random(seed)
+    categories = ['Electronics', 'Home & Kitchen', 'Toys', 'Books', 'Sports', 'Beauty', 'Garden', 'Office']
+    brands = [f"Brand{i}" for i in range(60)]
+    words = ['great', 'battery', 'quality', 'price', 'screen', 'sound', 'cheap', 'sturdy', 'broke',
+             'fast', 'slow', 'comfortable', 'value', 'recommend', 'return', 'easy', 'setup', 'size']
+
+    opener = gzip.open if path.endswith('.gz') else open
+    rows = 0
+    with opener(path, 'wt', encoding='utf-8') as f:
+        for i in range(products):
+            price = round(rng.lognormvariate(3.5, 0.9), 2)
+            product = {
+                'asins': f"SYN{i:07d}",
+                'name': f"{rng.choice(brands)} {rng.choice(words).title()} {rng.choice(categories)} Item {i}",
+                'brand': rng.choice(brands),
+                'categories': rng.choice(categories),
+                'prices': [{'amountMin': price, 'amountMax': round(price * rng.uniform(1, 1.4), 2),
+                            'currency': 'USD', 'dateAdded': '2024-01-01T00:00:00Z'}]
+            }
+            # Review counts are skewed like real catalogues
+            for _ in range(max(1, int(rng.paretovariate(1.5) * reviews_per_product / 3))):
+                text = ' '.join(rng.choice(words) for _ in range(rng.randint(8, 40)))
+                row = dict(product, **{
+                    'reviews.rating': rng.choice([1, 2, 3, 4, 4, 5, 5, 5]),
+                    'reviews.title': ' '.join(rng.choice(words) for _ in range(3)),
+                    'reviews.text': text,
+                    'reviews.username': f"user{rng.randint(1, products * 5)}",
+                    'reviews.numHelpful': int(rng.expovariate(0.3)),
+                    'reviews.date': (date(2023, 1, 1) + timedelta(days=rng.randint(0, 700))).isoformat() + 'T00:00:00Z'
+                })
+                f.write(json.dumps(row) + '\n')
+                rows += 1
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay recorded API traffic and compare load-test runs.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Write a synthetic dataset for import_data.py')
+    generate.add_argument('path', help='Output file, .jsonl or .jsonl.gz')
+    generate.add_argument('--products', type=int, default=2000)
+    generate.add_argument('--reviews-per-product', type=int, default=10)
+    generate.add_argument('--seed', type=int, default=7)
+
+    run = commands.add_parser('replay', help='Replay a traffic log against an instance')
+    run.add_argument('traffic', help='Traffic log written by the recorder')
+    run.add_argument('--target', default=os.getenv('LOADTEST_TARGET', 'http://localhost:9876'))
+    run.add_argument('--speed', type=float, default=1.0, help='Replay this many times faster than recorded')
+    run.add_argument('--concurrency', type=int, default=64, help='Maximum requests in flight')
+    run.add_argument('--timeout', type=float, default=30)
+    run.add_argument('--limit', type=int, help='Replay only the first N requests')
+    run.add_argument('--remap-products', action='store_true',
+                     help='Map recorded product IDs onto products of the target instance')
+    run.add_argument('--out', help='Save the run summary to this file')
+    run.add_argument('--baseline', help='Saved run to compare this run with')
+
+    report = commands.add_parser('report', help='Summarize a saved run, or the latencies in a traffic log')
+    report.add_argument('path')
+
+    compare = commands.add_parser('compare', help='Compare two saved runs')
+    compare.add_argument('before')
+    compare.add_argument('after')
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        rows = generate_dataset(args.path, args.products, args.reviews_per_product, args.seed)
+        print(f"Wrote {rows} rows for {args.products} products to {args.path}")
+
+    elif args.command == 'replay':
+        records = load_traffic(args.traffic)[:args.limit]
+        mapper = ProductMapper.from_instance(args.target) if args.remap_products else None
+        span = records[-1]['t'] - records[0]['t'] if records else 0
+        print(f"Replaying {len(records)} requests recorded over {span:.0f} seconds at {args.speed}x against {args.target}")
+
+        results, seconds, max_lag = replay(records, args.target, args.speed, args.concurrency, args.timeout, mapper)
+        summary = summarize(results, seconds)
+        summary['meta'] = {
+            'traffic': args.traffic, 'target': args.target, 'speed': args.speed,
+            'concurrency': args.concurrency, 'seconds': round(seconds, 2), 'max_lag_ms': round(max_lag, 1)
+        }
+        late = sum(1 for result in results if result['lag_ms'] > LAG_WARNING_MS)
+        if late:
+            print(f"Warning: {late} requests waited over {LAG_WARNING_MS} ms for a worker (up to {max_lag:.0f} ms); "
+                  "their latency includes the wait. Raise --concurrency or lower --speed")
+        print_report(summary)
+        if args.out:
+            with open(args.out, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+        if args.baseline:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+            print(f"\nCompared with {args.baseline}:")
+            print_comparison(baseline, summary)
+
+    elif args.command == 'report':
+        with open(args.path, 'r', encoding='utf-8') as f:
+            first = f.readline()
+        if '"overall"' in first or first.strip() == '{':
+            with open(args.path, 'r', encoding='utf-8') as f:
+                print_report(json.load(f))
+        else:
+            records = load_traffic(args.path)
+            span = records[-1]['t'] - records[0]['t'] if records else 0
+            print_report(summarize(recorded_results(records), span))
+
+    elif args.command == 'compare':
+        with open(args.before, 'r', encoding='utf-8') as f:
+            before = json.load(f)
+        with open(args.after, 'r', encoding='utf-8') as f:
+            after = json.load(f)
+        print_comparison(before, after)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,25 @@
+-- Migration: normalize comparison_history product ids into a child table
+-- and index history lookups by session.
+USE amasift_compare;
+
+CREATE TABLE IF NOT EXISTS comparison_history_products (
+    comparison_id INT NOT NULL,
+    position TINYINT UNSIGNED NOT NULL,
+    product_id VARCHAR(255) NOT NULL,
+    PRIMARY KEY (comparison_id, position),
+    INDEX idx_comparison_products_product (product_id, comparison_id)
+);
+
+-- Backfill from the comma-joined product_ids column
+INSERT IGNORE INTO comparison_history_products (comparison_id, position, product_id)
+SELECT h.comparison_id, j.position - 1, TRIM(j.product_id)
+FROM comparison_history h
+JOIN JSON_TABLE(
+    CONCAT('["', REPLACE(h.product_ids, ',', '","'), '"]'),
+    '$[*]' COLUMNS (position FOR ORDINALITY, product_id VARCHAR(255) PATH '$')
+) j
+WHERE h.product_ids IS NOT NULL AND h.product_ids != '';
+
+CREATE INDEX idx_comparison_history_session ON comparison_history(session_id, created_at);
+
+ALTER TABLE comparison_history DROP COLUMN product_ids;
@@ -0,0 +1,60 @@
+-- Migration: range-partition the append-only log tables by month on created_at
+-- and add the daily roll-up tables used by retention_service.
+-- Partitioning rebuilds each table once; run it in a maintenance window, then
+-- run `python -m backend.services.retention_service` to create monthly partitions.
+USE amasift_compare;
+
+ALTER TABLE user_searches
+    MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (search_id, created_at),
+    -- Daily roll-ups read one day of a partition at a time
+    ADD INDEX idx_user_searches_created (created_at);
+ALTER TABLE user_searches
+    PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+        PARTITION p_future VALUES LESS THAN MAXVALUE
+    );
+
+ALTER TABLE comparison_history
+    MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (comparison_id, created_at);
+ALTER TABLE comparison_history
+    PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+        PARTITION p_future VALUES LESS THAN MAXVALUE
+    );
+
+ALTER TABLE comparison_history_products
+    ADD COLUMN created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP;
+UPDATE comparison_history_products p
+JOIN comparison_history h ON h.comparison_id = p.comparison_id
+SET p.created_at = h.created_at;
+ALTER TABLE comparison_history_products
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (comparison_id, position, created_at);
+ALTER TABLE comparison_history_products
+    PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+        PARTITION p_future VALUES LESS THAN MAXVALUE
+    );
+
+CREATE TABLE IF NOT EXISTS comparison_daily_stats (
+    day DATE NOT NULL,
+    product_id VARCHAR(255) NOT NULL,
+    comparisons INT NOT NULL DEFAULT 0,
+    sessions INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, product_id)
+)
+PARTITION BY RANGE (TO_DAYS(day)) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+CREATE TABLE IF NOT EXISTS search_daily_stats (
+    day DATE NOT NULL,
+    search_term VARCHAR(255) NOT NULL,
+    searches INT NOT NULL DEFAULT 0,
+    sessions INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, search_term)
+)
+PARTITION BY RANGE (TO_DAYS(day)) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
@@ -0,0 +1,33 @@
+-- Migration: add the price history time series and its roll-up tables.
+-- Run `python -m backend.services.price_history_service` daily to roll up completed days.
+USE amasift_compare;
+
+-- Product price changes, appended by import_data only when a price changes
+CREATE TABLE IF NOT EXISTS price_history (
+    product_id VARCHAR(255) NOT NULL,
+    ts TIMESTAMP NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    original_price DECIMAL(10, 2),
+    PRIMARY KEY (product_id, ts),
+    INDEX idx_price_history_ts (ts)
+);
+
+-- Daily and weekly price buckets rolled up from price_history by price_history_service
+CREATE TABLE IF NOT EXISTS price_history_rollups (
+    product_id VARCHAR(255) NOT NULL,
+    resolution ENUM('day', 'week') NOT NULL,
+    bucket DATE NOT NULL,
+    min_price DECIMAL(10, 2) NOT NULL,
+    max_price DECIMAL(10, 2) NOT NULL,
+    last_price DECIMAL(10, 2) NOT NULL,
+    last_original_price DECIMAL(10, 2),
+    points INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (product_id, resolution, bucket),
+    INDEX idx_price_rollups_bucket (resolution, bucket)
+);
+
+-- First day not yet rolled up, per resolution
+CREATE TABLE IF NOT EXISTS price_history_rollup_state (
+    resolution ENUM('day', 'week') PRIMARY KEY,
+    rolled_up_to DATE NOT NULL
+);
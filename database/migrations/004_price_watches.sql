@@ -0,0 +1,27 @@
+-- Migration: add price-drop watches and the alerts they produce.
+USE amasift_compare;
+
+-- Price-drop watches; after an import only products whose price changed are
+-- joined against them, through idx_price_watches_product_target
+CREATE TABLE IF NOT EXISTS price_watches (
+    watch_id INT AUTO_INCREMENT PRIMARY KEY,
+    subscriber VARCHAR(255) NOT NULL,
+    product_id VARCHAR(255) NOT NULL,
+    target_price DECIMAL(10, 2) NOT NULL,
+    last_alert_price DECIMAL(10, 2),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_price_watches_subscriber_product (subscriber, product_id),
+    INDEX idx_price_watches_product_target (product_id, target_price),
+    FOREIGN KEY (product_id) REFERENCES products(product_id) ON DELETE CASCADE
+);
+
+-- Alerts produced by alert_service, before they are handed to the notifier
+CREATE TABLE IF NOT EXISTS price_alerts (
+    alert_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    watch_id INT NOT NULL,
+    product_id VARCHAR(255) NOT NULL,
+    target_price DECIMAL(10, 2) NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_price_alerts_watch (watch_id, created_at)
+);
@@ -0,0 +1,38 @@
+-- Migration: add the tables behind "frequently compared together" recommendations.
+-- Run `python -m backend.services.compared_with_service` to build them.
+USE amasift_compare;
+
+-- Processing position of incremental offline jobs
+CREATE TABLE IF NOT EXISTS job_watermarks (
+    job VARCHAR(64) PRIMARY KEY,
+    last_created_at TIMESTAMP NULL,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Forward-decayed co-occurrence scores of products compared together
+-- (one row per ordered pair, built by compared_with_service)
+CREATE TABLE IF NOT EXISTS product_co_comparisons (
+    product_id VARCHAR(255) NOT NULL,
+    other_id VARCHAR(255) NOT NULL,
+    score DOUBLE NOT NULL,
+    PRIMARY KEY (product_id, other_id)
+);
+
+-- Top "frequently compared together" neighbours per product, read by product_id
+CREATE TABLE IF NOT EXISTS product_compared_with (
+    product_id VARCHAR(255) PRIMARY KEY,
+    neighbours TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Products whose scores changed since their neighbours were last recomputed.
+-- Written in the same transaction as the scores, so a crash before the
+-- recomputation leaves them here for the next run
+CREATE TABLE IF NOT EXISTS compared_with_pending (
+    product_id VARCHAR(255) PRIMARY KEY
+);
+
+-- The job reads new history rows in (created_at, comparison_id, position) order
+ALTER TABLE comparison_history_products
+    ADD INDEX idx_comparison_products_created (created_at, comparison_id, position);
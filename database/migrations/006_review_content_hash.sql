@@ -0,0 +1,10 @@
+-- Migration: key reviews by a content hash so re-imports no longer duplicate them.
+-- Existing rows keep a NULL hash (allowed by the unique index) until
+-- `python -m backend.services.review_dedup_service` hashes them and removes
+-- duplicates in small batches.
+USE amasift_compare;
+
+ALTER TABLE reviews
+    ADD COLUMN content_hash CHAR(32) CHARACTER SET ascii AFTER sentiment_score,
+    ADD UNIQUE KEY uq_reviews_content_hash (content_hash),
+    ALGORITHM=INPLACE, LOCK=NONE;
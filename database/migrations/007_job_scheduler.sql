@@ -0,0 +1,37 @@
+-- Migration: add the tables of the background job scheduler.
+-- Enable it with JOB_SCHEDULER_ENABLED=true or run `python -m backend.services.job_service`.
+USE amasift_compare;
+
+-- Background job scheduler: one row per exclusive job. A run takes the lease by
+-- setting owner and lease_until, so only one instance runs the job at a time
+CREATE TABLE IF NOT EXISTS job_leases (
+    job VARCHAR(64) PRIMARY KEY,
+    owner VARCHAR(128),
+    lease_until DATETIME(3),
+    last_started_at DATETIME(3),
+    last_event_id BIGINT NOT NULL DEFAULT 0
+);
+
+-- Events that trigger jobs, e.g. import_completed
+CREATE TABLE IF NOT EXISTS job_events (
+    event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    event VARCHAR(64) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_job_events_event (event, event_id)
+);
+
+-- Run history with durations, kept for JOB_RUN_RETENTION_DAYS
+CREATE TABLE IF NOT EXISTS job_runs (
+    run_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    job VARCHAR(64) NOT NULL,
+    node VARCHAR(128) NOT NULL,
+    trigger_reason VARCHAR(128) NOT NULL,
+    started_at DATETIME(3) NOT NULL,
+    finished_at DATETIME(3) NOT NULL,
+    duration_ms INT NOT NULL,
+    status ENUM('succeeded', 'failed') NOT NULL,
+    result VARCHAR(255),
+    error TEXT,
+    INDEX idx_job_runs_job_started (job, started_at),
+    INDEX idx_job_runs_started (started_at)
+);
\ No newline at end of file
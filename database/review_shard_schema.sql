@@ -0,0 +1,26 @@
+-- Schema for a review shard (see REVIEW_SHARDS), applied to each shard instance.
+-- Same reviews table as the main schema, without the foreign key to products,
+-- which live in the main database.
+CREATE DATABASE IF NOT EXISTS amasift_compare;
+USE amasift_compare;
+
+CREATE TABLE IF NOT EXISTS reviews (
+    review_id INT AUTO_INCREMENT PRIMARY KEY,
+    product_id VARCHAR(255),
+    user_name VARCHAR(255),
+    rating DECIMAL(3, 1),
+    title VARCHAR(512),
+    content TEXT,
+    helpful_votes INT DEFAULT 0,
+    date DATE,
+    verified_purchase BOOLEAN DEFAULT FALSE,
+    sentiment_score DECIMAL(4, 3),
+    content_hash CHAR(32) CHARACTER SET ascii,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_reviews_content_hash (content_hash)
+);
+
+CREATE INDEX idx_reviews_product_id ON reviews(product_id);
+CREATE INDEX idx_reviews_rating ON reviews(rating);
+CREATE INDEX idx_reviews_sentiment ON reviews(sentiment_score);
+CREATE INDEX idx_reviews_product_sentiment ON reviews(product_id, sentiment_score);
\ No newline at end of file
@@ -35,25 +35,78 @@ CREATE TABLE IF NOT EXISTS reviews (
     date DATE,
     verified_purchase BOOLEAN DEFAULT FALSE,
     sentiment_score DECIMAL(4, 3),
+    -- Hash of product, user, date, title and text; re-imported reviews upsert on it
+    content_hash CHAR(32) CHARACTER SET ascii,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_reviews_content_hash (content_hash),
     FOREIGN KEY (product_id) REFERENCES products(product_id) ON DELETE CASCADE
 );
 
 -- User searches history (for potential personalization)
+-- Log tables are range-partitioned by month on created_at; retention_service
+-- adds upcoming partitions and drops expired ones after rolling them up.
 CREATE TABLE IF NOT EXISTS user_searches (
-    search_id INT AUTO_INCREMENT PRIMARY KEY,
+    search_id INT AUTO_INCREMENT,
     session_id VARCHAR(255),
     search_term VARCHAR(255),
     filters TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (search_id, created_at),
+    INDEX idx_user_searches_created (created_at)
+)
+PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
 );
 
 -- Product comparison history
 CREATE TABLE IF NOT EXISTS comparison_history (
-    comparison_id INT AUTO_INCREMENT PRIMARY KEY,
+    comparison_id INT AUTO_INCREMENT,
     session_id VARCHAR(255),
-    product_ids TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (comparison_id, created_at),
+    INDEX idx_comparison_history_session (session_id, created_at)
+)
+PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+-- Products compared in each comparison, in the order they were compared
+-- (created_at copies the parent row so both tables share partition boundaries)
+CREATE TABLE IF NOT EXISTS comparison_history_products (
+    comparison_id INT NOT NULL,
+    position TINYINT UNSIGNED NOT NULL,
+    product_id VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (comparison_id, position, created_at),
+    INDEX idx_comparison_products_product (product_id, comparison_id),
+    INDEX idx_comparison_products_created (created_at, comparison_id, position)
+)
+PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+-- Daily roll-ups of expired comparison_history partitions
+CREATE TABLE IF NOT EXISTS comparison_daily_stats (
+    day DATE NOT NULL,
+    product_id VARCHAR(255) NOT NULL,
+    comparisons INT NOT NULL DEFAULT 0,
+    sessions INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, product_id)
+)
+PARTITION BY RANGE (TO_DAYS(day)) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
+);
+
+-- Daily roll-ups of expired user_searches partitions
+CREATE TABLE IF NOT EXISTS search_daily_stats (
+    day DATE NOT NULL,
+    search_term VARCHAR(255) NOT NULL,
+    searches INT NOT NULL DEFAULT 0,
+    sessions INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, search_term)
+)
+PARTITION BY RANGE (TO_DAYS(day)) (
+    PARTITION p_future VALUES LESS THAN MAXVALUE
 );
 
 -- Indexes for improved performance
@@ -62,4 +115,134 @@ CREATE INDEX idx_products_price ON products(price);
 CREATE INDEX idx_products_rating ON products(rating);
 CREATE INDEX idx_reviews_product_id ON reviews(product_id);
 CREATE INDEX idx_reviews_rating ON reviews(rating);
-CREATE INDEX idx_reviews_sentiment ON reviews(sentiment_score);
\ No newline at end of file
+CREATE INDEX idx_reviews_sentiment ON reviews(sentiment_score);
+
+-- Ranked review keywords/aspects per product (built offline by aspect_service)
+CREATE TABLE IF NOT EXISTS product_aspects (
+    product_id VARCHAR(255) PRIMARY KEY,
+    aspects TEXT,
+    review_count INT DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    FOREIGN KEY (product_id) REFERENCES products(product_id) ON DELETE CASCADE
+);
+
+-- Serves per-product sentiment ranges and top positive/negative review lookups
+CREATE INDEX idx_reviews_product_sentiment ON reviews(product_id, sentiment_score);
+
+-- Product price changes, appended by import_data only when a price changes
+CREATE TABLE IF NOT EXISTS price_history (
+    product_id VARCHAR(255) NOT NULL,
+    ts TIMESTAMP NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    original_price DECIMAL(10, 2),
+    PRIMARY KEY (product_id, ts),
+    INDEX idx_price_history_ts (ts)
+);
+
+-- Daily and weekly price buckets rolled up from price_history by price_history_service
+CREATE TABLE IF NOT EXISTS price_history_rollups (
+    product_id VARCHAR(255) NOT NULL,
+    resolution ENUM('day', 'week') NOT NULL,
+    bucket DATE NOT NULL,
+    min_price DECIMAL(10, 2) NOT NULL,
+    max_price DECIMAL(10, 2) NOT NULL,
+    last_price DECIMAL(10, 2) NOT NULL,
+    last_original_price DECIMAL(10, 2),
+    points INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (product_id, resolution, bucket),
+    INDEX idx_price_rollups_bucket (resolution, bucket)
+);
+
+-- First day not yet rolled up, per resolution
+CREATE TABLE IF NOT EXISTS price_history_rollup_state (
+    resolution ENUM('day', 'week') PRIMARY KEY,
+    rolled_up_to DATE NOT NULL
+);
+
+-- Price-drop watches; after an import only products whose price changed are
+-- joined against them, through idx_price_watches_product_target
+CREATE TABLE IF NOT EXISTS price_watches (
+    watch_id INT AUTO_INCREMENT PRIMARY KEY,
+    subscriber VARCHAR(255) NOT NULL,
+    product_id VARCHAR(255) NOT NULL,
+    target_price DECIMAL(10, 2) NOT NULL,
+    last_alert_price DECIMAL(10, 2),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_price_watches_subscriber_product (subscriber, product_id),
+    INDEX idx_price_watches_product_target (product_id, target_price),
+    FOREIGN KEY (product_id) REFERENCES products(product_id) ON DELETE CASCADE
+);
+
+-- Alerts produced by alert_service, before they are handed to the notifier
+CREATE TABLE IF NOT EXISTS price_alerts (
+    alert_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    watch_id INT NOT NULL,
+    product_id VARCHAR(255) NOT NULL,
+    target_price DECIMAL(10, 2) NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_price_alerts_watch (watch_id, created_at)
+);
+
+-- Processing position of incremental offline jobs
+CREATE TABLE IF NOT EXISTS job_watermarks (
+    job VARCHAR(64) PRIMARY KEY,
+    last_created_at TIMESTAMP NULL,
+    last_id BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Forward-decayed co-occurrence scores of products compared together
+-- (one row per ordered pair, built by compared_with_service)
+CREATE TABLE IF NOT EXISTS product_co_comparisons (
+    product_id VARCHAR(255) NOT NULL,
+    other_id VARCHAR(255) NOT NULL,
+    score DOUBLE NOT NULL,
+    PRIMARY KEY (product_id, other_id)
+);
+
+-- Top "frequently compared together" neighbours per product, read by product_id
+CREATE TABLE IF NOT EXISTS product_compared_with (
+    product_id VARCHAR(255) PRIMARY KEY,
+    neighbours TEXT NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Products whose scores changed since their neighbours were last recomputed
+CREATE TABLE IF NOT EXISTS compared_with_pending (
+    product_id VARCHAR(255) PRIMARY KEY
+);
+
+-- Background job scheduler: one row per exclusive job. A run takes the lease by
+-- setting owner and lease_until, so only one instance runs the job at a time
+CREATE TABLE IF NOT EXISTS job_leases (
+    job VARCHAR(64) PRIMARY KEY,
+    owner VARCHAR(128),
+    lease_until DATETIME(3),
+    last_started_at DATETIME(3),
+    last_event_id BIGINT NOT NULL DEFAULT 0
+);
+
+-- Events that trigger jobs, e.g. import_completed
+CREATE TABLE IF NOT EXISTS job_events (
+    event_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    event VARCHAR(64) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_job_events_event (event, event_id)
+);
+
+-- Run history with durations, kept for JOB_RUN_RETENTION_DAYS
+CREATE TABLE IF NOT EXISTS job_runs (
+    run_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    job VARCHAR(64) NOT NULL,
+    node VARCHAR(128) NOT NULL,
+    trigger_reason VARCHAR(128) NOT NULL,
+    started_at DATETIME(3) NOT NULL,
+    finished_at DATETIME(3) NOT NULL,
+    duration_ms INT NOT NULL,
+    status ENUM('succeeded', 'failed') NOT NULL,
+    result VARCHAR(255),
+    error TEXT,
+    INDEX idx_job_runs_job_started (job, started_at),
+    INDEX idx_job_runs_started (started_at)
+);
\ No newline at end of file
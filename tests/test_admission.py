@@ -0,0 +1,31 @@
+"""
+Tests for priority admission control.
+"""
+import threading
+import time
+
+from backend.utils.admission import AdmissionController
+
+CLASSES = {
+    'expensive': {'priority': 0, 'concurrency': 1, 'queue': 10, 'timeout': 5},
+    'cheap': {'priority': 1, 'concurrency': 2, 'queue': 10, 'timeout': 0.2}
+}
+
+def test_saturated_class_does_not_hold_back_lower_priorities():
+    controller = AdmissionController(CLASSES, total_concurrency=4)
+    controller.acquire('expensive')
+
+    # A second expensive request queues behind the first one's class limit
+    waiting = threading.Thread(target=controller.acquire, args=('expensive',))
+    waiting.start()
+    while not controller.queued['expensive']:
+        time.sleep(0.01)
+
+    # A free slot is there for the cheap class, so it runs without queuing
+    controller.acquire('cheap')
+    assert controller.active == {'expensive': 1, 'cheap': 1}
+
+    controller.release('expensive')
+    waiting.join(timeout=5)
+    assert controller.active == {'expensive': 1, 'cheap': 1}
+    assert controller.queued == {'expensive': 0, 'cheap': 0}
@@ -0,0 +1,19 @@
+"""
+Tests for picking a pre-compressed asset variant from Accept-Encoding.
+"""
+from backend.utils.assets import Asset
+
+def asset():
+    return Asset(b'plain', {'br': b'b', 'gzip': b'g'}, 'text/css', '"etag"', 'no-cache')
+
+def test_preferred_encoding_is_served():
+    assert asset().body_for('gzip, deflate, br') == (b'b', 'br')
+    assert asset().body_for('GZIP') == (b'g', 'gzip')
+    assert asset().body_for(None) == (b'plain', None)
+
+def test_refused_encoding_is_skipped():
+    assert asset().body_for('br;q=0, gzip;q=0.5') == (b'g', 'gzip')
+    assert asset().body_for('*;q=0.1, br; q=0') == (b'g', 'gzip')
+
+def test_encoding_names_are_matched_whole():
+    assert asset().body_for('x-gzip-custom, brotli') == (b'plain', None)
@@ -0,0 +1,93 @@
+"""
+Tests for the result cache serving stale values when the database fails.
+"""
+import pytest
+
+from backend.utils import cache
+from backend.utils.cache import cached, refresh, result_cache
+from backend.services import product_service, review_service
+
+class Clock:
+    """Stand-in for the time module with a monotonic clock moved by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'time', clock)
+    # Keep the hot-key file out of the tests
+    monkeypatch.setattr(cache, '_record_hit', lambda key: None)
+    result_cache.invalidate()
+    yield clock
+    result_cache.invalidate()
+
+def fake_queries(monkeypatch, module, results):
+    """Make module.execute_query return the given results in turn."""
+    results = iter(results)
+    monkeypatch.setattr(module, 'execute_query', lambda *args, **kwargs: next(results))
+
+def test_failed_query_serves_previous_statistics(clock, monkeypatch):
+    fake_queries(monkeypatch, review_service, [
+        [{'review_count': 3, 'average_rating': 4.0, 'positive_reviews': 2,
+          'negative_reviews': 1, 'average_sentiment': 0.25}],
+        [{'rating': 5, 'count': 2}, {'rating': 1, 'count': 1}],
+        None,
+    ])
+    stats = review_service.get_review_statistics('B001')
+    assert stats['review_count'] == 3
+
+    clock.now += cache.CACHE_TTL + 1
+    assert review_service.get_review_statistics('B001') is stats
+
+def test_failed_query_is_not_cached(clock, monkeypatch):
+    deal = {'product_id': 'B001', 'discount_percentage': 50}
+    fake_queries(monkeypatch, product_service, [None, [deal]])
+    assert product_service.get_top_discounted_products(10) is None
+    assert product_service.get_top_discounted_products(10) == [deal]
+
+def test_raising_function_serves_previous_value(clock):
+    calls = []
+
+    @cached()
+    def load():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("database unavailable")
+        return ['value']
+
+    first = load()
+    clock.now += cache.CACHE_TTL + 1
+    assert load() is first
+
+    clock.now += cache.CACHE_STALE_TTL + 1
+    with pytest.raises(RuntimeError):
+        load()
+
+def test_failed_refresh_keeps_the_cached_value(clock, monkeypatch):
+    deal = {'product_id': 'B001', 'discount_percentage': 50}
+    fake_queries(monkeypatch, product_service, [[deal], None])
+    deals = product_service.get_top_discounted_products(10)
+
+    assert refresh(product_service.get_top_discounted_products, 10) is None
+    assert product_service.get_top_discounted_products(10) is deals
+def test_default_and_explicit_arguments_share_an_entry(clock, monkeypatch):
+    deal = {'product_id': 'B001', 'discount_percentage': 50}
+    fake_queries(monkeypatch, product_service, [[deal]])
+    # Warm-up calls with the default limit, the deals route passes it positionally
+    deals = product_service.get_top_discounted_products()
+    assert product_service.get_top_discounted_products(10) is deals
+    assert product_service.get_top_discounted_products(limit=10) is deals
+
+def test_refresh_replaces_the_entry_the_route_reads(clock, monkeypatch):
+    old, new = {'product_id': 'B001'}, {'product_id': 'B002'}
+    fake_queries(monkeypatch, product_service, [[old], [new]])
+    assert product_service.get_top_discounted_products(10) == [old]
+
+    # The caches job refreshes with the default limit
+    refresh(product_service.get_top_discounted_products)
+    assert product_service.get_top_discounted_products(10) == [new]
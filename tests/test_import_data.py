@@ -0,0 +1,34 @@
+"""
+Tests for storing imported reviews.
+"""
+import mysql.connector
+
+from backend.import_data import store_reviews
+
+class FakeCursor:
+    """Cursor rejecting rows whose product ID is 'bad', like a failed constraint."""
+
+    def __init__(self):
+        self.stored = []
+
+    def execute(self, query, row):
+        if row[0] == 'bad':
+            raise mysql.connector.Error("Data too long for column 'product_id'")
+        self.stored.append(row)
+
+    def executemany(self, query, rows):
+        if any(row[0] == 'bad' for row in rows):
+            raise mysql.connector.Error("Data too long for column 'product_id'")
+        self.stored.extend(rows)
+
+def test_bad_review_is_skipped():
+    cursor = FakeCursor()
+    rows = [('a', 'user1'), ('bad', 'user2'), ('b', 'user3')]
+    assert store_reviews(cursor, 'INSERT', rows) == 2
+    assert cursor.stored == [('a', 'user1'), ('b', 'user3')]
+
+def test_batch_is_stored_at_once():
+    cursor = FakeCursor()
+    rows = [('a', 'user1'), ('b', 'user2')]
+    assert store_reviews(cursor, 'INSERT', rows) == 2
+    assert cursor.stored == rows
\ No newline at end of file
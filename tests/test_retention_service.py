@@ -0,0 +1,56 @@
+"""
+Tests for monthly partition maintenance.
+"""
+from datetime import date, datetime
+
+from backend.services import retention_service
+
+def test_new_partitions_follow_the_last_one(monkeypatch):
+    monkeypatch.setattr(retention_service, 'get_partitions', lambda table: ['p202606', 'p_future'])
+    added = retention_service.add_future_partitions(
+        'user_searches', 'UNIX_TIMESTAMP', date(2026, 10, 19), 1, dry_run=True
+    )
+    assert added == ['p202607', 'p202608', 'p202609', 'p202610', 'p202611']
+
+def test_first_partition_rolls_up_from_its_oldest_row(monkeypatch):
+    days = []
+    monkeypatch.setattr(retention_service, 'execute_query',
+                        lambda *args, **kwargs: [(datetime(2026, 8, 30, 12, 0),)])
+    assert retention_service._rollup_partition(
+        lambda name, day: days.append(day) or True, 'user_searches', 'p202609', 'p_old', date(2026, 9, 1)
+    )
+    assert days[0] == date(2026, 8, 30)
+    assert days[-1] == date(2026, 9, 30)
+
+def test_failed_drop_is_not_reported(monkeypatch):
+    monkeypatch.setattr(retention_service, 'get_partitions', lambda table: ['p202601', 'p_future'])
+    monkeypatch.setattr(retention_service, 'execute_transaction', lambda *args, **kwargs: False)
+    assert retention_service.drop_expired_partitions(
+        'comparison_daily_stats', 90, None, date(2026, 10, 19)
+    ) == []
+
+def test_failed_rollup_keeps_the_month_in_both_history_tables(monkeypatch):
+    partitions = {
+        table: ['p202601', 'p202602', 'p_future'] for table, *_ in retention_service.PARTITIONED_TABLES
+    }
+
+    def execute_transaction(batch, **kwargs):
+        query, params = batch[0][:2]
+        # Rolling up January fails; every other statement succeeds
+        if 'comparison_daily_stats' in query and params[0].month == 1:
+            return False
+        if 'DROP PARTITION' in query:
+            _, _, table, _, _, name = query.split()
+            partitions[table].remove(name)
+        return True
+
+    monkeypatch.setattr(retention_service, 'get_partitions', lambda table: list(partitions[table]))
+    monkeypatch.setattr(retention_service, 'execute_query',
+                        lambda *args, **kwargs: [(datetime(2026, 1, 1),)])
+    monkeypatch.setattr(retention_service, 'execute_transaction', execute_transaction)
+    monkeypatch.setattr(retention_service, 'add_future_partitions', lambda *args: [])
+
+    summary = retention_service.run_retention(today=date(2026, 10, 19))
+    assert summary['comparison_history']['dropped'] == ['p202602']
+    assert summary['comparison_history_products']['dropped'] == ['p202602']
+    assert partitions['comparison_history_products'] == ['p202601', 'p_future']
@@ -0,0 +1,151 @@
+"""
+Tests for review sharding: placement, scatter and moving reviews between shards.
+
+The databases are in-memory stand-ins for the queries move_reviews runs, so the
+tests need no MySQL instance.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from backend.utils import database
+from backend.utils.database import group_by_review_shard, review_shard, scatter
+from backend.services import review_service, review_shard_service
+from backend.services.review_shard_service import REVIEW_COLUMNS, move_reviews
+
+PRODUCT_IDS = [f"P{i:06d}" for i in range(20000)]
+
+def test_placement_is_stable():
+    # Changing these moves every stored review to another shard
+    assert [review_shard(p, 4) for p in ['B00000001', 'B07XJ8C8F5', 'B08N5WRWNW', '0000000000']] == [3, 1, 2, 3]
+    assert review_shard('B07XJ8C8F5', 4) == review_shard('B07XJ8C8F5', 4)
+
+def test_placement_is_even():
+    counts = Counter(review_shard(p, 4) for p in PRODUCT_IDS)
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > len(PRODUCT_IDS) / 4 * 0.9
+
+def test_appending_a_shard_only_moves_reviews_to_it():
+    moved = [p for p in PRODUCT_IDS if review_shard(p, 4) != review_shard(p, 5)]
+    assert all(review_shard(p, 5) == 4 for p in moved)
+    assert len(moved) < len(PRODUCT_IDS) / 5 * 1.1
+
+def test_unsharded_reviews_are_on_the_main_database(monkeypatch):
+    monkeypatch.setattr(database, 'shard_configs', [])
+    assert review_shard('B07XJ8C8F5') is None
+    assert group_by_review_shard(['a', 'b']) == {None: ['a', 'b']}
+
+def test_scatter_returns_results_in_group_order(monkeypatch):
+    monkeypatch.setattr(database, 'shard_configs', [{}, {}, {}])
+    # A pool sized for fewer shards would leave a group waiting at the barrier
+    monkeypatch.setattr(database, '_scatter_pool', None)
+    started = threading.Barrier(3)
+
+    def slow_first(shard, items):
+        started.wait()
+        # The first group finishes last
+        time.sleep(0.05 * (3 - shard))
+        return shard, items
+
+    groups = {0: ['a'], 1: ['b', 'c'], 2: ['d']}
+    assert scatter(slow_first, groups) == [(0, ['a']), (1, ['b', 'c']), (2, ['d'])]
+
+def test_review_counts_are_gathered_from_every_shard(monkeypatch):
+    monkeypatch.setattr(database, 'shard_configs', [{}, {}])
+    rows = {0: [('a', 2), ('b', 1)], 1: [('c', 4), ('b', 3)]}
+    monkeypatch.setattr(review_service, 'stream_query', lambda *args, shard=None, **kwargs: iter(rows[shard]))
+    # 'b' is on both shards while a rebalance moves its reviews
+    assert review_service.get_review_counts() == {'a': 2, 'b': 4, 'c': 4}
+
+class FakeDatabases:
+    """Review tables of the main database and the shards, keyed by review_id."""
+
+    def __init__(self, shard_count):
+        self.reviews = {shard: {} for shard in [None] + list(range(shard_count))}
+        self.next_id = Counter()
+        self.deletes = 0
+        # Numbers of the DELETE statements that fail, counting from 1
+        self.failing_deletes = set()
+
+    def add(self, shard, row):
+        self.next_id[shard] += 1
+        self.reviews[shard][self.next_id[shard]] = dict(row, review_id=self.next_id[shard])
+
+    def execute_query(self, query, params=None, query_class='default', shard=None, **kwargs):
+        last_id, limit = params
+        rows = [row for review_id, row in sorted(self.reviews[shard].items()) if review_id > last_id]
+        return [dict(row) for row in rows[:limit]]
+
+    def execute_transaction(self, statements, query_class='default', shard=None):
+        for query, params, _ in statements:
+            if query.lstrip().startswith('DELETE'):
+                self.deletes += 1
+                if self.deletes in self.failing_deletes:
+                    return False
+                for (review_id,) in params:
+                    del self.reviews[shard][review_id]
+            else:
+                by_hash = {row['content_hash']: row for row in self.reviews[shard].values()}
+                for values in params:
+                    row = dict(zip(REVIEW_COLUMNS, values))
+                    if row['content_hash'] in by_hash:
+                        by_hash[row['content_hash']]['helpful_votes'] = max(
+                            by_hash[row['content_hash']]['helpful_votes'], row['helpful_votes'])
+                    else:
+                        self.add(shard, row)
+        return True
+
+@pytest.fixture
+def databases(monkeypatch):
+    fake = FakeDatabases(3)
+    shards = [{}, {}, {}]
+    monkeypatch.setattr(database, 'shard_configs', shards)
+    monkeypatch.setattr(review_shard_service, 'shard_configs', shards)
+    monkeypatch.setattr(review_shard_service, 'execute_query', fake.execute_query)
+    monkeypatch.setattr(review_shard_service, 'execute_transaction', fake.execute_transaction)
+    return fake
+
+def review(product_id, user_name):
+    return {
+        'product_id': product_id, 'user_name': user_name, 'rating': 4, 'title': 'Good',
+        'content': f"Review by {user_name}", 'helpful_votes': 1, 'date': date(2026, 1, 1),
+        'verified_purchase': True, 'sentiment_score': 0.5, 'content_hash': None,
+        'created_at': None
+    }
+
+def placement(fake):
+    return {
+        shard: sorted((row['product_id'], row['user_name']) for row in rows.values())
+        for shard, rows in fake.reviews.items()
+    }
+
+def test_move_reviews_resumes_after_a_failed_batch(databases):
+    reviews = [review(p, f"user{i}") for i, p in enumerate(PRODUCT_IDS[:50])]
+    for row in reviews:
+        databases.add(None, row)
+
+    databases.failing_deletes = {2}
+    with pytest.raises(RuntimeError):
+        move_reviews(None, batch_size=10)
+    # The second batch was copied but not deleted, so it is on both databases
+    assert len(databases.reviews[None]) == 40
+    assert sum(len(databases.reviews[shard]) for shard in range(3)) == 20
+
+    assert move_reviews(None, batch_size=10) == {'scanned': 40, 'moved': 40}
+
+    moved = placement(databases)
+    assert moved[None] == []
+    for shard in range(3):
+        expected = sorted((r['product_id'], r['user_name']) for r in reviews if review_shard(r['product_id']) == shard)
+        assert moved[shard] == expected
+
+def test_move_reviews_dry_run_moves_nothing(databases):
+    for i, p in enumerate(PRODUCT_IDS[:20]):
+        databases.add(None, review(p, f"user{i}"))
+
+    summary = move_reviews(None, batch_size=7, dry_run=True)
+    assert summary == {'scanned': 20, 'moved': 20}
+    assert len(databases.reviews[None]) == 20
\ No newline at end of file
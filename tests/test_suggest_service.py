@@ -0,0 +1,16 @@
+"""
+Tests for search-as-you-type suggestions.
+"""
+from backend.services import suggest_service
+from backend.utils.prefix_index import PrefixIndex
+
+TITLE = 'Wireless Bluetooth Speaker with Deep Bass and Twenty Hour Battery Life'
+
+def test_prefix_longer_than_title_keys_matches(monkeypatch):
+    entries, suggestions = suggest_service.build_suggest_entries([('P1', TITLE, 'Acme', 'Audio', 4.5, 10)])
+    index = PrefixIndex.build(entries, suggestions)
+    monkeypatch.setattr(suggest_service, 'get_suggest_index', lambda: index)
+
+    typed = 'wireless bluetooth speaker with deep bass and twenty'
+    assert len(typed) > suggest_service.TITLE_KEY_LENGTH
+    assert suggest_service.get_suggestions(typed, 5) == [{'text': TITLE, 'type': 'product', 'product_id': 'P1'}]
\ No newline at end of file